@@ -71,6 +71,35 @@ class CLI:
         import flexx
         print(flexx.__version__)
     
+    def cmd_build(self, *args):
+        """ build the assets for the given apps, e.g. flexx build mymodule:MyApp
+        The Model classes in the module of each app are transpiled and
+        bundled. All assets are minified, compressed and written to a
+        directory (default "flexx_build", use --dir=path to change), along
+        with a manifest. To serve the apps using these assets, set the
+        asset_manifest config option, e.g.
+        --flexx-asset-manifest=flexx_build/manifest.json
+        """
+        targets = [arg for arg in args if not arg.startswith('--')]
+        dirname = 'flexx_build'
+        for arg in args:
+            if arg.startswith('--dir='):
+                dirname = arg[6:]
+        if not targets:
+            return self.cmd_help('build')
+        
+        import importlib
+        from flexx.app import assets
+        for target in targets:
+            module_name, _, cls_name = target.partition(':')
+            module = importlib.import_module(module_name)
+            if cls_name:
+                module_name = getattr(module, cls_name).__module__
+            if module_name not in assets._module_names:
+                assets.create_module_assets(module_name)
+        filename = assets.build(dirname)
+        print('Wrote assets and manifest to %s' % filename)
+    
     def cmd_info(self, port=None):
         """ show info on flexx server process corresponding to given port,
         e.g. flexx info 8080
@@ -5,5 +5,21 @@ config = Config('flexx', '~appdata/.flexx.cfg',
     hostname=('localhost', str, 'The default hostname to serve apps.'),
     port=(0, int, 'The default port to serve apps. Zero means auto-select.'),
     webruntime=('', str, 'The default web runtime to use. Default is xul/browser.'),
-    ws_timeout=(20, int, 'If the websocket is idle for this time, it is closed.')
+    ws_timeout=(20, int, 'If the websocket is idle for this time, it is closed.'),
+    ws_queue_high=(1048576, int, 'When this many bytes are being sent to a client, '
+                   'further messages are queued.'),
+    ws_queue_low=(262144, int, 'When the bytes being sent to a client drop '
+                  'below this value, the queue is flushed.'),
+    ws_queue_max=(67108864, int, 'If the queue for a client exceeds this many bytes, '
+                  'the connection is closed. Zero means no limit.'),
+    ws_compression=(False, bool, 'Whether to use permessage-deflate compression '
+                    'for the websocket. If so, all messages are compressed.'),
+    ws_compression_level=(6, int, 'The websocket compression level (1-9).'),
+    ws_compression_mem_level=(8, int, 'The memory level for websocket '
+                              'compression (1-9).'),
+    asset_manifest=('', str, 'The manifest of the assets created with '
+                    '"flexx build". If set, the assets are loaded from it '
+                    'and the JS of Model classes is only generated when needed.'),
+    hot_reload=(False, bool, 'Whether to watch the modules of served apps, and '
+                'hot-swap the Model classes that change (for development).'),
     )
@@ -68,6 +68,8 @@ Overview of classes:
   instances or get the page for a pending session. Hosts assets by using
   the global asset store.
 * FlexxJS (in clientcore.py): more or less the JS side of a session.
+* Reloader: reloads changed modules and hot-swaps their Model classes
+  in the running sessions (during development).
 
 """
 
@@ -79,9 +81,11 @@ del logging
 from .session import manager, Session
 from .model import Model, get_active_model
 from .model import get_instance_by_id, get_model_classes
+from .channel import Channel
 from .funcs import create_server, current_server, run, start, stop, call_later
 from .funcs import init_notebook, serve, launch, export
 from .assetstore import assets
+from .reloader import reloader
 from .clientcore import FlexxJS
 
 from ..pyscript.stdlib import get_full_std_lib as _get_full_std_lib
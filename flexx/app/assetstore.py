@@ -17,8 +17,10 @@ present in the given Python module. Classes used by the session that
 are not provided via such a module asset will be added to the index.
 """
 
+import io
 import os
 import sys
+import gzip
 import json
 import time
 import random
@@ -28,6 +30,7 @@ from collections import OrderedDict
 
 from .model import Model, get_model_classes
 from . import logger
+from .. import config
 
 
 INDEX = """<!doctype html>
@@ -124,6 +127,32 @@ def modname_startswith(x, y):
     return (x + '.').startswith(y + '.')
 
 
+def minify(code):
+    """ Minify JS or CSS code by removing indentation, trailing whitespace
+    and empty lines. A line that follows a line ending with a backslash
+    (i.e. a string that continues) is left as it is.
+    """
+    lines = []
+    continued = False
+    for line in code.splitlines():
+        if not continued:
+            line = line.strip()
+        if line or continued:
+            lines.append(line)
+        continued = line.endswith('\\')
+    return '\n'.join(lines) + '\n'
+
+
+def gzip_bytes(content):
+    """ Compress the given bytes with gzip. The result is the same for
+    the same content (the timestamp is zero).
+    """
+    f = io.BytesIO()
+    with gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as gz:
+        gz.write(content)
+    return f.getvalue()
+
+
 def create_css_and_js_from_model_classes(classes, css='', js=''):
     # Collect CSS and JS, and filter out empty ones
     css, js = [css], [js]
@@ -153,6 +182,9 @@ class AssetStore:
         self._cache = {}
         self._assets = {}
         self._module_names = []
+        self._module_extras = {}  # module name -> (css, js) given at creation
+        self._built_assets = {}  # name -> info, for assets from a manifest
+        self._built_modules = set()
         self.add_asset('reset.css', RESET.encode())
     
     def _cache_get(self, key):
@@ -184,6 +216,8 @@ class AssetStore:
                 (the contents will be cached). If bytes, it is
                 interpreted as the raw asset content.
         """
+        if fname in self._built_assets:
+            return  # the asset from the manifest is used
         if fname in self._assets:
             if content == self._assets[fname]:
                 return  # asset is the same (same filename or same bytes)
@@ -241,6 +275,9 @@ class AssetStore:
             css (str, optional): additional CSS to prepend to the module.
             js (str, optional): additional JS to prepend to the module.
         """
+        if module_name in self._built_modules:
+            return  # the assets are loaded from a manifest
+        
         # Collect classes and remember which ones we have covered
         classes = list()
         for cls in get_model_classes():
@@ -256,6 +293,7 @@ class AssetStore:
         
         # Store module name and sort
         self._module_names.append(module_name)
+        self._module_extras[module_name] = css, js
         self._module_names.sort(key=lambda x: -len(x))
         
         # Create cached assets
@@ -263,6 +301,17 @@ class AssetStore:
         self._assets[fname + '.css'] = css_.encode()
         self._assets[fname + '.js'] = js_.encode()
     
+    def update_module_assets(self, module_name):
+        """ Re-create the assets for a module that was previously added
+        with ``create_module_assets()``, e.g. because its Model classes
+        have been reloaded. Does nothing for other modules.
+        """
+        if module_name not in self._module_names or module_name in self._built_modules:
+            return
+        self._module_names.remove(module_name)
+        css, js = self._module_extras.pop(module_name)
+        self.create_module_assets(module_name, css, js)
+    
     def export(self, dirname):
         """ Write all assets to the given directory.
         """
@@ -277,8 +326,82 @@ class AssetStore:
                 with open(os.path.join(dirname, fname), 'wb') as f:
                     f.write(self.load_asset(fname))
 
+    def build(self, dirname):
+        """ Write all assets to the given directory, for use with
+        ``load_manifest()``. JS and CSS assets are minified. The filename
+        of each asset includes a hash of its content, and a gzipped
+        version is written as well. A file "manifest.json" maps asset
+        names to these files, and lists the modules that the module assets
+        correspond to.
+        
+        Parameters:
+            dirname (str): the directory to write to. Is created if needed.
+        Returns:
+            filename (str): the filename of the manifest.
+        """
+        if dirname.startswith('~'):  # pragma: no cover
+            dirname = os.path.expanduser(dirname)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        manifest = dict(modules=sorted(self._module_names), assets={})
+        for fname in self.get_asset_names():
+            content = self.load_asset(fname)
+            if fname.endswith(('.js', '.css')):
+                content = minify(content.decode()).encode()
+            hash = hashlib.sha256(content).hexdigest()
+            part1, dot, part2 = fname.rpartition('.')
+            if dot:
+                filename = '%s.%s.%s' % (part1, hash[:16], part2)
+            else:
+                filename = '%s.%s' % (fname, hash[:16])
+            path = os.path.join(dirname, filename)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))  # asset name has slashes
+            with open(path, 'wb') as f:
+                f.write(content)
+            with open(path + '.gz', 'wb') as f:
+                f.write(gzip_bytes(content))
+            manifest['assets'][fname] = dict(file=filename, hash=hash,
+                                             size=len(content))
+        filename = os.path.join(dirname, 'manifest.json')
+        with open(filename, 'wb') as f:
+            f.write(json.dumps(manifest, indent=2, sort_keys=True).encode())
+        logger.info('Wrote %i assets to %s' % (len(manifest['assets']), dirname))
+        return filename
+    
+    def load_manifest(self, filename):
+        """ Load the assets from a manifest created with ``build()``.
+        These take precedence over assets with the same name that are
+        added to the store. Module assets that are in the manifest are
+        not created again. This is done at startup if
+        ``flexx.config.asset_manifest`` is set.
+        """
+        dirname = os.path.dirname(os.path.abspath(filename))
+        with open(filename, 'rb') as f:
+            manifest = json.loads(f.read().decode())
+        for fname, info in manifest['assets'].items():
+            self._assets[fname] = os.path.join(dirname, info['file'])
+            self._built_assets[fname] = info
+        for module_name in manifest['modules']:
+            if module_name not in self._module_names:
+                self._module_names.append(module_name)
+            self._built_modules.add(module_name)
+        self._module_names.sort(key=lambda x: -len(x))
+    
+    def load_compressed_asset(self, fname):
+        """ Get the gzipped content of the asset corresponding to the
+        given name, or None if it is not available (i.e. the asset is
+        not loaded from a manifest).
+        """
+        if fname not in self._built_assets:
+            return None
+        return self._cache_get(self._assets[fname] + '.gz')
+
+
 # Our singleton asset store
 assets = AssetStore()
+if config.asset_manifest:
+    assets.load_manifest(config.asset_manifest)
 
 
 class SessionAssets:
@@ -0,0 +1,105 @@
+"""
+Serve web page and handle web sockets on an asyncio event loop. The
+request and websocket handlers are the same as for the Tornado server;
+they are hosted on a Tornado IOLoop that is a thin wrapper around the
+asyncio loop. Scheduling, starting and stopping is done via asyncio
+directly. Optionally, uvloop is used as the event loop implementation.
+"""
+
+from tornado.ioloop import IOLoop
+
+from .tornadoserver import TornadoServer, is_main_thread
+from . import logger
+
+
+class AsyncioServer(TornadoServer):
+    """ Flexx Server that runs on an asyncio event loop. This makes it
+    possible to run Flexx inside an existing asyncio application, and
+    to use alternative loop implementations such as uvloop.
+    
+    Arguments:
+        host (str): the hostname to serve at
+        port (int): the port to serve at. None or 0 mean to autoselect a port.
+        new_loop (bool): whether to create a fresh asyncio loop. If False,
+            uses the asyncio loop for the current thread.
+        use_uvloop (bool): whether to use uvloop for the asyncio event loop.
+    """
+    
+    def __init__(self, host, port, new_loop, use_uvloop=False):
+        self._use_uvloop = use_uvloop
+        super().__init__(host, port, new_loop)
+    
+    def _init_loop(self):
+        try:
+            import asyncio
+            from tornado.platform.asyncio import BaseAsyncIOLoop
+        except ImportError:  # pragma: no cover
+            raise RuntimeError('The asyncio backend needs asyncio (Python 3.4+).')
+        self._asyncio = asyncio
+        
+        if self._use_uvloop:
+            try:
+                import uvloop
+            except ImportError:
+                raise RuntimeError('The uvloop backend needs the uvloop package.')
+            # Make the loop that we get/create for this thread a uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        
+        # Get a new asyncio loop or the current asyncio loop for this thread
+        if self._new_loop:
+            self._aio_loop = asyncio.new_event_loop()
+        else:
+            try:
+                self._aio_loop = asyncio.get_event_loop()
+            except RuntimeError:  # no loop in this (non-main) thread
+                self._aio_loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._aio_loop)
+        
+        # Host the Tornado handlers on a Tornado loop that wraps the asyncio loop
+        self._loop = BaseAsyncIOLoop(asyncio_loop=self._aio_loop, make_current=False)
+        if not self._new_loop:
+            self._loop.make_current()
+        
+        logger.debug('Flexx server uses %s' % self._aio_loop.__class__.__name__)
+    
+    def _start(self):
+        # Ensure that our loop is the current loop for this thread
+        if self._new_loop:
+            self._asyncio.set_event_loop(self._aio_loop)
+            self._loop.make_current()
+        elif self._asyncio.get_event_loop() is not self._aio_loop:
+            raise RuntimeError('Server must use asyncio loop that is current '
+                               'to this thread.')
+        elif IOLoop.current(instance=is_main_thread()) is not self._loop:
+            self._loop.make_current()
+        # If the loop is already running, e.g. because Flexx is embedded
+        # in an asyncio application, we simply make use of it.
+        if not self._aio_loop.is_running():
+            self._aio_loop.run_forever()
+    
+    def _stop(self):
+        logger.debug('Stopping asyncio server')
+        self._aio_loop.stop()
+    
+    def call_later(self, delay, callback, *args, **kwargs):
+        # Wrap the callback so that exceptions are processed via our
+        # logging system, see TornadoServer.call_later(). Scheduling
+        # is always done via call_soon_threadsafe(), so that this
+        # method can be used from other threads as well.
+        def wrapper():
+            try:
+                callback(*args, **kwargs)
+            except Exception as err:
+                err.skip_tb = 1
+                logger.exception(err)
+        
+        if delay <= 0:
+            self._aio_loop.call_soon_threadsafe(wrapper)
+        else:
+            self._aio_loop.call_soon_threadsafe(self._aio_loop.call_later,
+                                                delay, wrapper)
+    
+    @property
+    def asyncio_loop(self):
+        """ The asyncio event loop being used."""
+        return self._aio_loop
@@ -0,0 +1,105 @@
+"""
+Implementation of channels to broadcast events to many sessions.
+"""
+
+import json
+
+from .serialize import serializer
+
+reprs = json.dumps
+
+
+class Channel:
+    """ A channel to broadcast events to Model objects in any number of
+    sessions, e.g. to send a chat message to all participants.
+    
+    The alternative is to let each session connect a handler to a global
+    ``HasEvents`` object. That means that each event is handled, and
+    serialized, once for each session. With a channel, the event is
+    serialized once, and the same command is send to all subscribed
+    sessions. No Python handlers are involved: the event is emitted
+    directly on the subscribed objects in JavaScript.
+    
+    Arguments:
+        name (str): the name of the channel. Must not contain spaces.
+    
+    .. code-block:: python
+        
+        chat = app.Channel('chat')
+        
+        class ChatRoom(ui.Widget):
+            
+            def init(self):
+                chat.subscribe(self)
+            
+            def send(self, msg):
+                chat.broadcast('new_message', dict(msg=msg))
+            
+            class JS:
+                
+                @event.connect('!new_message')
+                def _show_messages(self, *events):
+                    ...
+    """
+    
+    def __init__(self, name):
+        if not (isinstance(name, str) and name and ' ' not in name):
+            raise ValueError('Channel name must be a nonempty str without spaces.')
+        self._name = name
+        self._subscribers = {}  # session -> list of Model ids
+    
+    def __repr__(self):
+        return '<Channel %r with %i sessions at 0x%x>' % (
+            self._name, len(self._subscribers), id(self))
+    
+    @property
+    def name(self):
+        """ The name of this channel.
+        """
+        return self._name
+    
+    @property
+    def sessions(self):
+        """ A list of the sessions that have subscribed objects.
+        """
+        return [session for session in self._subscribers
+                if session.status != session.STATUS.CLOSED]
+    
+    def subscribe(self, model):
+        """ Subscribe the given Model instance (in JS) to this channel.
+        The subscription ends when ``unsubscribe()`` is called or when
+        the model's session is closed.
+        """
+        session = model.session
+        ids = self._subscribers.setdefault(session, [])
+        if model.id not in ids:
+            ids.append(model.id)
+            session._exec('flexx.subscribe(%s, %s);' % (reprs(self._name),
+                                                         reprs(model.id)))
+    
+    def unsubscribe(self, model):
+        """ Unsubscribe the given Model instance from this channel.
+        """
+        session = model.session
+        ids = self._subscribers.get(session, [])
+        if model.id in ids:
+            ids.remove(model.id)
+            if not ids:
+                self._subscribers.pop(session)
+            if session.status != session.STATUS.CLOSED:
+                session._exec('flexx.unsubscribe(%s, %s);' % (reprs(self._name),
+                                                               reprs(model.id)))
+    
+    def broadcast(self, type, info=None):
+        """ Emit an event with the given type and info on all subscribed
+        objects (in JS). The info is serialized only once.
+        """
+        if ' ' in type:
+            raise ValueError('Event type must not contain spaces.')
+        cmd = 'BROADCAST %s %s %s' % (self._name, type,
+                                      serializer.saves(info or {}))
+        for session in list(self._subscribers):
+            if session.status == session.STATUS.CLOSED:
+                self._subscribers.pop(session)
+            else:
+                session._send_command(cmd)
@@ -25,6 +25,7 @@ class FlexxJS:
         # Containers to keep track of classes and objects
         self.classes = {}
         self.instances = {}
+        self.channels = {}  # channel name -> list of instance ids
         # Construct url (for nodejs the location is set by the flexx nodejs runtime)
         address = location.hostname
         if location.port:
@@ -94,7 +95,9 @@ class FlexxJS:
                 raise "FAIL: need websocket"
         # Open web socket in binary mode
         self.ws = ws = WebSocket(window.flexx.ws_url)
-        #ws.binaryType = "arraybuffer"  # would need utf-decoding -> slow
+        # Text frames still arrive as strings (no utf-decoding in JS),
+        # binary frames are used for arrays
+        ws.binaryType = "arraybuffer"
         
         def on_ws_open(evt):
             window.console.info('Socket connected')
@@ -102,7 +105,10 @@ class FlexxJS:
         def on_ws_message(evt):
             window.flexx.last_msg = msg = evt.data or evt
             #msg = window.flexx.decodeUtf8(msg)
-            window.flexx.command(msg)
+            if typeof(msg) is 'string':
+                window.flexx.command(msg)
+            else:
+                window.flexx.command_binary(msg)
         def on_ws_close(evt):
             self.ws = None
             msg = 'Lost connection with server'
@@ -194,6 +200,12 @@ class FlexxJS:
             self.ws.send('RET ' + window._)  # send back result
         elif msg.startswith('EXEC '):
             eval(msg[5:])  # like eval, but do not return result
+        elif msg.startswith('BROADCAST '):
+            self.broadcast(msg[10:])
+        elif msg.startswith('BATCH '):
+            # Commands of a transaction, apply them at once
+            for command in window.JSON.parse(msg[6:]):
+                self.command(command)
         elif msg.startswith('DEFINE-JS '):
             if self.nodejs:
                 eval(msg[10:])  # best we can do
@@ -222,6 +234,156 @@ class FlexxJS:
         else:
             window.console.warn('Invalid command: "' + msg + '"')
     
+    def subscribe(self, channel, id):
+        """ Subscribe the instance with the given id to a channel.
+        """
+        ids = self.channels[channel] or []
+        if ids.indexOf(id) < 0:
+            ids.append(id)
+        self.channels[channel] = ids
+    
+    def unsubscribe(self, channel, id):
+        """ Unsubscribe the instance with the given id from a channel.
+        """
+        ids = self.channels[channel] or []
+        i = ids.indexOf(id)
+        if i >= 0:
+            ids.splice(i, 1)
+    
+    def broadcast(self, msg):
+        """ Emit an event that was broadcast over a channel on all
+        subscribed instances. The message is "channel type json".
+        """
+        i = msg.indexOf(' ')
+        j = msg.indexOf(' ', i + 1)
+        ids = self.channels[msg[:i]] or []
+        type = msg[i + 1:j]
+        ev = window.flexx.serializer.loads(msg[j + 1:])
+        for id in ids:
+            ob = self.instances[id]
+            if ob and ob.emit:
+                ob.emit(type, ev, True)  # frompy, so not send back
+    
+    def hot_swap(self, name, define):
+        """
+        // Redefine the Model class with the given name. The define function
+        // creates the new class, which is then used to patch the existing
+        // class (its prototype) so that existing instances and subclasses
+        // use the new code. Only the members that changed are updated.
+        var old_cls = this.classes[name];
+        define();
+        var new_cls = this.classes[name];
+        if (!old_cls || old_cls === new_cls) { return []; }
+        this.classes[name] = old_cls;
+        var old_p = old_cls.prototype, new_p = new_cls.prototype;
+        var same = function (a, b) {
+            if (a === b) { return true; }
+            if (typeof a === 'function' && typeof b === 'function') {
+                var attrs_a = {}, attrs_b = {}, key;
+                for (key in a) { attrs_a[key] = a[key]; }
+                for (key in b) { attrs_b[key] = b[key]; }
+                return (a.toString() === b.toString() &&
+                        JSON.stringify(attrs_a) === JSON.stringify(attrs_b));
+            }
+            try { return JSON.stringify(a) === JSON.stringify(b); }
+            catch (err) { return false; }
+        };
+        var changed = [], i, j, key, names = Object.getOwnPropertyNames(new_p);
+        for (i=0; i<names.length; i++) {
+            key = names[i];
+            if (!old_p.hasOwnProperty(key) || !same(old_p[key], new_p[key])) {
+                old_p[key] = new_p[key];
+                changed.push(key);
+            }
+        }
+        names = Object.getOwnPropertyNames(old_p);
+        for (i=0; i<names.length; i++) {
+            if (!new_p.hasOwnProperty(names[i])) { delete old_p[names[i]]; }
+        }
+        // Update the instances, for members that they do not override
+        for (var id in this.instances) {
+            var ob = this.instances[id];
+            if (!old_p.isPrototypeOf(ob)) { continue; }
+            for (j=0; j<changed.length; j++) {
+                key = changed[j];
+                var val = old_p[key], p = Object.getPrototypeOf(ob);
+                while (!p.hasOwnProperty(key)) { p = Object.getPrototypeOf(p); }
+                if (p !== old_p || typeof val !== 'function') { continue; }
+                if (ob.__handlers__.indexOf(key) >= 0) {
+                    if (ob[key] && ob[key].dispose) { ob[key].dispose(); }
+                    ob[key] = ob.__create_Handler(val, key, val._connection_strings);
+                } else if (ob.__emitters__.indexOf(key) >= 0) {
+                    ob.__handlers[key] = ob.__handlers[key] || [];
+                    ob.__create_Emitter(val, key);
+                } else if (ob.__properties__.indexOf(key) >= 0) {
+                    var is_new = !ob.__handlers[key];
+                    ob.__handlers[key] = ob.__handlers[key] || [];
+                    ob['_' + key + '_func'] = val;
+                    ob['__create_' + val.emitter_type](key);
+                    if (is_new && val.default !== undefined) {
+                        ob._set_prop(key, val.default, true);
+                    }
+                } else if (ob.__computed__.indexOf(key) >= 0) {
+                    ob['_' + key + '_func'] = val;
+                    if (!ob.__handlers[key]) {
+                        ob.__handlers[key] = [];
+                        ob.__create_Computed(key);
+                    }
+                    ob.__computed_dirty[key] = false;
+                    ob._invalidate_computed(key);
+                } else if (!val.nobind) {
+                    ob[key] = val.bind(ob);
+                }
+            }
+        }
+        return changed;
+        """
+    
+    def command_binary(self, buffer):
+        """
+        // Execute a binary command received from the server. These are
+        // used to set array properties; the array is a view on the buffer.
+        if (buffer.buffer) {  // nodejs Buffer
+            buffer = buffer.buffer.slice(buffer.byteOffset,
+                                         buffer.byteOffset + buffer.byteLength);
+        }
+        var n = new DataView(buffer).getUint32(0, true);
+        var header = String.fromCharCode.apply(null, new Uint8Array(buffer, 4, n));
+        header = header.trim().split(' ');
+        if (header[0] == 'BATCH') {
+            // Commands of a transaction, apply them at once
+            var i = 4 + n;
+            for (var j=1; j<header.length; j++) {
+                var size = parseInt(header[j].slice(1));
+                var part = buffer.slice(i, i + size);
+                if (header[j][0] == 't') { this.command(this.decodeUtf8(part)); }
+                else { this.command_binary(part); }
+                i += size;
+            }
+            return;
+        }
+        var value = new window[header[header.length - 1]](buffer, 4 + n);
+        if (header[0] == 'SET_PROP') {
+            var ob = window.flexx.instances[header[1]];
+            if (ob && ob._set_prop) { ob._set_prop(header[2], value, false, true); }
+        } else {
+            window.console.warn('Invalid binary command: "' + header.join(' ') + '"');
+        }
+        """
+    
+    def pack_array_command(self, command, value):
+        """
+        // Pack a command and a TypedArray in a binary message (an ArrayBuffer)
+        var header = command + ' ' + value.constructor.name;
+        while ((header.length + 4) % 8) { header += ' '; }
+        var bytes = new Uint8Array(4 + header.length + value.byteLength);
+        new DataView(bytes.buffer).setUint32(0, header.length, true);
+        for (var i=0; i<header.length; i++) { bytes[4 + i] = header.charCodeAt(i); }
+        bytes.set(new Uint8Array(value.buffer, value.byteOffset, value.byteLength),
+                  4 + header.length);
+        return bytes.buffer;
+        """
+    
     def decodeUtf8(self, arrayBuffer):
         """
         var result = "",
@@ -7,6 +7,9 @@ than CPython and for some tests on par with Pypy.
 
 See also http://brythonista.wordpress.com/2015/03/28
 
+For headless benchmarks that can be compared against a baseline, see
+``python -m flexx.pyscript.benchmark``.
+
 """
 
 # Measured results, in pystones/second, measured on 05-03-2016,
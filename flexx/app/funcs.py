@@ -9,8 +9,9 @@ import json
 from .. import webruntime, config, set_log_level
 
 from . import model, logger
-from .model import Model
+from .model import Model, array_command_to_exec
 from .session import manager
+from .reloader import reloader
 from .tornadoserver import TornadoServer
 from ..event import _loop
 
@@ -43,14 +44,20 @@ def create_server(host=None, port=None, new_loop=False, backend='tornado'):
         new_loop (bool): Whether to create a fresh Tornado IOLoop instance,
             which is made current when ``start()`` is called. If ``False``
             (default) will use the current IOLoop for this thread.
-        backend (str): Stub argument; only Tornado is currently supported.
+        backend (str): The server backend to use. Can be 'tornado'
+            (default), 'asyncio' to run on an asyncio event loop, or
+            'uvloop' to run on asyncio using the uvloop event loop. With
+            the asyncio backends, ``new_loop`` applies to the asyncio
+            loop, and Flexx can run inside an existing asyncio application.
     
     Returns:
         server: The server object, see ``current_server()``.
     """
     global _current_server
-    if backend.lower() != 'tornado':
-        raise RuntimeError('Flexx server can only run on Tornado (for now).')
+    backend = backend.lower()
+    if backend not in ('tornado', 'asyncio', 'uvloop'):
+        raise RuntimeError('Flexx server backend must be "tornado", "asyncio" '
+                           'or "uvloop", not %r.' % backend)
     # Handle defaults
     if host is None:
         host = config.hostname
@@ -60,7 +67,12 @@ def create_server(host=None, port=None, new_loop=False, backend='tornado'):
     if _current_server:
         _current_server.close()
     # Start hosting
-    _current_server = TornadoServer(host, port, new_loop)
+    if backend == 'tornado':
+        _current_server = TornadoServer(host, port, new_loop)
+    else:
+        from .asyncioserver import AsyncioServer
+        _current_server = AsyncioServer(host, port, new_loop,
+                                        use_uvloop=(backend == 'uvloop'))
     # Schedule pending calls
     _current_server.call_later(0, _loop.loop.iter)
     while _pending_call_laters:
@@ -72,13 +84,15 @@ def create_server(host=None, port=None, new_loop=False, backend='tornado'):
 def current_server():
     """
     Get the current server object. Creates a server if there is none.
-    Currently, this is always a TornadoServer object, which has properties:
+    Currently, this is always a TornadoServer object (or an AsyncioServer,
+    which is a subclass), which has properties:
     
     * serving: a tuple ``(hostname, port)`` specifying the location
       being served (or ``None`` if the server is closed).
     * app: the ``tornado.web.Application`` instance
     * loop: the ``tornado.ioloop.IOLoop`` instance
     * server: the ``tornado.httpserver.HttpServer`` instance
+    * asyncio_loop: the asyncio event loop (AsyncioServer only)
     """
     if not _current_server:
         create_server()
@@ -229,7 +243,9 @@ class NoteBookHelper:
         self._commands = []
         display(Javascript('\n'.join(commands)))
     
-    def command(self, msg):
+    def command(self, msg, key=None):
+        if isinstance(msg, bytes):
+            msg = array_command_to_exec(msg)
         self._commands.append(msg)
 
 
@@ -311,6 +327,8 @@ def serve(cls, name=None, properties=None):
     # Note: this talks to the manager; it has nothing to do with the server
     assert isinstance(cls, type) and issubclass(cls, Model)
     manager.register_app_class(cls, name, properties or {})
+    if config.hot_reload:
+        reloader.watch(cls.__module__)
     return cls
 
 
@@ -419,5 +437,7 @@ class ExporterWebSocketDummy:
         # self.command('TITLE %s' % session._runtime_kwargs.get('title', 
         #                                                       'Exported flexx app'))
     
-    def command(self, cmd):
+    def command(self, cmd, key=None):
+        if isinstance(cmd, bytes):
+            cmd = array_command_to_exec(cmd)
         self._commands.append(cmd)
@@ -66,17 +66,19 @@ attributes and handlers can be created here.
 """
 
 import json
+import array
 import weakref
 import threading
 
-from .. import event
+from .. import event, config
 from ..event._hasevents import (with_metaclass, new_type, HasEventsMeta,
                                 finalize_hasevents_class)
-from ..event._emitters import Emitter
+from ..event._emitters import Emitter, ListProperty, get_typed_array_name
 from ..event._js import create_js_hasevents_class, HasEventsJS
-from ..pyscript import py2js, js_rename, window, Parser
+from ..pyscript import py2js, js_rename, window, undefined, Parser
 
-from .serialize import serializer
+from .serialize import (serializer, pack_array_command, unpack_array_command,
+                        unpack_batch_command)
 from . import logger
 
 reprs = json.dumps
@@ -131,10 +133,62 @@ def get_active_model():
         return models[-1]
 
 
+def get_list_diff(old, new):
+    """ Get the difference between two sequences as a single slice
+    replacement: returns (start, end, items), such that replacing
+    ``old[start:end]`` with ``items`` results in ``new``. This captures
+    appending, inserting, removing and replacing a range of elements.
+    """
+    n_old, n_new = len(old), len(new)
+    n = min(n_old, n_new)
+    i = 0
+    while i < n and (old[i] is new[i] or old[i] == new[i]):
+        i += 1
+    j = 0
+    while j < n - i and (old[n_old-1-j] is new[n_new-1-j] or
+                         old[n_old-1-j] == new[n_new-1-j]):
+        j += 1
+    return i, n_old - j, new[i:n_new-j]
+
+
+def array_command_to_exec(message):
+    """ Convert a binary message to set an array property into the
+    equivalent (but larger) text command. Used when the receiving end
+    does not support binary messages (e.g. the notebook or an export).
+    Binary batch messages are converted to a text batch message.
+    """
+    if message[4:10] == b'BATCH ':
+        commands = unpack_batch_command(message)
+        commands = [array_command_to_exec(command) if isinstance(command, bytes)
+                    else command for command in commands]
+        return 'BATCH ' + json.dumps(commands)
+    command, value = unpack_array_command(message)
+    _, id, name = command.split(' ')
+    txt = serializer.saves(value.tolist())
+    return 'EXEC flexx.instances.%s._set_prop_from_py(%s, %s);' % (
+        id, reprs(name), reprs(txt))
+
+
 def stub_emitter_func_py(self, *args):
     raise RuntimeError('This emitter can only be called from JavaScript')
 
 
+class LazyJSCode:
+    """ Descriptor for the JS code of a Model class, which generates the
+    code on first access.
+    """
+    
+    def __init__(self, cls):
+        self._cls = cls
+    
+    def __get__(self, instance, owner):
+        if owner is not self._cls.JS:
+            return self  # accessed via a subclass that is being created
+        del owner.CODE  # it should not be part of the generated code
+        owner.CODE = code = self._cls._get_js()
+        return code
+
+
 class ModelMeta(HasEventsMeta):
     """ Meta class for Model
     Set up proxy properties in Py/JS.
@@ -206,8 +260,12 @@ class ModelMeta(HasEventsMeta):
         cls.JS.__local_properties__ = [name for name in cls.JS.__properties__
                     if getattr(cls.JS, name) is not getattr(cls, name, None)]
         
-        # Set JS and CSS for this class
-        cls.JS.CODE = cls._get_js()
+        # Set JS and CSS for this class. If the assets are loaded from a
+        # manifest, the JS is generated only when it's needed.
+        if config.asset_manifest:
+            cls.JS.CODE = LazyJSCode(cls)
+        else:
+            cls.JS.CODE = cls._get_js()
         cls.CSS = cls.__dict__.get('CSS', '')
     
     def _get_js(cls):
@@ -374,6 +432,7 @@ class Model(with_metaclass(ModelMeta, event.HasEvents)):
         self.__event_types_js = event_types_js
         self.__pending_events_from_js = []
         self.__pending_props_from_js = []
+        self.__synced_lists = {}  # name -> last value of list props send to JS
         
         # Instantiate JavaScript version of this class
         clsname = 'flexx.classes.' + self.__class__.__name__
@@ -480,8 +539,7 @@ class Model(with_metaclass(ModelMeta, event.HasEvents)):
         # Sync attributes that are Model instances, and not properties
         event.HasEvents.__setattr__(self, name, value)
         if isinstance(value, Model):
-            if not (name in self.__properties__ or
-                    (name.endswith('_value') and name[1:-6] in self.__properties__)):
+            if name not in self.__properties__:
                 txt = serializer.saves(value)
                 cmd = 'flexx.instances.%s.%s = flexx.serializer.loads(%s);' % (
                     self._id, name, reprs(txt))
@@ -494,6 +552,39 @@ class Model(with_metaclass(ModelMeta, event.HasEvents)):
             call_later(0.01, self.__set_prop_from_js_pending)
         self.__pending_props_from_js.append((name, value))
     
+    def _set_array_prop_from_js(self, name, value):
+        # Called from session.py, value is an already unpacked array. Keep
+        # array.array values as such, so that equal values compare equal.
+        if (isinstance(getattr(self, name, None), array.array) and
+                not isinstance(value, array.array)):
+            value = array.array(value.dtype.char, value.tobytes())
+        if not self.__pending_props_from_js:
+            call_later(0.01, self.__set_prop_from_js_pending)
+        self.__pending_props_from_js.append((name, value))
+    
+    def _patch_prop_from_js(self, name, start, end, n_old, text):
+        # Called from session.py. The patch applies to the value that we
+        # will have after handling the pending values from JS.
+        base = getattr(self, name)
+        for pending_name, value in self.__pending_props_from_js:
+            if pending_name == name:
+                base = value
+        if base is None or len(base) != n_old:
+            # Out of sync (e.g. both sides changed the value); Python wins
+            self.__synced_lists.pop(name, None)
+            self.__sync_prop(name, getattr(self, name))
+            return
+        value = list(base[:start]) + serializer.loads(text) + list(base[end:])
+        if not self.__pending_props_from_js:
+            call_later(0.01, self.__set_prop_from_js_pending)
+        self.__pending_props_from_js.append((name, value))
+    
+    def _resync_prop_from_js(self, name):
+        # Called from session.py when JS could not apply a patch. Send
+        # the full value, so that later patches have a correct base.
+        self.__synced_lists.pop(name, None)
+        self.__sync_prop(name, getattr(self, name))
+    
     def __set_prop_from_js_pending(self):
         # Collect near-simultaneous prop settings in one handler call,
         # see __emit_from_js_pending
@@ -512,11 +603,34 @@ class Model(with_metaclass(ModelMeta, event.HasEvents)):
         ischanged = super()._set_prop(name, value, _initial)
         
         if ischanged and issyncable and not fromjs:
-            value = getattr(self, name)  # use normalized value
+            self.__sync_prop(name, getattr(self, name))  # use normalized value
+    
+    def __sync_prop(self, name, value):
+        # Pass a key so that a slow client only gets the latest value
+        key = 'prop %s %s' % (self._id, name)
+        if isinstance(getattr(self.__class__, name), ListProperty):
+            # Send only the difference with the last synced value. Patches
+            # depend on their predecessor, so these cannot be coalesced.
+            key = None
+            synced = self.__synced_lists.get(name, None)
+            self.__synced_lists[name] = value
+            if synced is not None and value is not None:
+                start, end, items = get_list_diff(synced, value)
+                if len(items) * 2 <= len(value):
+                    txt = serializer.saves(list(items))
+                    cmd = 'flexx.instances.%s._patch_prop_from_py(%s, %i, %i, %i, %s);'
+                    self._session._exec(cmd % (self._id, reprs(name), start, end,
+                                               len(synced), reprs(txt)))
+                    return
+        if get_typed_array_name(value):
+            # Send arrays as binary data
+            cmd = pack_array_command('SET_PROP %s %s' % (self._id, name), value)
+            self._session._send_command(cmd, key)
+        else:
             txt = serializer.saves(value)
             cmd = 'flexx.instances.%s._set_prop_from_py(%s, %s);' % (
                 self._id, reprs(name), reprs(txt))
-            self._session._exec(cmd)
+            self._session._exec(cmd, key)
     
     def _register_handler(self, *args):
         event_type = args[0].split(':')[0].strip('!')
@@ -551,7 +665,14 @@ class Model(with_metaclass(ModelMeta, event.HasEvents)):
             self.emit(type, ev, True)
     
     def emit(self, type, info=None, fromjs=False):
+        if fromjs and event.transaction().active:
+            # Defer here, so that the event is not echoed back to JS
+            info = {} if info is None else info
+            event.transaction()._add_event(self, type, info, fromjs=True)
+            return None
         ev = super().emit(type, info)
+        if ev is None:
+            return  # in a transaction; emitted (and send to JS) later
         isprop = type in self.__properties__ and type not in self.__local_properties__
         if not fromjs and not isprop and type in self.__event_types_js:
             cmd = 'flexx.instances.%s._emit_from_py(%s, %r);' % (
@@ -583,6 +704,7 @@ class Model(with_metaclass(ModelMeta, event.HasEvents)):
             self.__event_types_py = py_events if py_events else []
             
             self._sync_props = True
+            self.__py_values = {}  # last values of list props received from py
             
             # Init HasEvents, but delay initialization of handlers
             super().__init__(False)
@@ -612,8 +734,36 @@ class Model(with_metaclass(ModelMeta, event.HasEvents)):
         
         def _set_prop_from_py(self, name, text):
             value = window.flexx.serializer.loads(text)
+            self.__py_values[name] = value
+            self._set_prop(name, value, False, True)
+        
+        def _patch_prop_from_py(self, name, start, end, n_old, text):
+            # Apply the patch to the last value of this list prop received
+            # from Python, which is what the patch is relative to.
+            base = self.__py_values[name]
+            if base is undefined or len(base) != n_old:
+                # Out of sync, ask Python for the full value
+                if window.flexx.ws:
+                    window.flexx.ws.send('RESYNC_PROP ' + [self.id, name].join(' '))
+                return
+            items = window.flexx.serializer.loads(text)
+            value = base.slice(0, start).concat(items, base.slice(end))
+            self.__py_values[name] = value
             self._set_prop(name, value, False, True)
         
+        def _get_list_diff(self, old, new_):
+            # JS version of get_list_diff(), but elements are compared by
+            # identity; deep comparisons are expensive, e.g. for Models.
+            n_old, n_new = len(old), len(new_)
+            n = min(n_old, n_new)
+            i = 0
+            while i < n and old[i] is new_[i]:
+                i += 1
+            j = 0
+            while j < n - i and old[n_old-1-j] is new_[n_new-1-j]:
+                j += 1
+            return i, n_old - j, new_[i:n_new-j]
+        
         def _set_prop(self, name, value, _initial=False, frompy=False):
             
             # Note: there is quite a bit of _pyfunc_truthy in the ifs here
@@ -625,10 +775,27 @@ class Model(with_metaclass(ModelMeta, event.HasEvents)):
                 super()._set_prop(name, value, _initial)
                 return
             
+            old = self['_' + name + '_value']
             ischanged = super()._set_prop(name, value, _initial)
             
             if ischanged and issyncable:
                 value = self[name]
+                if window.ArrayBuffer.isView(value):
+                    cmd = 'SET_PROP ' + [self.id, name].join(' ')
+                    window.flexx.ws.send(window.flexx.pack_array_command(cmd, value))
+                    return
+                elif self['_' + name + '_func'].emitter_type == 'ListProperty':
+                    # Send only the difference with what Python has
+                    base = self.__py_values[name] if frompy else old
+                    if base and value:
+                        start, end, items = self._get_list_diff(base, value)
+                        if start == end and len(items) == 0:
+                            return  # Python already has this value
+                        elif len(items) * 2 <= len(value):
+                            txt = window.flexx.serializer.saves(items)
+                            parts = [self.id, name, start, end, len(base), txt]
+                            window.flexx.ws.send('PATCH_PROP ' + parts.join(' '))
+                            return
                 txt = window.flexx.serializer.saves(value)
                 window.flexx.ws.send('SET_PROP ' + [self.id, name, txt].join(' '))
         
@@ -0,0 +1,192 @@
+"""
+Hot reloading of Model classes, for use during development.
+"""
+
+import os
+import sys
+import json
+import time
+import importlib
+
+from . import model, logger
+from .model import ModelMeta, get_model_classes
+from .assetstore import assets
+from .session import manager
+
+
+HOT_SWAP_TEMPLATE = """flexx.hot_swap(%s, function () {
+%s
+});
+"""
+
+
+class Reloader:
+    """ Reloads the modules that define Model classes when their source
+    file changes, and updates the connected sessions without reloading
+    the page. There is one instance in ``flexx.app.reloader``.
+    
+    The watched files are checked every ``interval`` seconds. When a
+    module is reloaded, the JS of its Model classes is generated again.
+    Because the transpiled code of each function is cached, only the
+    functions that changed are actually transpiled. The classes for
+    which the JS has changed are sent to the sessions that use them,
+    where the existing class is patched in-place. The existing instances
+    (and instances of subclasses) thereby use the new methods, handlers,
+    properties and emitters. Things that happen at initialization,
+    like setting the initial value of existing properties, do not
+    happen again.
+    
+    .. code-block:: python
+        
+        app.reloader.watch('myapp.widgets')
+    
+    To watch the modules of all served apps, set the ``hot_reload``
+    config option (e.g. ``--flexx-hot-reload=true``).
+    
+    Note that this only updates the JS side of existing instances. In
+    Python, they keep using the old class, while new instances use the
+    new class. A module that is run as a script (``__main__``) cannot
+    be reloaded.
+    """
+    
+    def __init__(self):
+        self.interval = 0.25
+        self._mtimes = {}  # module name -> mtime of its file
+        self._scheduled = False
+    
+    def get_watched_modules(self):
+        """ Get a list of the names of the modules that are watched.
+        """
+        return list(sorted(self._mtimes))
+    
+    def watch(self, module_name):
+        """ Start watching the module with the given name.
+        """
+        module = sys.modules.get(module_name, None)
+        if module is None:
+            raise ValueError('Cannot watch unknown module %r.' % module_name)
+        if module_name == '__main__' or not getattr(module, '__file__', None):
+            logger.warn('Cannot watch module %r, because it cannot be '
+                        'reloaded.' % module_name)
+            return
+        if module_name not in self._mtimes:
+            self._mtimes[module_name] = self._get_mtime(module)
+        self._schedule()
+    
+    def unwatch(self, module_name):
+        """ Stop watching the module with the given name.
+        """
+        self._mtimes.pop(module_name, None)
+    
+    def _get_mtime(self, module):
+        try:
+            return os.path.getmtime(module.__file__)
+        except (AttributeError, OSError):
+            return None
+    
+    def _schedule(self):
+        if self._mtimes and not self._scheduled:
+            self._scheduled = True
+            model.call_later(self.interval, self._iter)
+    
+    def _iter(self):
+        # Called from the event loop
+        self._scheduled = False
+        try:
+            self.check()
+        finally:
+            self._schedule()
+    
+    def check(self):
+        """ Reload the watched modules whose file has changed. Returns
+        a list with the names of the classes that were hot-swapped.
+        """
+        swapped = []
+        for module_name, mtime in list(self._mtimes.items()):
+            module = sys.modules.get(module_name, None)
+            new_mtime = self._get_mtime(module)
+            if new_mtime != mtime:
+                self._mtimes[module_name] = new_mtime
+                swapped.extend(self.reload_module(module_name))
+        return swapped
+    
+    def reload_module(self, module_name):
+        """ Reload the given module and hot-swap its Model classes in
+        the sessions. Returns a list with the names of the classes that
+        were hot-swapped. If the module cannot be reloaded (e.g. due to
+        a syntax error), the error is logged, and the old classes are
+        kept.
+        """
+        t0 = time.time()
+        module = sys.modules[module_name]
+        old_classes = [c for c in get_model_classes() if c.__module__ == module_name]
+        
+        try:
+            importlib.reload(module)
+        except Exception as err:
+            logger.error('Could not reload %s: %s: %s' %
+                         (module_name, err.__class__.__name__, err))
+            ModelMeta.CLASSES[:] = [c for c in ModelMeta.CLASSES
+                                    if c.__module__ != module_name or c in old_classes]
+            return []
+        
+        # Swap classes that have a new version
+        swapped = []
+        old_classes_by_name = dict((c.__name__, c) for c in old_classes)
+        for cls in get_model_classes():
+            old_cls = old_classes_by_name.get(cls.__name__, None)
+            if cls.__module__ == module_name and old_cls not in (None, cls):
+                if self._swap_class(old_cls, cls):
+                    swapped.append(cls.__name__)
+        
+        # Update the module asset for new sessions
+        module_names = set()
+        for cls in old_classes:
+            module_names.add(assets.get_module_name_for_model_class(cls))
+        for name in module_names:
+            if name:
+                assets.update_module_assets(name)
+        
+        logger.info('Reloaded %s in %0.0f ms, hot-swapped %i classes' %
+                    (module_name, (time.time() - t0) * 1000, len(swapped)))
+        return swapped
+    
+    def _swap_class(self, old_cls, new_cls):
+        """ Replace the old class with the new class in the app manager
+        and the sessions. Returns whether the JS or CSS has changed.
+        """
+        ModelMeta.CLASSES.remove(old_cls)
+        
+        js = css = ''
+        if new_cls.JS.CODE != old_cls.JS.CODE:
+            js = HOT_SWAP_TEMPLATE % (json.dumps(new_cls.__name__), new_cls.JS.CODE)
+        if new_cls.CSS != old_cls.CSS:
+            css = new_cls.CSS
+        
+        for app_name, appinfo in list(manager._appinfo.items()):
+            cls, properties, pending, connected = appinfo
+            if cls is old_cls:
+                manager._appinfo[app_name] = new_cls, properties, pending, connected
+            for session in pending + connected:
+                self._swap_class_in_session(session, old_cls, new_cls, js, css)
+        
+        return bool(js or css)
+    
+    def _swap_class_in_session(self, session, old_cls, new_cls, js, css):
+        if old_cls not in session._known_classes:
+            return
+        session._known_classes.discard(old_cls)
+        session._known_classes.add(new_cls)
+        if session._extra_model_classes and old_cls in session._extra_model_classes:
+            # Not served yet
+            index = session._extra_model_classes.index(old_cls)
+            session._extra_model_classes[index] = new_cls
+        elif session._served:
+            if js:
+                session._load_asset_dynamically('.js', js)
+            if css:
+                session._load_asset_dynamically('.css', css)
+
+
+# Our singleton reloader
+reloader = Reloader()
@@ -4,6 +4,10 @@ code is PyScript compatible; so it can also be used in JS.
 """
 
 import json
+import array
+import struct
+
+from ..event._emitters import get_typed_array_name
 
 undefined = None
 
@@ -60,3 +64,84 @@ class Serializer:
 
 
 serializer = Serializer()
+
+
+## Binary messages for arrays
+
+# Binary messages consist of a 4-byte header size, the header (a command
+# that ends with the name of the TypedArray, padded with spaces so that
+# the data is 8-byte aligned), and the raw array data.
+
+_ARRAY_TYPECODES = {'Int8Array': 'b', 'Uint8Array': 'B',
+                    'Int16Array': 'h', 'Uint16Array': 'H',
+                    'Int32Array': 'i', 'Uint32Array': 'I',
+                    'Float32Array': 'f', 'Float64Array': 'd'}
+
+
+def pack_array_command(command, value):
+    """ Pack the given command and (numpy or ``array.array``) array into
+    a binary message. The array data is not converted, but joined
+    directly from its memory buffer.
+    """
+    typename = get_typed_array_name(value)
+    if typename is None:
+        raise TypeError('Cannot pack array of type %r' % type(value))
+    header = (command + ' ' + typename).encode()
+    header += b' ' * (-(len(header) + 4) % 8)
+    data = memoryview(value).cast('B')
+    return b''.join([struct.pack('<I', len(header)), header, data])
+
+
+def unpack_array_command(message):
+    """ Unpack a binary message. Returns the command and the array. The
+    array is a numpy array that shares memory with the message, or an
+    ``array.array`` if numpy is not available.
+    """
+    n = struct.unpack('<I', message[:4])[0]
+    command, typename = message[4:4+n].decode().strip().rsplit(' ', 1)
+    typecode = _ARRAY_TYPECODES[typename]
+    data = memoryview(message)[4+n:]
+    try:
+        import numpy as np
+    except ImportError:
+        pass
+    else:
+        return command, np.frombuffer(data, np.dtype(typecode))
+    arr = array.array(typecode)
+    arr.frombytes(data.tobytes())
+    return command, arr
+
+
+def pack_batch_command(commands):
+    """ Pack the given list of commands, which can be text or binary
+    messages, into a single binary message, so that the receiving end
+    can apply them at once.
+    """
+    parts = []
+    kinds = []
+    for command in commands:
+        if isinstance(command, bytes):
+            kinds.append('b%i' % len(command))
+        else:
+            command = command.encode()
+            kinds.append('t%i' % len(command))
+        parts.append(command)
+    header = ('BATCH ' + ' '.join(kinds)).encode()
+    header += b' ' * (-(len(header) + 4) % 8)
+    return b''.join([struct.pack('<I', len(header)), header] + parts)
+
+
+def unpack_batch_command(message):
+    """ Unpack a binary message created with ``pack_batch_command()``.
+    Returns the list of commands.
+    """
+    n = struct.unpack('<I', message[:4])[0]
+    kinds = message[4:4+n].decode().split()[1:]
+    commands = []
+    i = 4 + n
+    for kind in kinds:
+        size = int(kind[1:])
+        part = message[i:i+size]
+        commands.append(part.decode() if kind[0] == 't' else part)
+        i += size
+    return commands
@@ -2,10 +2,13 @@
 Definition of App class and the app manager.
 """
 
+import json
 import time
+from collections import OrderedDict
 
 from .. import event
 from .model import Model, new_type
+from .serialize import unpack_array_command, pack_batch_command
 from .assetstore import SessionAssets
 from . import logger
 
@@ -248,6 +251,9 @@ class Session(SessionAssets):
         # commands, which are send to the client as soon as it connects
         self._pending_commands = []
         
+        # Commands collected during a transaction (key -> command)
+        self._batch = None
+        
         # Objects that are guarded from deletion: id: (ping_count, instance)
         self._instances_guarded = {}
         
@@ -292,8 +298,8 @@ class Session(SessionAssets):
         # self._ws.command('ICON %s.ico' % self.id)
         # self._ws.command('TITLE %s' % self._config.title)
         # Send pending commands
-        for command in self._pending_commands:
-            self._ws.command(command)
+        for command, key in self._pending_commands:
+            self._ws.command(command, key)
    
     def _set_app(self, model):
         if self._model is not None:
@@ -328,6 +334,16 @@ class Session(SessionAssets):
         finally:
             self._closing = False
     
+    @property
+    def send_queue_info(self):
+        """ A dict with metrics about the messages that are queued to be
+        send to the client, see ``WSHandler.send_queue_info``. Before the
+        client connects, only the depth is available.
+        """
+        if self._ws is None:
+            return dict(depth=len(self._pending_commands))
+        return getattr(self._ws, 'send_queue_info', dict(depth=0))
+    
     @property
     def status(self):
         """ The status of this session. The lifecycle for each session is:
@@ -343,19 +359,45 @@ class Session(SessionAssets):
         else:
             return self.STATUS.CLOSED  # connection closed
     
-    def _send_command(self, command):
-        """ Send the command, add to pending queue.
+    def _send_command(self, command, key=None):
+        """ Send the command, add to pending queue. If a key is given,
+        the command may be superseded by a later command with the same key
+        while it is waiting in the queue of a slow client.
         """
         if self._closing:
             pass
+        elif self._batch is not None or event.transaction().active:
+            self._add_to_batch(command, key)
         elif self.status == self.STATUS.CONNECTED:
-            self._ws.command(command)
+            self._ws.command(command, key)
         elif self.status == self.STATUS.PENDING:
-            self._pending_commands.append(command)
+            self._pending_commands.append((command, key))
         else:
             #raise RuntimeError('Cannot send commands; app is closed')
             logger.warn('Cannot send commands; app is closed')
     
+    def _add_to_batch(self, command, key):
+        # Collect the command until the transaction ends. A command with
+        # a key supersedes an earlier command with the same key, and takes
+        # its place, so that it is not send after later commands.
+        if self._batch is None:
+            self._batch = OrderedDict()
+            event.transaction()._call_on_exit(self._send_batch)
+        if key is None:
+            key = len(self._batch), None
+        self._batch[key] = command
+    
+    def _send_batch(self):
+        # Send the commands collected during a transaction as one message
+        commands = list(self._batch.values())
+        self._batch = None
+        if len(commands) == 1:
+            self._send_command(commands[0])
+        elif any(isinstance(command, bytes) for command in commands):
+            self._send_command(pack_batch_command(commands))
+        elif commands:
+            self._send_command('BATCH ' + json.dumps(commands))
+    
     def _receive_command(self, command):
         """ Received a command from JS.
         """
@@ -377,6 +419,16 @@ class Session(SessionAssets):
             ob = Model._instances.get(id, None)
             if ob is not None:
                 ob._set_prop_from_js(name, txt)
+        elif command.startswith('PATCH_PROP '):
+            _, id, name, start, end, n_old, txt = command.split(' ', 6)
+            ob = Model._instances.get(id, None)
+            if ob is not None:
+                ob._patch_prop_from_js(name, int(start), int(end), int(n_old), txt)
+        elif command.startswith('RESYNC_PROP '):
+            _, id, name = command.split(' ', 2)
+            ob = Model._instances.get(id, None)
+            if ob is not None:
+                ob._resync_prop_from_js(name)
         elif command.startswith('SET_EVENT_TYPES '):
             _, id, txt = command.split(' ', 3)
             ob = Model._instances.get(id, None)
@@ -390,6 +442,19 @@ class Session(SessionAssets):
         else:
             logger.warn('Unknown command received from JS:\n%s' % command)
     
+    def _receive_binary_command(self, message):
+        """ Received a binary command from JS. Only used to set array
+        properties.
+        """
+        command, value = unpack_array_command(message)
+        if command.startswith('SET_PROP '):
+            _, id, name = command.split(' ')
+            ob = Model._instances.get(id, None)
+            if ob is not None:
+                ob._set_array_prop_from_js(name, value)
+        else:
+            logger.warn('Unknown binary command received from JS:\n%s' % command)
+    
     def keep_alive(self, ob, iters=4):
         """ Keep an object alive for a certain amount of time, expressed
         in Python-JS ping roundtrips. This is intended for making Model
@@ -412,10 +477,10 @@ class Session(SessionAssets):
         for ob in objects_to_clear:
             self._instances_guarded.pop(id(ob))
     
-    def _exec(self, code):
+    def _exec(self, code, key=None):
         """ Like eval, but without returning the result value.
         """
-        self._send_command('EXEC ' + code)
+        self._send_command('EXEC ' + code, key)
     
     def eval(self, code):
         """ Evaluate the given JavaScript code in the client
@@ -1,12 +1,13 @@
 import os
 import sys
+import gzip
 import tempfile
 import shutil
 
 from flexx.util.testing import run_tests_if_main, raises
 
 from flexx.app.assetstore import assets, AssetStore, SessionAssets
-from flexx.app.assetstore import lookslikeafilename
+from flexx.app.assetstore import lookslikeafilename, minify
 
 from flexx import ui, app
 
@@ -104,6 +105,53 @@ def test_asset_store_export():
     raises(ValueError, s.export, os.path.join(dir, 'doesnotexist'))
 
 
+def test_minify():
+    
+    code = 'var foo = function () {\n    return 3;  \n\n};\n'
+    assert minify(code) == 'var foo = function () {\nreturn 3;\n};\n'
+    
+    # Strings that continue on the next line are left alone
+    code = '    var x = "foo \\\n    bar";\n'
+    assert minify(code) == 'var x = "foo \\\n    bar";\n'
+
+
+def test_asset_store_build():
+    
+    dir = os.path.join(tempfile.gettempdir(), 'flexx_build')
+    if os.path.isdir(dir):
+        shutil.rmtree(dir)
+    
+    s = AssetStore()
+    s.add_asset('foo.js', b'var x = 3;\n\n    var y = 4;\n')
+    s.add_asset('foo.png', b'\x00\n\n')
+    s.create_module_assets('flexx.app')
+    filename = s.build(dir)
+    assert filename == os.path.join(dir, 'manifest.json')
+    assert len(os.listdir(dir)) == 1 + 2 * 5  # plus gzipped versions
+    
+    # Load in a new store
+    s2 = AssetStore()
+    s2.load_manifest(filename)
+    assert s2.get_asset_names() == s.get_asset_names()
+    assert s2.load_asset('foo.js') == b'var x = 3;\nvar y = 4;\n'  # minified
+    assert s2.load_asset('foo.png') == b'\x00\n\n'  # not minified
+    assert gzip.decompress(s2.load_compressed_asset('foo.js')) == b'var x = 3;\nvar y = 4;\n'
+    assert s2.load_compressed_asset('reset.css')
+    assert s.load_compressed_asset('foo.js') is None
+    
+    # The built assets are used instead of new assets
+    s2.add_asset('foo.js', b'var x = 5;\n')
+    assert s2.load_asset('foo.js') == b'var x = 3;\nvar y = 4;\n'
+    s2.create_module_assets('flexx.app', js='var x = 5;\n')
+    assert b'var x = 5' not in s2.load_asset('flexx-app.js')
+    assert s2.get_module_name_for_model_class(app.Model) == 'flexx.app'
+    
+    # Filenames include the hash
+    for fname in os.listdir(dir):
+        if fname.startswith('foo.') and fname.endswith('.js'):
+            assert len(fname) == len('foo..js') + 16
+
+
 def test_cache_submodules():
     
     s = AssetStore()
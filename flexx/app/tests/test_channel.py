@@ -0,0 +1,99 @@
+""" Test broadcasting over channels.
+"""
+
+from flexx import app, event
+from flexx.app import FlexxJS
+from flexx.pyscript import evaljs
+from flexx.pyscript.stdlib import get_full_std_lib
+
+from flexx.util.testing import run_tests_if_main, raises
+
+
+class ChannelMember(app.Model):
+    pass
+
+
+def test_channel():
+    
+    channel = app.Channel('test')
+    assert channel.name == 'test'
+    assert 'test' in repr(channel)
+    with raises(ValueError):
+        app.Channel('has space')
+    with raises(ValueError):
+        app.Channel(3)
+    
+    s1, s2, s3 = app.Session('test'), app.Session('test'), app.Session('test')
+    with ChannelMember(session=s1) as m1:
+        pass
+    with ChannelMember(session=s2) as m2:
+        pass
+    with ChannelMember(session=s2) as m3:
+        pass
+    with ChannelMember(session=s3) as m4:
+        pass
+    for s in (s1, s2, s3):
+        s._pending_commands[:] = []
+    
+    channel.subscribe(m1)
+    channel.subscribe(m2)
+    channel.subscribe(m3)
+    channel.subscribe(m3)  # no-op
+    assert set(channel.sessions) == set([s1, s2])
+    assert len(s1._pending_commands) == 1
+    assert len(s2._pending_commands) == 2
+    assert 'flexx.subscribe("test", "%s")' % m1.id in s1._pending_commands[0][0]
+    s1._pending_commands[:] = []
+    s2._pending_commands[:] = []
+    
+    # The same command is send once to each session
+    channel.broadcast('foo', dict(x=3))
+    assert len(s1._pending_commands) == 1
+    assert len(s2._pending_commands) == 1
+    assert len(s3._pending_commands) == 0
+    cmd = s1._pending_commands[0][0]
+    assert cmd == 'BROADCAST test foo {"x": 3}'
+    assert s2._pending_commands[0][0] is cmd
+    
+    with raises(ValueError):
+        channel.broadcast('foo bar')
+    
+    # Unsubscribe
+    channel.unsubscribe(m1)
+    channel.unsubscribe(m2)
+    assert channel.sessions == [s2]
+    assert 'flexx.unsubscribe(' in s1._pending_commands[-1][0]
+    
+    # Closed sessions are dropped
+    s2.close()
+    s2._ws = type('FakeWS', (), {'close_code': 1000})()
+    channel.broadcast('foo', dict(x=4))
+    assert channel.sessions == []
+    
+    s1.close()
+    s3.close()
+
+
+def test_channel_js():
+    
+    code = get_full_std_lib() + FlexxJS + '''
+    var r = [];
+    var window = {flexx: {serializer: {loads: JSON.parse}}};
+    var emit = function (type, ev, frompy) { r.push(this.id + type + ev.x + frompy); };
+    var flexx = {channels: {}, instances: {a: {id: 'a', emit: emit},
+                                           b: {id: 'b', emit: emit},
+                                           c: 'disposed'}};
+    FlexxJS.prototype.subscribe.call(flexx, 'test', 'a');
+    FlexxJS.prototype.subscribe.call(flexx, 'test', 'b');
+    FlexxJS.prototype.subscribe.call(flexx, 'test', 'b');
+    FlexxJS.prototype.subscribe.call(flexx, 'test', 'c');
+    FlexxJS.prototype.subscribe.call(flexx, 'other', 'a');
+    FlexxJS.prototype.broadcast.call(flexx, 'test foo {"x": 3}');
+    FlexxJS.prototype.unsubscribe.call(flexx, 'test', 'a');
+    FlexxJS.prototype.broadcast.call(flexx, 'test bar {"x": 4}');
+    r.join(' ');
+    '''
+    assert evaljs(code) == 'afoo3true bfoo3true bbar4true'
+
+
+run_tests_if_main()
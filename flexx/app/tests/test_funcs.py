@@ -4,6 +4,8 @@ import time
 import threading
 import multiprocessing
 
+import pytest
+
 from tornado.ioloop import IOLoop
 
 from flexx import app, event
@@ -326,6 +328,70 @@ def test_flexx_in_thread5():
     assert res == [3]
 
 
+def test_asyncio_backend():
+    """ Test running the server on an asyncio event loop.
+    """
+    asyncio = pytest.importorskip('asyncio')
+    res = []
+    
+    with raises(RuntimeError):
+        app.create_server(backend='notabackend')
+    
+    server = app.create_server(new_loop=True, backend='asyncio')
+    assert server.serving
+    assert isinstance(server.asyncio_loop, asyncio.AbstractEventLoop)
+    
+    def add_res(i):
+        res.append(i)
+    
+    def main():
+        app.call_later(0, add_res, 1)
+        app.call_later(0.01, add_res, 2)
+        app.call_later(0.1, app.stop)
+        app.start()
+        assert server.loop is IOLoop.current()
+        res.append(3)
+    
+    t = threading.Thread(target=main)
+    t.start()
+    t.join()
+    
+    assert res == [1, 2, 3]
+    
+    # Restore a normal server for the tests that follow
+    IOLoop().make_current()
+    app.create_server()
+
+
+def test_asyncio_backend_embedded():
+    """ Test using the asyncio backend from within a running asyncio loop.
+    """
+    asyncio = pytest.importorskip('asyncio')
+    res = []
+    
+    aio_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(aio_loop)
+    try:
+        server = app.create_server(backend='asyncio')
+        assert server.asyncio_loop is aio_loop
+        
+        def inside():
+            app.start()  # loop is already running, so this returns
+            res.append(1)
+            app.call_later(0, res.append, 2)
+            app.call_later(0.01, aio_loop.stop)
+        
+        aio_loop.call_soon(inside)
+        aio_loop.run_forever()
+        assert res == [1, 2]
+        server.close()
+    finally:
+        asyncio.set_event_loop(None)
+        aio_loop.close()
+        IOLoop().make_current()
+        app.create_server()
+
+
 def multiprocessing_func():
     import flexx
     app.create_server(port=0)  # Explicitly ask for unused port
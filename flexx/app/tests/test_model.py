@@ -3,13 +3,20 @@
 
 from flexx.util.testing import run_tests_if_main, raises
 
-import weakref
 import gc
+import json
+import array
+import weakref
 import logging
 import tornado
 
-from flexx.app.model import Model, _get_active_models
-from flexx import event, app
+from flexx.app.model import Model, _get_active_models, array_command_to_exec
+from flexx.app.serialize import unpack_array_command
+from flexx.app import serialize
+from flexx.app import model
+from flexx.pyscript import py2js, evaljs
+from flexx.pyscript.stdlib import get_std_info, get_partial_std_lib
+from flexx import event, app, config
 
 class Foo1(Model):
     
@@ -92,6 +99,209 @@ class Foo7(Model):
         self.bar = bar
 
 
+class Foo8(Model):
+    
+    class Both:
+        
+        @event.arrayprop
+        def data(self, v=()):
+            return v
+
+
+def test_array_props():
+    
+    session = app.Session('test')
+    m = Foo8(session=session)
+    assert len(m.data) == 0
+    session._pending_commands[:] = []
+    
+    m.data = array.array('f', [1, 2, 3])
+    
+    # Arrays are send as binary messages, keyed so they can be coalesced
+    assert len(session._pending_commands) == 1
+    cmd, key = session._pending_commands[0]
+    assert isinstance(cmd, bytes)
+    assert key == 'prop %s data' % m.id
+    command, value = unpack_array_command(cmd)
+    assert command == 'SET_PROP %s data' % m.id
+    assert list(value) == [1, 2, 3]
+    
+    # Can be converted to a text command for the notebook and exports
+    text = array_command_to_exec(cmd)
+    assert text.startswith('EXEC flexx.instances.%s._set_prop_from_py(' % m.id)
+    assert '[1.0, 2.0, 3.0]' in text
+    
+    # When the value comes back from JS, its the same type and thus equal
+    m._set_array_prop_from_js('data', value)
+    m._Model__set_prop_from_js_pending()
+    assert isinstance(m.data, array.array)
+    assert len(session._pending_commands) == 1
+    
+    session.close()
+
+
+class Foo9(Model):
+    
+    class Both:
+        
+        @event.listprop
+        def items(self, v=()):
+            return tuple(v)
+
+
+def test_get_list_diff():
+    
+    for get_list_diff in (model.get_list_diff, get_list_diff_js):
+        assert tuple(get_list_diff([1, 2, 3], [1, 2, 3])) == (3, 3, [])
+        assert tuple(get_list_diff([1, 2, 3], [1, 2, 3, 4])) == (3, 3, [4])
+        assert tuple(get_list_diff([1, 2, 3], [0, 1, 2, 3])) == (0, 0, [0])
+        assert tuple(get_list_diff([1, 2, 3], [1, 3])) == (1, 2, [])
+        assert tuple(get_list_diff([1, 2, 3], [1, 5, 6, 3])) == (1, 2, [5, 6])
+        assert tuple(get_list_diff([1, 1], [1, 1, 1])) == (2, 2, [1])
+        assert tuple(get_list_diff([], [1, 2])) == (0, 0, [1, 2])
+
+
+def get_list_diff_js(old, new):
+    code = py2js(Model.JS._get_list_diff, 'diff')
+    code += 'JSON.stringify(diff(%s, %s));' % (json.dumps(old), json.dumps(new))
+    nargs, function_deps, method_deps = get_std_info(code)
+    code = get_partial_std_lib(function_deps, method_deps, []) + code
+    return json.loads(evaljs(code))
+
+
+def test_list_props():
+    
+    session = app.Session('test')
+    m = Foo9(session=session)
+    session._pending_commands[:] = []
+    
+    # First time the full value is send
+    m.items = list(range(10))
+    assert len(session._pending_commands) == 1
+    cmd, key = session._pending_commands.pop(0)
+    assert '_set_prop_from_py(' in cmd
+    assert key is None  # patches cannot be coalesced
+    
+    # Then only the difference
+    m.items = list(range(11))
+    cmd, key = session._pending_commands.pop(0)
+    assert cmd.endswith('_patch_prop_from_py("items", 10, 10, 10, "[10]");')
+    m.items = m.items[:3] + ('x', ) + m.items[3:]
+    cmd, key = session._pending_commands.pop(0)
+    assert cmd.endswith('_patch_prop_from_py("items", 3, 3, 11, "[\\"x\\"]");')
+    
+    # Unless the difference is large
+    m.items = ['a', 'b']
+    cmd, key = session._pending_commands.pop(0)
+    assert '_set_prop_from_py(' in cmd
+    
+    # Patches from JS
+    m._patch_prop_from_js('items', 1, 1, 2, '[1, 2]')
+    m._patch_prop_from_js('items', 4, 4, 4, '[3]')
+    m._Model__set_prop_from_js_pending()
+    assert m.items == ('a', 1, 2, 'b', 3)
+    assert len(session._pending_commands) == 0
+    
+    # Patch that does not match, Python sends its value
+    m._patch_prop_from_js('items', 1, 1, 2, '[1, 2]')
+    assert len(session._pending_commands) == 1
+    cmd, key = session._pending_commands.pop(0)
+    assert '_set_prop_from_py(' in cmd
+    
+    # JS could not apply a patch, Python sends its value and patches again
+    session._receive_command('RESYNC_PROP %s items' % m.id)
+    cmd, key = session._pending_commands.pop(0)
+    assert '_set_prop_from_py(' in cmd
+    m.items = m.items + (4, )
+    cmd, key = session._pending_commands.pop(0)
+    assert '_patch_prop_from_py(' in cmd
+    
+    session.close()
+
+
+def test_transaction():
+    
+    session = app.Session('test')
+    m1 = Foo5(session=session)
+    m2 = Foo8(session=session)
+    session._pending_commands[:] = []
+    
+    # Text commands are combined in one text message
+    with event.transaction():
+        m1.red = 1
+        m1.red = 2  # supersedes the former
+        m1.call_js('foo()')
+        assert len(session._pending_commands) == 0
+    assert len(session._pending_commands) == 1
+    cmd, key = session._pending_commands.pop(0)
+    assert cmd.startswith('BATCH ')
+    commands = json.loads(cmd[6:])
+    assert len(commands) == 2
+    assert commands[0].endswith('_set_prop_from_py("red", "3");')
+    assert commands[1].endswith('.foo();')
+    
+    # With arrays, they are packed in a binary message
+    with event.transaction():
+        m1.red = 4
+        m2.data = array.array('f', [1, 2, 3])
+    cmd, key = session._pending_commands.pop(0)
+    assert isinstance(cmd, bytes)
+    commands = serialize.unpack_batch_command(cmd)
+    assert len(commands) == 2
+    assert commands[0].endswith('_set_prop_from_py("red", "5");')
+    command, value = unpack_array_command(commands[1])
+    assert list(value) == [1, 2, 3]
+    
+    # Which can be converted to a text batch for the notebook and exports
+    text = array_command_to_exec(cmd)
+    commands = json.loads(text[6:])
+    assert commands[1].startswith('EXEC flexx.instances.%s._set_prop_from_py(' % m2.id)
+    
+    # A single command is send as is
+    with event.transaction():
+        m1.red = 6
+    cmd, key = session._pending_commands.pop(0)
+    assert cmd.endswith('_set_prop_from_py("red", "7");')
+    
+    # Events are send in the same message, after the property updates
+    m1._set_event_types_js('["boo"]')
+    with event.transaction():
+        m1.emit('boo', {})
+        m1.red = 8
+    cmd, key = session._pending_commands.pop(0)
+    commands = json.loads(cmd[6:])
+    assert len(commands) == 2
+    assert commands[0].endswith('_set_prop_from_py("red", "9");')
+    assert '._emit_from_py("boo", ' in commands[1]
+    
+    # A superseding command keeps the place of the command it replaces
+    with event.transaction():
+        m1.red = 10
+        m1.call_js('foo()')
+        m1.red = 12
+    cmd, key = session._pending_commands.pop(0)
+    commands = json.loads(cmd[6:])
+    assert len(commands) == 2
+    assert commands[0].endswith('_set_prop_from_py("red", "13");')
+    assert commands[1].endswith('.foo();')
+    
+    # Events from JS are not send back to JS
+    event.loop.iter()
+    events = []
+    m1.connect(lambda *evs: events.extend(evs), 'boo')
+    session._pending_commands[:] = []
+    with event.transaction():
+        m1.emit('boo', {}, True)
+        m1.red = 14
+    cmd, key = session._pending_commands.pop(0)
+    assert cmd.endswith('_set_prop_from_py("red", "15");')
+    assert len(session._pending_commands) == 0
+    event.loop.iter()
+    assert len(events) == 1
+    
+    session.close()
+
+
 def test_pairing1():
     
     assert isinstance(Foo1.title, event._emitters.Property)
@@ -211,6 +421,31 @@ def test_no_duplicate_code():
     assert '.red.' in Foo4.JS.CODE
 
 
+def test_lazy_js_code():
+    
+    # With a manifest, the JS code is generated when it's needed
+    config.asset_manifest = 'manifest.json'
+    try:
+        class LazyFoo1(Model):
+            class JS:
+                def init(self):
+                    self.x = 1
+        class LazyFoo2(LazyFoo1):
+            pass
+    finally:
+        config.asset_manifest = ''
+    
+    assert isinstance(LazyFoo1.JS.__dict__['CODE'], model.LazyJSCode)
+    assert isinstance(LazyFoo2.JS.__dict__['CODE'], model.LazyJSCode)
+    
+    code2 = LazyFoo2.JS.CODE
+    assert code2.startswith('flexx.classes.LazyFoo2 = function')
+    assert isinstance(LazyFoo1.JS.__dict__['CODE'], model.LazyJSCode)
+    code1 = LazyFoo1.JS.CODE
+    assert 'this.x = 1' in code1 and 'this.x = 1' not in code2
+    assert LazyFoo1.JS.CODE is code1
+
+
 def test_get_instance_by_id():
     
     # This test needs a default session
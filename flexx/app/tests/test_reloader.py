@@ -0,0 +1,206 @@
+import os
+import sys
+import time
+import tempfile
+
+from flexx.util.testing import run_tests_if_main
+
+from flexx import event, app
+from flexx.app import reloader, assets
+from flexx.app.model import ModelMeta, get_model_classes
+from flexx.app.clientcore import FlexxJS
+from flexx.event._js import HasEventsJS, create_js_hasevents_class
+from flexx.pyscript import evaljs, get_full_std_lib
+
+
+## Hot swapping in JS
+
+class HotFoo1(event.HasEvents):
+    
+    def bar(self):
+        return 1
+    
+    def eggs(self):
+        return 'eggs'
+    
+    @event.prop
+    def size(self, v=2):
+        return v
+    
+    @event.connect('size')
+    def on_size(self, *events):
+        return 'handler1'
+
+
+class HotFoo2(event.HasEvents):
+    
+    def bar(self):
+        return 2
+    
+    def eggs(self):
+        return 'eggs'
+    
+    def spam(self):
+        return 'spam'
+    
+    @event.prop
+    def size(self, v=2):
+        return v * 10
+    
+    @event.prop
+    def color(self, v='red'):
+        return v
+    
+    @event.connect('size')
+    def on_size(self, *events):
+        return 'handler2'
+
+
+class HotSub(HotFoo1):
+    
+    def bar(self):
+        return 'sub'
+
+
+def test_hot_swap_js():
+    code = get_full_std_lib() + HasEventsJS.JSCODE + FlexxJS
+    code += 'var flexx = {classes: {}, instances: {}, hot_swap: FlexxJS.prototype.hot_swap};\n'
+    code += create_js_hasevents_class(HotFoo1, 'flexx.classes.Foo', 'HasEvents.prototype')
+    code += create_js_hasevents_class(HotSub, 'flexx.classes.Sub', 'flexx.classes.Foo.prototype')
+    code += 'var foo = new flexx.classes.Foo(), sub = new flexx.classes.Sub();\n'
+    code += 'flexx.instances.a = foo; flexx.instances.b = sub;\n'
+    code += 'var eggs = foo.eggs, Foo = flexx.classes.Foo;\n'
+    code += 'var changed = flexx.hot_swap("Foo", function () {\n%s\n});\n' % (
+        create_js_hasevents_class(HotFoo2, 'flexx.classes.Foo', 'HasEvents.prototype'))
+    code += 'foo.size = 3; sub.size = 4;\n'
+    code += ('[changed.sort().join(","), foo.bar(), sub.bar(), foo.spam(), sub.spam(), '
+             'foo.size, sub.size, foo.color, foo.on_size(), sub.on_size(), '
+             'foo.eggs === eggs, flexx.classes.Foo === Foo, sub instanceof Foo, '
+             'new flexx.classes.Foo().bar()].join(" ")')
+    res = evaljs(code)
+    assert res.split(' ') == ['__properties__,bar,color,on_size,size,spam',
+                              '2', 'sub', 'spam', 'spam', '30', '40', 'red',
+                              'handler2', 'handler2', 'true', 'true', 'true', '2']
+
+
+## Reloading modules
+
+MODULE_CODE = """
+from flexx import app
+
+class ReloadFoo(app.Model):
+    CSS = '.reload-foo {color: %s}'
+    def pyfunc(self):
+        return %i
+    class JS:
+        def bar(self):
+            return %i
+
+class ReloadBar(app.Model):
+    pass
+"""
+
+
+def write_module(filename, color, py, js, t):
+    with open(filename, 'wb') as f:
+        f.write((MODULE_CODE % (color, py, js)).encode())
+    os.utime(filename, (t, t))  # make sure that the mtime changes
+
+
+def test_reloader():
+    
+    dirname = tempfile.mkdtemp()
+    module_name = 'flexx_reload_test_module'
+    filename = os.path.join(dirname, module_name + '.py')
+    t = time.time() - 100
+    write_module(filename, 'red', 1, 1, t)
+    sys.path.insert(0, dirname)
+    
+    commands = []
+    try:
+        module = __import__(module_name)
+        cls1, bar1 = module.ReloadFoo, module.ReloadBar
+        app.serve(cls1, 'ReloadFoo')
+        session = app.manager.create_session('ReloadFoo')
+        session._send_command = lambda command, key=None: commands.append(command)
+        session.get_page()  # serve the page
+        assert cls1 in session._known_classes
+        
+        reloader.watch(module_name)
+        assert module_name in reloader.get_watched_modules()
+        assert reloader.check() == []
+        
+        # Change JS
+        write_module(filename, 'red', 1, 2, t + 1)
+        assert reloader.check() == ['ReloadFoo']
+        cls2 = module.ReloadFoo
+        assert cls2 is not cls1 and module.ReloadBar is not bar1
+        assert len(commands) == 1
+        assert commands[0].startswith('DEFINE-JS flexx.hot_swap("ReloadFoo", function () {')
+        assert 'return 2;' in commands[0]
+        assert cls2 in session._known_classes and cls1 not in session._known_classes
+        assert app.manager._appinfo['ReloadFoo'][0] is cls2
+        assert cls1 not in get_model_classes() and bar1 not in get_model_classes()
+        
+        # Change CSS
+        write_module(filename, 'blue', 1, 2, t + 2)
+        assert reloader.check() == ['ReloadFoo']
+        assert commands[1].startswith('DEFINE-CSS') and 'blue' in commands[1]
+        assert len(commands) == 2
+        
+        # Change Python code, no need to update the client
+        write_module(filename, 'blue', 2, 2, t + 3)
+        assert reloader.check() == []
+        assert module.ReloadFoo.pyfunc(None) == 2
+        assert len(commands) == 2
+        
+        # Error, keep old classes
+        cls4 = module.ReloadFoo
+        with open(filename, 'ab') as f:
+            f.write(b'\nclass ReloadSpam(app.Model):\n    pass\nraise ValueError()\n')
+        os.utime(filename, (t + 4, t + 4))
+        assert reloader.check() == []
+        assert cls4 in get_model_classes()
+        assert 'ReloadSpam' not in [c.__name__ for c in get_model_classes()]
+        assert len(commands) == 2
+    
+    finally:
+        reloader.unwatch(module_name)
+        sys.path.remove(dirname)
+        sys.modules.pop(module_name, None)
+        app.manager._appinfo.pop('ReloadFoo', None)
+        ModelMeta.CLASSES[:] = [c for c in ModelMeta.CLASSES
+                                if c.__module__ != module_name]
+    
+    assert module_name not in reloader.get_watched_modules()
+
+
+def test_reloader_updates_module_assets():
+    
+    dirname = tempfile.mkdtemp()
+    module_name = 'flexx_reload_test_module2'
+    filename = os.path.join(dirname, module_name + '.py')
+    t = time.time() - 100
+    write_module(filename, 'red', 1, 1, t)
+    sys.path.insert(0, dirname)
+    
+    try:
+        __import__(module_name)
+        assets.create_module_assets(module_name)
+        fname = module_name + '.js'
+        assert 'return 1;' in assets.load_asset(fname).decode()
+        
+        write_module(filename, 'red', 1, 2, t + 1)
+        reloader.reload_module(module_name)
+        js = assets.load_asset(fname).decode()
+        assert 'return 2;' in js and 'return 1;' not in js
+        assert js.count('.ReloadFoo = function') == 1
+    
+    finally:
+        sys.path.remove(dirname)
+        sys.modules.pop(module_name, None)
+        ModelMeta.CLASSES[:] = [c for c in ModelMeta.CLASSES
+                                if c.__module__ != module_name]
+
+
+run_tests_if_main()
@@ -2,8 +2,15 @@
 from flexx.util.testing import run_tests_if_main, raises
 
 from flexx.pyscript import py2js, evaljs
+from flexx.pyscript.stdlib import get_full_std_lib
 
 from flexx.app.serialize import Serializer, serializer
+from flexx.app.serialize import pack_array_command, unpack_array_command
+from flexx.app.serialize import pack_batch_command, unpack_batch_command
+from flexx.app.clientcore import FlexxJS
+
+import json
+import array
 
 
 class Foo:
@@ -64,4 +71,90 @@ def test_js():
     assert res == '49'
 
 
+
+def test_array_python():
+    
+    # array.array
+    a = array.array('f', [1, 2, 3])
+    msg = pack_array_command('SET_PROP foo bar', a)
+    assert isinstance(msg, bytes)
+    assert msg.index(b'Float32Array') > 0
+    assert (len(msg) - len(a) * 4) % 8 == 0  # aligned
+    command, b = unpack_array_command(msg)
+    assert command == 'SET_PROP foo bar'
+    assert list(b) == [1, 2, 3]
+    
+    # Not supported
+    with raises(TypeError):
+        pack_array_command('SET_PROP foo bar', [1, 2, 3])
+    with raises(TypeError):
+        pack_array_command('SET_PROP foo bar', array.array('q', [1, 2, 3]))
+    
+    # Numpy
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    a = np.array([1, 2, 3], np.int16)
+    msg = pack_array_command('SET_PROP foo bar', a)
+    command, b = unpack_array_command(msg)
+    assert command == 'SET_PROP foo bar'
+    assert b.dtype == np.int16
+    assert b.tolist() == [1, 2, 3]
+
+
+def test_array_js():
+    
+    # Pack in Python, unpack in JS
+    msg = pack_array_command('SET_PROP foo bar', array.array('d', [1, 2.5]))
+    code = FlexxJS + '\nvar window = global;\nvar res = [];\n'
+    code += 'window.flexx = {instances: {foo: {_set_prop: function (n, v) {'
+    code += 'res.push(n, v.constructor.name, v[1]);}}}};\n'
+    code += 'var msg = new Uint8Array(%s);\n' % list(bytearray(msg))
+    code += 'FlexxJS.prototype.command_binary(msg.buffer);\n'
+    # Pack in JS
+    code += 'var msg2 = FlexxJS.prototype.pack_array_command("SET_PROP foo bar", '
+    code += 'new Int32Array([4, 5, 6]));\n'
+    code += 'res.push(Array.prototype.slice.call(new Uint8Array(msg2)).join(","));\n'
+    code += 'res.join("|");'
+    
+    result = evaljs(code).split('|')
+    assert result[:3] == ['bar', 'Float64Array', '2.5']
+    msg2 = bytes(bytearray(int(i) for i in result[3].split(',')))
+    command, b = unpack_array_command(msg2)
+    assert command == 'SET_PROP foo bar'
+    assert list(b) == [4, 5, 6]
+
+
+def test_batch():
+    
+    msg1 = pack_array_command('SET_PROP foo bar', array.array('d', [1, 2.5]))
+    msg = pack_batch_command(['EXEC foo', msg1, 'EXEC b\xe4r'])
+    assert isinstance(msg, bytes)
+    commands = unpack_batch_command(msg)
+    assert commands == ['EXEC foo', msg1, 'EXEC b\xe4r']
+    command, b = unpack_array_command(commands[1])
+    assert command == 'SET_PROP foo bar'
+    assert list(b) == [1, 2.5]
+
+
+def test_batch_js():
+    
+    # Pack in Python, unpack and apply in JS
+    msg1 = pack_array_command('SET_PROP foo bar', array.array('d', [1, 2.5]))
+    msg = pack_batch_command(['EXEC res.push("f\xf6\xf6")', msg1, 'EXEC res.push(3)'])
+    code = get_full_std_lib() + FlexxJS + '\nvar window = global;\nvar res = [];\n'
+    code += 'window.flexx = {instances: {foo: {_set_prop: function (n, v) {'
+    code += 'res.push(n, v.constructor.name, v[1]);}}}};\n'
+    code += 'var msg = new Uint8Array(%s);\n' % list(bytearray(msg))
+    code += 'FlexxJS.prototype.command_binary(msg.buffer);\n'
+    # A text batch
+    code += 'FlexxJS.prototype.command(%s);\n' % json.dumps(
+        'BATCH ' + json.dumps(['EXEC res.push(4)', 'EXEC res.push(5)']))
+    code += 'res.join("|");'
+    
+    result = evaljs(code).split('|')
+    assert result == ['f\xf6\xf6', 'bar', 'Float64Array', '2.5', '3', '4', '5']
+
+
 run_tests_if_main()
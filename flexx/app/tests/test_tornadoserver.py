@@ -0,0 +1,171 @@
+""" Test parts of the Tornado server that can be tested without a client.
+"""
+
+from collections import OrderedDict
+
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+from tornado.web import Application
+
+from flexx import config, app
+from flexx.app import assets
+from flexx.app.tornadoserver import WSHandler, MainHandler
+
+from flexx.util.testing import run_tests_if_main
+
+
+class FakeWSHandler(WSHandler):
+    """ WSHandler without a connection, that records what is written.
+    """
+    
+    def __init__(self):
+        self.close_code = None
+        self.written = []
+        self.futures = []
+        self._send_queue = OrderedDict()
+        self._send_queue_bytes = 0
+        self._send_counter = 0
+        self._bytes_in_flight = 0
+        self._flush_pending = False
+        self._send_stats = {'coalesced': 0, 'max_depth': 0}
+    
+    def write_message(self, message, binary=False):
+        self.written.append(message)
+        f = Future()
+        self.futures.append(f)
+        return f
+    
+    def close(self, *args):
+        self.close_code = args[0]
+    
+    def resolve(self):
+        """ Pretend that the client has received all messages. """
+        futures, self.futures = self.futures, []
+        for f in futures:
+            f.set_result(None)
+
+
+def test_ws_send_queue():
+    
+    loop = IOLoop()
+    loop.make_current()
+    
+    high, low, mx = config.ws_queue_high, config.ws_queue_low, config.ws_queue_max
+    config.ws_queue_high, config.ws_queue_low, config.ws_queue_max = 100, 40, 1000
+    try:
+        ws = FakeWSHandler()
+        
+        # Send directly while the client keeps up
+        ws.command('x' * 60)
+        ws.command('y' * 60)
+        assert len(ws.written) == 2
+        assert ws.send_queue_info['in_flight_bytes'] == 120
+        
+        # Now we queue, and property updates with the same key are coalesced
+        ws.command('a1', 'prop foo a')
+        ws.command('b1', 'prop foo b')
+        ws.command('zz')
+        ws.command('a2', 'prop foo a')
+        ws.command('a3', 'prop foo a')
+        info = ws.send_queue_info
+        assert len(ws.written) == 2
+        assert info['depth'] == 3
+        assert info['queued_bytes'] == 6
+        assert info['coalesced'] == 2
+        assert info['max_depth'] == 3
+        
+        # Client catches up, queue is flushed in the next iteration. The
+        # coalesced command keeps the position of the first command.
+        ws.resolve()
+        assert ws.send_queue_info['in_flight_bytes'] == 0
+        loop.run_sync(lambda: None)
+        assert ws.written[2:] == ['a3', 'b1', 'zz']
+        assert ws.send_queue_info['depth'] == 0
+        
+        # Sizes are in bytes, not characters
+        ws.resolve()
+        ws.command('\u20ac' * 40)  # 3 bytes per char
+        assert ws.send_queue_info['in_flight_bytes'] == 120
+        ws.command('x')
+        ws.command('\u20ac', 'prop foo a')
+        assert ws.send_queue_info['queued_bytes'] == 4
+        ws.resolve()
+        loop.run_sync(lambda: None)
+        assert ws.written[-2:] == ['x', '\u20ac']
+        assert ws.send_queue_info['in_flight_bytes'] == 4
+        assert ws.send_queue_info['depth'] == 0
+        
+        # A client that cannot keep up at all is disconnected
+        ws.command('x' * 200)
+        for i in range(10):
+            ws.command('y' * 99)
+        assert ws.close_code is None
+        ws.command('y' * 99)
+        assert ws.close_code is not None
+        assert ws.send_queue_info['depth'] == 0
+    
+    finally:
+        config.ws_queue_high, config.ws_queue_low, config.ws_queue_max = high, low, mx
+        loop.close()
+        IOLoop().make_current()
+
+
+def test_ws_compression():
+    
+    enabled = config.ws_compression
+    try:
+        ws = FakeWSHandler()
+        
+        config.ws_compression = False
+        assert ws.get_compression_options() is None
+        config.ws_compression = True
+        options = ws.get_compression_options()
+        assert options['compression_level'] == config.ws_compression_level
+        assert options['mem_level'] == config.ws_compression_mem_level
+    
+    finally:
+        config.ws_compression = enabled
+
+
+
+class FakeHTTPConnection:
+    
+    def set_close_callback(self, callback):
+        pass
+
+
+class ServedForHeaders(app.Model):
+    pass
+
+
+def get_resource(file_name, accept_encoding):
+    headers = HTTPHeaders({'Accept-Encoding': accept_encoding})
+    request = HTTPServerRequest('GET', '/ServedForHeaders/' + file_name,
+                                headers=headers, connection=FakeHTTPConnection())
+    handler = MainHandler(Application(), request)
+    handler.get('ServedForHeaders/' + file_name)
+    return handler._headers, b''.join(handler._write_buffer)
+
+
+def test_precompressed_assets_vary():
+    
+    app.serve(ServedForHeaders)
+    assets.load_compressed_asset = lambda fname: b'gzipped'
+    assets.load_asset = lambda fname: b'plain'
+    try:
+        headers, res = get_resource('foo.js', 'gzip, deflate')
+        assert res == b'gzipped' and headers['Content-Encoding'] == 'gzip'
+        assert headers['Vary'] == 'Accept-Encoding'
+        
+        # A cache must not serve the gzipped asset to this client
+        headers, res = get_resource('foo.js', '')
+        assert res == b'plain' and 'Content-Encoding' not in headers
+        assert headers['Vary'] == 'Accept-Encoding'
+    
+    finally:
+        del assets.load_compressed_asset, assets.load_asset
+        app.manager._appinfo.pop('ServedForHeaders', None)
+
+
+run_tests_if_main()
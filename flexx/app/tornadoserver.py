@@ -8,6 +8,7 @@ import time
 import socket
 import traceback
 import threading
+from collections import OrderedDict
 from urllib.parse import urlparse
 # from concurrent.futures import ThreadPoolExecutor
 
@@ -114,7 +115,10 @@ class TornadoServer(AbstractServer):
         super().__init__(host, port)
     
     def _open(self, host, port):
-        
+        self._init_loop()
+        self._listen(host, port)
+    
+    def _init_loop(self):
         # Get a new ioloop or the current ioloop for this thread
         if self._new_loop:
             self._loop = IOLoop()
@@ -122,7 +126,8 @@ class TornadoServer(AbstractServer):
             self._loop = IOLoop.current(instance=is_main_thread())
             if self._loop is None:
                 self._loop = IOLoop(make_current=True)
-        
+    
+    def _listen(self, host, port):
         # Create tornado application
         self._app = tornado.web.Application([(r"/(.*)/ws", WSHandler), 
                                              (r"/(.*)", MainHandler), ])
@@ -336,6 +341,15 @@ class MainHandler(tornado.web.RequestHandler):
                     self.set_header("Content-Type", 'text/css')
                 elif file_name.endswith('.js'):
                     self.set_header("Content-Type", 'application/x-javascript')
+                # Serve precompressed asset if we can (from "flexx build"). The
+                # response depends on the Accept-Encoding, also if not gzipped.
+                self.set_header('Vary', 'Accept-Encoding')
+                if 'gzip' in self.request.headers.get('Accept-Encoding', ''):
+                    res = assets.load_compressed_asset(file_name)
+                    if res is not None:
+                        self.set_header('Content-Encoding', 'gzip')
+                        self.write(res)
+                        return
                 try:
                     res = assets.load_asset(file_name)
                 except (IOError, IndexError):
@@ -437,6 +451,14 @@ class WSHandler(tornado.websocket.WebSocketHandler):
         self._session = None
         self._mps_counter = MessageCounter()
         
+        # Outgoing messages are queued if the client does not keep up
+        self._send_queue = OrderedDict()  # key -> (command, size in bytes)
+        self._send_queue_bytes = 0
+        self._send_counter = 0
+        self._bytes_in_flight = 0
+        self._flush_pending = False
+        self._send_stats = {'coalesced': 0, 'max_depth': 0}
+        
         # Don't collect messages to send them more efficiently, just send asap
         # self.set_nodelay(True)
         
@@ -463,7 +485,14 @@ class WSHandler(tornado.websocket.WebSocketHandler):
         self._mps_counter.trigger()
         
         self._pongtime = time.time()
-        if self._session is None:
+        if isinstance(message, bytes):
+            if self._session is not None:
+                try:
+                    self._session._receive_binary_command(message)
+                except Exception as err:
+                    err.skip_tb = 1
+                    logger.exception(err)
+        elif self._session is None:
             if message.startswith('hiflexx '):
                 session_id = message.split(' ', 1)[1].strip()
                 try:
@@ -489,6 +518,8 @@ class WSHandler(tornado.websocket.WebSocketHandler):
         reason = self.close_reason or self.known_reasons.get(code, '')
         logger.debug('Websocket closed: %s (%i)' % (reason, code))
         self._mps_counter.stop()
+        self._send_queue.clear()
+        self._send_queue_bytes = 0
         if self._session is not None:
             manager.disconnect_client(self._session)
             self._session = None  # Allow cleaning up
@@ -569,8 +600,79 @@ class WSHandler(tornado.websocket.WebSocketHandler):
     
     # --- methods
     
-    def command(self, cmd):
-        self.write_message(cmd, binary=BINARY)
+    def command(self, cmd, key=None):
+        """ Send a command to the client. If the client does not keep up
+        (more than ``config.ws_queue_high`` bytes are being sent), the
+        command is queued. A queued command with a given key is superseded
+        by a newer command with the same key, which is how property updates
+        are coalesced. The connection is closed if the queue grows beyond
+        ``config.ws_queue_max`` bytes.
+        """
+        n = len(cmd) if isinstance(cmd, bytes) else len(cmd.encode())
+        if not self._send_queue and self._bytes_in_flight < config.ws_queue_high:
+            self._write_command(cmd, n)
+            return
+        # Queue the command. A superseded command is replaced in-place, so
+        # that it is not sent after commands that were queued after it.
+        if key is None:
+            self._send_counter += 1
+            key = self._send_counter
+        else:
+            old = self._send_queue.get(key, None)
+            if old is not None:
+                self._send_queue_bytes -= old[1]
+                self._send_stats['coalesced'] += 1
+        self._send_queue[key] = cmd, n
+        self._send_queue_bytes += n
+        depth = len(self._send_queue)
+        if depth > self._send_stats['max_depth']:
+            self._send_stats['max_depth'] = depth
+        # Protect the server against clients that really cannot keep up
+        if config.ws_queue_max and self._send_queue_bytes > config.ws_queue_max:
+            logger.warn('Closing connection because client cannot keep up')
+            self._send_queue.clear()
+            self._send_queue_bytes = 0
+            self.close(1008, 'Client cannot keep up.')
+    
+    def _write_command(self, cmd, n):
+        binary = BINARY or isinstance(cmd, bytes)  # arrays are send as bytes
+        future = self.write_message(cmd, binary=binary)
+        if future is not None:  # Tornado 4.3+ allows flow control
+            self._bytes_in_flight += n
+            future.add_done_callback(lambda f: self._on_command_written(n))
+    
+    def _on_command_written(self, n):
+        self._bytes_in_flight -= n
+        if (self._send_queue and not self._flush_pending and
+                self._bytes_in_flight <= config.ws_queue_low):
+            # Don't write from within the write-callback of the stream
+            self._flush_pending = True
+            IOLoop.current().add_callback(self._flush_send_queue)
+    
+    def _flush_send_queue(self):
+        self._flush_pending = False
+        while self._send_queue and self._bytes_in_flight < config.ws_queue_high:
+            if self.close_code is not None:
+                self._send_queue.clear()
+                self._send_queue_bytes = 0
+                break
+            _, (cmd, n) = self._send_queue.popitem(False)
+            self._send_queue_bytes -= n
+            self._write_command(cmd, n)
+    
+    @property
+    def send_queue_info(self):
+        """ A dict with metrics about outgoing messages: the number of
+        queued commands (depth), the size of the queue in bytes (queued_bytes),
+        the amount of bytes that are being send (in_flight_bytes), the
+        number of commands superseded by newer commands (coalesced) and the
+        largest queue depth so far (max_depth).
+        """
+        return dict(depth=len(self._send_queue),
+                    queued_bytes=self._send_queue_bytes,
+                    in_flight_bytes=self._bytes_in_flight,
+                    coalesced=self._send_stats['coalesced'],
+                    max_depth=self._send_stats['max_depth'])
     
     def close(self, *args):
         try:
@@ -583,6 +685,16 @@ class WSHandler(tornado.websocket.WebSocketHandler):
         """
         self.close(1000, 'closed by server')
     
+    def get_compression_options(self):
+        """ Enable permessage-deflate compression (in both directions) if
+        ``config.ws_compression`` is set. All messages are compressed,
+        regardless of their size.
+        """
+        if not config.ws_compression:
+            return None
+        return dict(compression_level=config.ws_compression_level,
+                    mem_level=config.ws_compression_mem_level)
+    
     def check_origin(self, origin):
         """ Handle cross-domain access; override default same origin policy.
         """
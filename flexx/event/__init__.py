@@ -19,10 +19,10 @@ Event
 
 An event is something that has occurred at a certain moment in time,
 such as the mouse being pressed down or a property changing its value.
-In this framework events are represented with dictionary objects that
+In this framework events are represented with dictionary-like objects that
 provide information about the event (such as what button was pressed,
-or the old and new value of a property). A custom :class:`Dict <flexx.event.Dict>`
-class is used that inherits from ``dict`` but allows attribute access,
+or the old and new value of a property). A custom :class:`Event <flexx.event.Event>`
+class is used that behaves like a dict but allows attribute access,
 e.g. ``ev.button`` as an alternative to ``ev['button']``.
 
 
@@ -174,6 +174,25 @@ readonly property can be set internally using the
         def _somewhere(self):
             self._set_prop('foo', 42)
 
+Computed
+========
+
+Computed properties are created with the
+:func:`computed <flexx.event.computed>` decorator. Their value is
+derived from other properties, which are automatically tracked as
+dependencies. The value is cached, and only recomputed when one of the
+dependencies has changed:
+
+.. code-block:: python
+
+    class MyObject(event.HasEvents):
+
+        @event.computed
+        def full_name(self):
+            ''' The first and last name combined.
+            '''
+            return self.first_name + ' ' + self.last_name
+
 Emitter
 =======
 
@@ -336,10 +355,13 @@ logger = logging.getLogger(__name__)
 del logging
 
 # flake8: noqa
-from ._dict import Dict
+from ._dict import Dict, Event
 from ._loop import loop
+from ._transaction import transaction
+from ._profiler import profiler
+from ._sweeper import sweeper
 from ._handler import Handler, connect
-from ._emitters import prop, readonly, emitter
+from ._emitters import prop, readonly, arrayprop, listprop, computed, emitter
 from ._hasevents import HasEvents
 
 # from ._hasevents import new_type, with_metaclass
@@ -1,5 +1,6 @@
 """
-Implementation of a dict class with attribute access.
+Implementation of a dict class with attribute access, and of the
+lightweight event object.
 """
 
 import re
@@ -85,3 +86,46 @@ class Dict(_dict):
     def __dir__(self):
         names = [k for k in self.keys() if isidentifier(k)]
         return Dict.__reserved_names__ + names
+
+
+class Event(dict):
+    """ The object that represents an event in Python. Like
+    :class:`Dict <flexx.event.Dict>`, it is a dict in which the items
+    can be get/set as attributes, but it is much cheaper to create.
+    
+    Events are created for every call to ``emit()``, which can be many,
+    e.g. for mouse moves or for properties that change often. Therefore
+    this class is a plain dict subclass with ``__slots__``, rather than
+    an OrderedDict, and attribute lookups only fall back to the dict
+    items when the normal lookup fails.
+    """
+    
+    __slots__ = []
+    
+    def __repr__(self):
+        items = ['%s=%r' % (key, val) if isidentifier(key) else
+                 '(%r, %r)' % (key, val) for key, val in self.items()]
+        return 'Event(%s)' % ', '.join(items)
+    
+    def __getattr__(self, key):
+        # Only called when the normal attribute lookup fails
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError('Event has no attribute %r' % key)
+    
+    def __setattr__(self, key, val):
+        if key in Dict.__pure_names__:
+            raise AttributeError('Reserved name, this key can only ' +
+                                 'be set via ``ev[%r] = X``' % key)
+        self[key] = val
+    
+    def __delattr__(self, key):
+        try:
+            del self[key]
+        except KeyError:
+            raise AttributeError('Event has no attribute %r' % key)
+    
+    def __dir__(self):
+        names = [k for k in self.keys() if isidentifier(k)]
+        return Dict.__pure_names__ + names
@@ -1,11 +1,17 @@
 """
 Implementation of descriptors for generating events:
-prop, readonly and emitter.
+prop, readonly, computed and emitter.
 """
 
+import array
 import inspect
 
 
+# Stack of lists in which the properties that are read while computing
+# a computed property are recorded, as (ob, name) pairs.
+_tracking_stack = []
+
+
 # Decorators to apply at a HasEvents class
 
 def prop(func):
@@ -59,6 +65,93 @@ def readonly(func):
     return Readonly(func)
 
 
+def arrayprop(func):
+    """ Decorator to define a settable property that holds an array of
+    numbers. Works like :func:`prop <flexx.event.prop>`, but the value
+    is normalized to an array before it is passed to the function.
+    
+    .. code-block:: python
+        
+        class MyObject(event.HasEvents):
+           
+           @arrayprop
+           def data(self, v=()):
+                return v
+        
+        m = MyObject(data=numpy.zeros(1000))
+    
+    In Python the value is a contiguous one-dimensional numpy array
+    or ``array.array``. Other sequences are converted to a float64
+    numpy array (or ``array.array('d')`` if numpy is not available).
+    In JavaScript the value is a TypedArray (Float64Array by default);
+    use indexing (rather than ``for x in arr``) to iterate over it in
+    PyScript. Properties of a ``Model`` that are arrays are send between
+    Python and JS as binary data.
+    """
+    if not callable(func):
+        raise TypeError('arrayprop decorator needs a callable')
+    return ArrayProperty(func)
+
+
+def listprop(func):
+    """ Decorator to define a settable property that holds a list (or
+    tuple). Works like :func:`prop <flexx.event.prop>`, but for properties
+    of a ``Model`` only the difference with the previously synchronised
+    value is send to the other side (e.g. the appended elements), unless
+    the difference is large.
+    
+    .. code-block:: python
+        
+        class MyObject(event.HasEvents):
+           
+           @listprop
+           def items(self, v=()):
+                return tuple(v)
+    
+    """
+    if not callable(func):
+        raise TypeError('listprop decorator needs a callable')
+    return ListProperty(func)
+
+
+def computed(func):
+    """ Decorator to define a computed property: a readonly property
+    whose value is derived from other properties.
+    
+    .. code-block:: python
+        
+        class MyObject(event.HasEvents):
+           
+           @prop
+           def first_name(self, v=''):
+                return str(v)
+           
+           @prop
+           def last_name(self, v=''):
+                return str(v)
+           
+           @computed
+           def full_name(self):
+                return self.first_name + ' ' + self.last_name
+    
+    The method should have no arguments (other than self). The
+    properties (and other computed properties) that are read while the
+    method runs, on this or any other object, are recorded as its
+    dependencies. The result is cached, and only invalidated when one
+    of the dependencies changes. The value is then recomputed when it is
+    read, or in the next iteration of the event loop if any handlers are
+    connected to it. An event (with "old_value" and "new_value") is
+    emitted when a recomputation results in a different value.
+    
+    This replaces the pattern of a handler that connects to a number
+    of properties to set a readonly: the value is only computed when
+    needed, and dependencies do not have to be specified by hand.
+    """
+    if not callable(func):
+        raise TypeError('computed decorator needs a callable')
+    return Computed(func)
+
+
 def emitter(func):
     """ Decorator to define an emitter. An emitter is an attribute that
     makes it easy to emit specific events and functions as a placeholder
@@ -109,8 +202,6 @@ class Property(BaseEmitter):
     """ A value that is gettable and settable.
     """
     
-    _SUFFIX = '_value'
-    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._defaults = inspect.getargspec(self._func).defaults
@@ -126,8 +217,29 @@ class Property(BaseEmitter):
     def __get__(self, instance, owner):
         if instance is None:
             return self
-        private_name = '_' + self._name + self._SUFFIX
-        return getattr(instance, private_name)
+        if _tracking_stack:
+            _tracking_stack[-1].append((instance, self._name))
+        return instance._HasEvents__prop_values[self._name]
+
+
+class ArrayProperty(Property):
+    """ A value that is gettable and settable, and which is an array.
+    """
+    
+    def get_func(self):
+        """ Get the function that normalizes the value to an array and
+        then calls the corresponding function object.
+        """
+        func = self._func
+        def array_func(instance, v):
+            return func(instance, as_array(v))
+        return array_func
+
+
+class ListProperty(Property):
+    """ A value that is gettable and settable, and which is a list.
+    """
+    pass
 
 
 class Readonly(Property):
@@ -138,6 +250,22 @@ class Readonly(Property):
         raise AttributeError("Can't set readonly property %r" % self._name)
 
 
+class Computed(BaseEmitter):
+    """ A value that is computed from other properties and cached.
+    """
+    
+    def __set__(self, instance, value):
+        raise AttributeError("Can't set computed property %r" % self._name)
+    
+    def __delete__(self, instance):
+        raise AttributeError('Cannot delete computed property %r.' % self._name)
+    
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance._get_computed(self._name)
+
+
 class Emitter(BaseEmitter):
     """ Placeholder for documentation and easy emitting of the event.
     """
@@ -157,3 +285,53 @@ class Emitter(BaseEmitter):
                 instance.emit(self._name, ev)
         func.__doc__ = self.__doc__
         return func
+
+
+# Map (kind, itemsize) to the name of the corresponding JS TypedArray
+_TYPED_ARRAYS = {('i', 1): 'Int8Array', ('u', 1): 'Uint8Array',
+                 ('i', 2): 'Int16Array', ('u', 2): 'Uint16Array',
+                 ('i', 4): 'Int32Array', ('u', 4): 'Uint32Array',
+                 ('f', 4): 'Float32Array', ('f', 8): 'Float64Array'}
+
+
+def get_typed_array_name(value):
+    """ Get the name of the JS TypedArray that corresponds to the given
+    numpy array or ``array.array``, or None if the value is not an array
+    of a supported type.
+    """
+    if isinstance(value, array.array):
+        tc = value.typecode
+        if tc == 'u':
+            return None  # unicode characters
+        kind = 'f' if tc in 'fd' else ('u' if tc.isupper() else 'i')
+        return _TYPED_ARRAYS.get((kind, value.itemsize), None)
+    dtype = getattr(value, 'dtype', None)
+    if dtype is not None and getattr(value, 'ndim', 0) == 1:
+        return _TYPED_ARRAYS.get((dtype.kind, dtype.itemsize), None)
+
+
+def as_array(value):
+    """ Normalize the given value to a contiguous one-dimensional array
+    of a type that has a JS equivalent. Numpy arrays and ``array.array``
+    objects are not copied if they already meet these conditions.
+    """
+    if isinstance(value, array.array):
+        if get_typed_array_name(value):
+            return value
+        return array.array('d', value)
+    elif hasattr(value, 'dtype') and hasattr(value, 'ravel'):
+        import numpy as np
+        value = value.ravel()
+        dtype = value.dtype
+        if get_typed_array_name(value) is None:
+            dtype = np.float64
+        elif not dtype.isnative:
+            dtype = dtype.newbyteorder('=')
+        return np.ascontiguousarray(value, dtype)
+    else:
+        value = () if value is None else value
+        try:
+            import numpy as np
+        except ImportError:
+            return array.array('d', value)
+        return np.asarray(value, np.float64).ravel()
@@ -7,6 +7,8 @@ import inspect
 
 from ._dict import Dict
 from ._loop import loop
+from ._profiler import profiler
+from ._sweeper import sweeper
 from . import logger
 
 
@@ -171,6 +173,7 @@ class Handler:
         self.__doc__ = '*%s*: %s' % ('event handler', func.__doc__ or self._name)
         
         self._init(connection_strings)
+        sweeper._track(self)
     
     def _init(self, connection_strings):
         """ Init of this handler that is compatible with PyScript.
@@ -183,6 +186,7 @@ class Handler:
             d.fullname = s
             d.type = s.split('.')[-1]
             d.objects = []
+            d.counts = {}  # key of (ob, name) -> number of occurrences in objects
         
         # Pending events for this handler
         self._scheduled_update = False
@@ -261,8 +265,8 @@ class Handler:
         events, reconnect = self._collect()
         self._pending = []
         # Reconnect (dynamism)
-        for index in reconnect:
-            self._connect_to_event(index)
+        for index, ev in reconnect:
+            self._connect_to_event(index, ev)
         # Collect newly created events (corresponding to props)
         events2, reconnect2 = self._collect()
         if not len(reconnect2):
@@ -274,7 +278,10 @@ class Handler:
                 logger.debug('Handler %s is processing %i events' %
                             (self._name, len(events)))
             try:
-                self(*events)
+                if not this_is_js() and profiler.enabled:
+                    profiler._profile_handler(self, events)
+                else:
+                    self(*events)
             except Exception as err:
                 if this_is_js():
                     console.error(err)
@@ -290,7 +297,7 @@ class Handler:
         for label, ev in self._pending:
             if label.startswith('reconnect_'):
                 index = int(label.split('_')[-1])
-                reconnect.append(index)
+                reconnect.append((index, ev))
             else:
                 events.append(ev)
         return events, reconnect
@@ -306,8 +313,9 @@ class Handler:
             logger.debug('Disposing Handler %r ' % self)
         for connection in self._connections:
             while len(connection.objects):
-                ob, name = connection.objects.pop(0)
-                ob.disconnect(name, self)
+                entry = connection.objects.pop(0)
+                entry[0].disconnect(entry[1], self)
+            connection.counts = {}
         while len(self._pending):
             self._pending.pop()  # no list.clear on legacy py
     
@@ -317,41 +325,155 @@ class Handler:
         working, but wont receive events from that object anymore.
         """
         for connection in self._connections:
-            for i in range(len(connection.objects)-1, -1, -1):
-                if connection.objects[i][0] is ob:
-                    connection.objects.pop(i)
+            objects = connection.objects
+            removed = False
+            for i in range(len(objects)-1, -1, -1):
+                if objects[i][0] is ob:
+                    entry = objects.pop(i)
+                    connection.counts.pop(self._get_key(ob, entry[1]), None)
+                    removed = True
+            # The sizes stored with the property entries are now wrong,
+            # and their values may hold ob. Forget these, so that the next
+            # reconnect traverses the whole subtree of the property.
+            for i in range(len(objects)):
+                entry = objects[i]
+                if len(entry) > 3 and (removed or self._holds(entry[4], ob)):
+                    objects[i] = (entry[0], entry[1], entry[2], entry[3], None, [])
         
         # Do not clear pending events. This handler is assumed to continue
         # working, and should thus handle its pending events at some point,
         # at which point it cannot hold any references to ob anymore.
     
-    def _connect_to_event(self, index):
-        """ Connect one connection.
+    def _connect_to_event(self, index, ev=None):
+        """ Connect one connection. When reconnecting because of a change
+        in the path, as given by the reconnect event, only the part of
+        the tree below the changed property is traversed again.
         """
         connection = self._connections[index]
+        if ev is not None and self._reconnect_below(index, ev):
+            return
         
-        # Disconnect
-        while len(connection.objects):
-            ob, name = connection.objects.pop(0)
-            ob.disconnect(name, self)
+        old_objects = connection.objects
+        connection.objects = []
         
         path = connection.fullname.replace('.*', '*').split('.')[:-1]
         
-        # Obtain root object and setup connections
+        # Obtain root object and find the objects to connect to
         ob = self._ob1()
         if ob is not None:
-            self._seek_event_object(index, path, ob)
+            self._seek_event_object(index, path, ob, 0)
+        self._update_connections(connection, old_objects, connection.objects)
         
         # Verify
         if not connection.objects:
             raise RuntimeError('Could not connect to %r' % connection.fullname)
+    
+    def _reconnect_below(self, index, ev):
+        """ Reconnect the part of the tree below the property that emitted
+        the given reconnect event. If the property is a list, only its
+        elements that changed are traversed. Returns False if the whole
+        path must be traversed instead.
+        """
+        connection = self._connections[index]
+        objects = connection.objects
+        label = ev.type + ':reconnect_' + str(index)
+        count = connection.counts.get(self._get_key(ev.source, label), 0)
+        if count == 0:
+            return True  # no longer in the path: nothing to do
+        elif count > 1:
+            return False  # present at multiple places in the tree
         
-        # Connect
-        for ob, type in connection.objects:
-            ob._register_handler(type, self)
+        # Find the entry of the property, and the entries below it
+        k = 0
+        while objects[k][0] is not ev.source or objects[k][1] != label:
+            k += 1
+        entry = objects[k]
+        ob, depth, path = entry[0], entry[2], entry[3]
+        old_value, old_sizes = entry[4], entry[5]
+        m = k + 1
+        while m < len(objects) and objects[m][2] > depth:
+            m += 1
+        value = getattr(ob, path[0].rstrip('*'), None)
+        
+        # Traverse the new value, or the elements that changed
+        connection.objects = []
+        if (isinstance(old_value, (tuple, list)) and isinstance(value, (tuple, list))
+                and len(old_sizes) == len(old_value)):
+            n_old, n_new = len(old_value), len(value)
+            n = min(n_old, n_new)
+            i = 0
+            while i < n and old_value[i] is value[i]:
+                i += 1
+            j = 0
+            while j < n - i and old_value[n_old-1-j] is value[n_new-1-j]:
+                j += 1
+            start, end = k + 1, m
+            for size in old_sizes[:i]:
+                start += size
+            for size in old_sizes[n_old-j:]:
+                end -= size
+            new_sizes = []
+            self._seek_event_value(index, path, value[i:n_new-j], depth + 1, new_sizes)
+            sizes = old_sizes[:i] + new_sizes + old_sizes[n_old-j:]
+        else:
+            start, end = k + 1, m
+            sizes = []
+            self._seek_event_value(index, path, value, depth + 1, sizes)
+        new_objects = connection.objects
+        
+        objects[k] = (ob, label, depth, path, value, sizes)
+        connection.objects = objects[:start] + new_objects + objects[end:]
+        self._update_connections(connection, objects[start:end], new_objects)
+        return True
+    
+    def _update_connections(self, connection, old_objects, new_objects):
+        """ Disconnect the objects that are no longer in the path, and
+        connect the new ones. The counts are used to keep objects that
+        are still in the path elsewhere.
+        """
+        counts = connection.counts
+        added = []
+        for entry in new_objects:
+            key = self._get_key(entry[0], entry[1])
+            count = counts.get(key, 0)
+            if count == 0:
+                added.append(entry)
+            counts[key] = count + 1
+        for entry in old_objects:
+            counts[self._get_key(entry[0], entry[1])] -= 1
+        for entry in old_objects:
+            key = self._get_key(entry[0], entry[1])
+            if counts.get(key, 1) == 0:
+                counts.pop(key)
+                entry[0].disconnect(entry[1], self)
+        for entry in added:
+            entry[0]._register_handler(entry[1], self)
+    
+    def _holds(self, value, ob):
+        """ Get whether the given property value is or contains ob.
+        """
+        if value is ob:
+            return True
+        if isinstance(value, (tuple, list)):
+            for v in value:
+                if v is ob:
+                    return True
+        return False
+    
+    def _get_key(self, ob, name):
+        """ Get a string that identifies a connection to an object.
+        """
+        if this_is_js():
+            return name + '-' + ob._hasevents_id
+        return name + '-' + str(id(ob))
     
-    def _seek_event_object(self, index, path, ob):
+    def _seek_event_object(self, index, path, ob, depth):
         """ Seek an event object based on the name (PyScript compatible).
+        The entries are added to the list in a fixed order, together with
+        their depth in the tree, so that the entries below a property
+        are a contiguous part of the list. For properties, the entry also
+        holds the path, the value, and the number of entries found for
+        each element of the value (if it is a list).
         """
         connection = self._connections[index]
         
@@ -359,29 +481,43 @@ class Handler:
         if ob is None or not len(path):
             if ob is None or not hasattr(ob, '_IS_HASEVENTS'):
                 return  # we cannot seek further
-            connection.objects.append((ob, connection.type))
+            connection.objects.append((ob, connection.type, depth))
             return  # found it
         
         # Resolve name
-        obname_full, path = path[0], path[1:]
+        obname_full = path[0]
         obname = obname_full.rstrip('*')
         selector = obname_full[len(obname):]
         # Internally, 3-star notation is used for optional selectors
         if selector == '***':
-            self._seek_event_object(index, path, ob)
+            self._seek_event_object(index, path[1:], ob, depth)
         # Select object
-        if hasattr(ob, '_IS_HASEVENTS') and obname in ob.__properties__:
+        if hasattr(ob, '_IS_HASEVENTS') and (obname in ob.__properties__ or
+                                             obname in ob.__computed__):
             name_label = obname + ':reconnect_' + str(index)
-            connection.objects.append((ob, name_label))
-            ob = getattr(ob, obname, None)
+            value = getattr(ob, obname, None)
+            sizes = []
+            connection.objects.append((ob, name_label, depth, path, value, sizes))
+            self._seek_event_value(index, path, value, depth + 1, sizes)
         else:
-            ob = getattr(ob, obname, None)
-        # Look inside?
+            value = getattr(ob, obname, None)
+            self._seek_event_value(index, path, value, depth + 1, None)
+    
+    def _seek_event_value(self, index, path, ob, depth, sizes):
+        """ Seek event objects in the value that the first name of the
+        path resolved to. Look inside if it is a list.
+        """
+        connection = self._connections[index]
+        obname_full, path = path[0], path[1:]
+        obname = obname_full.rstrip('*')
+        selector = obname_full[len(obname):]
         if selector in '***' and isinstance(ob, (tuple, list)):
             if len(selector) > 1:
                 path = [obname + '***'] + path  # recurse (avoid insert for space)
             for sub_ob in ob:
-                self._seek_event_object(index, path, sub_ob)
+                n = len(connection.objects)
+                self._seek_event_object(index, path, sub_ob, depth)
+                if sizes is not None:
+                    sizes.append(len(connection.objects) - n)
             return
-        
-        return self._seek_event_object(index, path, ob)
+        self._seek_event_object(index, path, ob, depth)
@@ -4,11 +4,14 @@ generated and handled. It is the object that keeps track of handlers.
 """
 
 import sys
+import weakref
 
-from ._dict import Dict
+from ._dict import Dict, Event
 from ._handler import HandlerDescriptor, Handler, looks_like_method
-from ._emitters import BaseEmitter, Property
+from ._emitters import BaseEmitter, Property, Computed, _tracking_stack
 from ._loop import loop
+from ._profiler import profiler
+from ._transaction import _transaction
 from . import logger
 
 def this_is_js():
@@ -41,7 +44,8 @@ def new_type(name, *args, **kwargs):
 class HasEventsMeta(type):
     """ Meta class for HasEvents
     * Set the name of each handler and emitter.
-    * Sets __handlers__, __emitters, __properties__ attribute on the class.
+    * Sets __handlers__, __emitters, __properties__, __computed__ attribute
+      on the class.
     """
     
     def __init__(cls, name, bases, dct):
@@ -49,21 +53,26 @@ class HasEventsMeta(type):
         type.__init__(cls, name, bases, dct)
 
 def finalize_hasevents_class(cls):
-    """ Given a class, analyse its Properties, Readonlies, Emitters,
-    and Handlers, to set a list of __emitters__, __properties__, and
-    __handlers__. Also create private methods corresponding to the
-    properties, emitters and handlers.
+    """ Given a class, analyse its Properties, Readonlies, Computed
+    properties, Emitters, and Handlers, to set a list of __emitters__,
+    __properties__, __computed__, and __handlers__. Also create private
+    methods corresponding to the properties, emitters and handlers, and
+    precompute the per-property information that is used when
+    instantiating and setting properties.
     """
     # Collect handlers defined on this class
     handlers = {}
     emitters = {}
     properties = {}
+    computed = {}
     for name in dir(cls):
         if name.startswith('__'):
             continue
         val = getattr(cls, name)
         if isinstance(val, Property):
             properties[name] = val
+        elif isinstance(val, Computed):
+            computed[name] = val
         elif isinstance(val, BaseEmitter):
             emitters[name] = val
         elif isinstance(val, HandlerDescriptor):
@@ -81,6 +90,15 @@ def finalize_hasevents_class(cls):
     cls.__handlers__ = [name for name in sorted(handlers.keys())]
     cls.__emitters__ = [name for name in sorted(emitters.keys())]
     cls.__properties__ = [name for name in sorted(properties.keys())]
+    cls.__computed__ = [name for name in sorted(computed.keys())]
+    # Per-property validator functions and default values (Python only)
+    cls.__prop_funcs__ = dict((name, properties[name].get_func())
+                              for name in cls.__properties__)
+    cls.__prop_defaults__ = [(name, properties[name]._defaults[0])
+                             for name in cls.__properties__
+                             if properties[name]._defaults]
+    cls.__computed_funcs__ = dict((name, computed[name].get_func())
+                                  for name in cls.__computed__)
     return cls
 
 
@@ -136,29 +154,33 @@ class HasEvents(with_metaclass(HasEventsMeta, object)):
         # Init some internal variables. Note that __handlers__ is a list of handler
         # names for this class, and __handlers a dict of handlers registered to
         # events of this object.
-        self.__handlers = {}
+        # Property values are stored in __prop_values, and the property
+        # validator functions are in the per-class __prop_funcs__.
+        handlers = {}
+        for name in self.__emitters__:
+            handlers[name] = []
+        for name in self.__properties__:
+            handlers[name] = []
+        for name in self.__computed__:
+            handlers[name] = []
+        self.__handlers = handlers
         self.__props_being_set = {}
-        self.__props_ever_set = {}
+        self.__prop_values = dict.fromkeys(self.__properties__)  # None for all
+        self.__computed_values = {}
+        self.__computed_dirty = dict.fromkeys(self.__computed__, True)
+        self.__computed_deps = {}  # name -> list of (ob, type) that we depend on
+        self.__dependents = {}  # type -> list of (ref, name) that depend on us
         self.__pending_events = {}
+        self.__handlers_changed_scheduled = False
+        self._disposed = False
         
         init_handlers = property_values.pop('_init_handlers', True)
         
-        # Instantiate emitters
-        for name in self.__emitters__:
-            self.__handlers.setdefault(name, [])
-        
         # Initialize properties with default and given values (does not emit yet)
-        for name in self.__properties__:
-            self.__handlers.setdefault(name, [])
-            setattr(self, '_' + name + '_value', None)  # need *something* for value
-            func = getattr(self.__class__, name).get_func()
-            setattr(self, '_' + name + '_func', func)  # needed in set_prop()
-        for name in self.__properties__:
-            dd = getattr(self.__class__, name)._defaults
-            if dd:
-                self._set_prop(name, dd[0], True)
+        for name, default in self.__prop_defaults__:
+            self._set_prop(name, default, True)
         for name, value in property_values.items():
-            if name in self.__properties__:
+            if name in self.__prop_funcs__:
                 setattr(self, name, value)  # should raise error whith readonly
             else:
                 cname = self.__class__.__name__
@@ -200,6 +222,7 @@ class HasEvents(with_metaclass(HasEventsMeta, object)):
         """
         if not this_is_js():
             logger.debug('Disposing HasEvents instance %r' % self)
+        self._disposed = True
         for name, handlers in self.__handlers.items():
             for label, handler in handlers:
                 handler._clear_hasevents_refs(self)
@@ -207,11 +230,27 @@ class HasEvents(with_metaclass(HasEventsMeta, object)):
                 handlers.pop()  # no list.clear on legacy py
         for name in self.__handlers__:
             getattr(self, name).dispose()
+        for name, deps in self.__computed_deps.items():
+            for ob, dep_type in deps:
+                ob._remove_dependent(dep_type, self, name)
+        self.__computed_deps = {}
+        self.__dependents = {}
     
     def _handlers_changed_hook(self):
         # Called when the handlers changed, can be implemented in subclasses
         pass
     
+    def _schedule_handlers_changed_hook(self):
+        # Call the hook once in the next loop iteration, so that connecting
+        # or disconnecting many handlers results in a single call.
+        if self.__handlers_changed_scheduled:
+            return
+        self.__handlers_changed_scheduled = True
+        def notify():
+            self.__handlers_changed_scheduled = False
+            self._handlers_changed_hook()
+        loop.call_later(notify)
+    
     def _register_handler(self, event_type, handler):
         # Register a handler for the given event type. The type
         # can include a label, e.g. 'mouse_down:foo'.
@@ -235,11 +274,23 @@ class HasEvents(with_metaclass(HasEventsMeta, object)):
                 else:
                     logger.warn(msg)
         
-        entry = label, handler
-        if entry not in handlers:
-            handlers.append(entry)
-        handlers.sort(key=lambda x: x[0]+'-'+x[1]._id)
-        self._handlers_changed_hook()
+        # Insert handler in the sorted list, using bisection. We don't use
+        # the bisect module, because this code must also work in JS.
+        key = label + '-' + handler._id
+        lo, hi = 0, len(handlers)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if handlers[mid][0] + '-' + handlers[mid][1]._id < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        entry = handlers[lo] if lo < len(handlers) else None
+        if not (entry and entry[0] == label and entry[1] is handler):
+            handlers.insert(lo, (label, handler))
+            self._schedule_handlers_changed_hook()
+        # A computed property that is observed is computed without being read
+        if self.__computed_dirty.get(type, False):
+            self._schedule_compute(type)
         # Emit any pending events
         if self.__pending_events is not None:
             if not label.startswith('reconnect_'):
@@ -247,7 +298,7 @@ class HasEvents(with_metaclass(HasEventsMeta, object)):
                     handler._add_pending_event(type + ":" + label, ev)  # friend class
         # Send an event to communicate the value of a property
         # if type in self.__properties__:
-        #     if self.__props_ever_set.get(type, False):
+        #     if type in self.__props_being_set:
         #         if not label.startswith('reconnect_'):  # Avoid recursion
         #             val = getattr(self, type)
         #             ev = Dict()  # PyScript compatible
@@ -275,7 +326,7 @@ class HasEvents(with_metaclass(HasEventsMeta, object)):
             if not ((label and label != entry[0]) or
                     (handler and handler is not entry[1])):
                 handlers.pop(i)
-        self._handlers_changed_hook()
+        self._schedule_handlers_changed_hook()
     
     def emit(self, type, info=None):
         """ Generate a new event and dispatch to all event handlers.
@@ -283,8 +334,12 @@ class HasEvents(with_metaclass(HasEventsMeta, object)):
         Arguments:
             type (str): the type of the event. Should not include a label.
             info (dict): Optional. Additional information to attach to
-                the event object. Note that the actual event is a Dict object
-                that allows its elements to be accesses as attributes.
+                the event object. Note that the actual event is an Event
+                object (a dict) that allows its elements to be accesses as
+                attributes.
+        
+        Returns the event object, or None if a transaction is active, in
+        which case the event is emitted at the end of the transaction.
         """
         info = {} if info is None else info
         type, _, label = type.partition(':')
@@ -294,9 +349,17 @@ class HasEvents(with_metaclass(HasEventsMeta, object)):
         if not isinstance(info, dict):
             raise TypeError('Info object (for %r) must be a dict, not %r' %
                             (type, info))
-        ev = Dict(info)  # make copy and turn into nicer Dict on py
-        ev.type = type
-        ev.source = self
+        if not this_is_js() and _transaction._depth:
+            _transaction._add_event(self, type, info)
+            return None  # emitted when the transaction ends
+        if this_is_js():
+            ev = Dict(info)  # make copy
+            ev.type = type
+            ev.source = self
+        else:
+            ev = Event(info, type=type, source=self)  # make copy
+            if profiler.enabled:
+                profiler._record_emit(self, type)
         # Push the event to the handlers (handlers use labels for dynamism)
         if self.__pending_events is not None:
             self.__pending_events.setdefault(ev.type, []).append(ev)
@@ -318,19 +381,21 @@ class HasEvents(with_metaclass(HasEventsMeta, object)):
         if not isinstance(prop_name, str):
             raise TypeError("_set_prop's first arg must be str, not %s" %
                              prop_name.__class__)
-        if prop_name not in self.__properties__:
+        # Get the validator function
+        if this_is_js():
+            func = None
+            if prop_name in self.__properties__:
+                func = self['_' + prop_name + '_func']  # set in init
+        else:
+            func = self.__prop_funcs__.get(prop_name, None)
+        if func is None:
             cname = self.__class__.__name__
             raise AttributeError('%s object has no property %r' % (cname, prop_name))
         prop_being_set = self.__props_being_set.get(prop_name, None)
         if prop_being_set:
             return
-        # Prepare
-        private_name = '_' + prop_name + '_value'
-        func_name = '_' + prop_name + '_func'  # set in init in both Py and JS
         # Validate value
         self.__props_being_set[prop_name] = True
-        self.__props_ever_set[prop_name] = True
-        func = getattr(self, func_name)
         try:
             if this_is_js():
                 value2 = func.apply(self, [value])
@@ -338,25 +403,141 @@ class HasEvents(with_metaclass(HasEventsMeta, object)):
                 value2 = func(self, value)
         finally:
             self.__props_being_set[prop_name] = False
-        # If not initialized yet, set
-        if prop_being_set is None:
-            setattr(self, private_name, value2)
-            self.emit(prop_name, dict(new_value=value2, old_value=value2))
-            return True
-        # Otherwise only set if value has changed
-        old = getattr(self, private_name)
+        # Compare with the old value
         if this_is_js():
+            private_name = '_' + prop_name + '_value'
+            old = self[private_name]
             is_equal = old == value2
-        elif hasattr(old, 'dtype') and hasattr(value2, 'dtype'):
-            import numpy as np
-            is_equal = np.array_equal(old, value2)
         else:
-            is_equal = type(old) == type(value2) and old == value2
+            values = self.__prop_values
+            old = values[prop_name]
+            if hasattr(old, 'dtype') and hasattr(value2, 'dtype'):
+                import numpy as np
+                is_equal = np.array_equal(old, value2)
+            else:
+                is_equal = type(old) == type(value2) and old == value2
+        # If not initialized yet, set. Otherwise only set if value has changed
+        if prop_being_set is None:
+            old = value2
+            is_equal = False
         if not is_equal:
-            setattr(self, private_name, value2)
-            self.emit(prop_name, dict(new_value=value2, old_value=old))
+            if this_is_js():
+                self[private_name] = value2
+            else:
+                values[prop_name] = value2
+            self._invalidate_dependents(prop_name)
+            if not this_is_js() and _transaction._depth and prop_being_set is not None:
+                _transaction._add_prop(self, prop_name, old)
+            else:
+                self.emit(prop_name, dict(new_value=value2, old_value=old))
             return True
     
+    ## Computed properties
+    
+    def _get_computed(self, name):
+        """ Get the value of a computed property, recomputing it if one of
+        its dependencies has changed.
+        """
+        if len(_tracking_stack):
+            _tracking_stack[-1].append([self, name])
+        if self.__computed_dirty[name]:
+            self._compute(name)
+        return self.__computed_values[name]
+    
+    def _compute(self, name):
+        # Get the function
+        if this_is_js():
+            func = self['_' + name + '_func']  # set in init
+        else:
+            func = self.__computed_funcs__[name]
+        # Call it, while recording the properties that are read
+        reads = []
+        _tracking_stack.append(reads)
+        try:
+            if this_is_js():
+                value = func.apply(self, [])
+            else:
+                value = func(self)
+        finally:
+            _tracking_stack.pop()
+        # Update our dependencies
+        for ob, dep_type in self.__computed_deps.get(name, []):
+            ob._remove_dependent(dep_type, self, name)
+        deps = []
+        for ob, dep_type in reads:
+            if ob._add_dependent(dep_type, self, name):
+                deps.append([ob, dep_type])
+        self.__computed_deps[name] = deps
+        self.__computed_dirty[name] = False
+        # Compare with the old value
+        first_time = name not in self.__computed_values
+        old = self.__computed_values.get(name, None)
+        if this_is_js():
+            is_equal = old == value
+        else:
+            if hasattr(old, 'dtype') and hasattr(value, 'dtype'):
+                import numpy as np
+                is_equal = np.array_equal(old, value)
+            else:
+                is_equal = type(old) == type(value) and old == value
+        if first_time:
+            old = value
+            is_equal = False
+        if not is_equal:
+            self.__computed_values[name] = value
+            self.emit(name, dict(new_value=value, old_value=old))
+    
+    def _schedule_compute(self, name):
+        # Compute in the next iteration, unless the value is read before that
+        def compute():
+            if self.__computed_dirty.get(name, False):
+                self._compute(name)
+        loop.call_later(compute)
+    
+    def _invalidate_computed(self, name):
+        # Called when one of the dependencies of a computed property changed
+        if self.__computed_dirty[name]:
+            return  # the things that depend on it are dirty as well
+        self.__computed_dirty[name] = True
+        self._invalidate_dependents(name)
+        if len(self.__handlers[name]):
+            self._schedule_compute(name)
+    
+    def _invalidate_dependents(self, type):
+        # Invalidate the computed properties that depend on the given
+        # property or computed property of this object.
+        dependents = self.__dependents.get(type, None)
+        if not dependents:
+            return
+        for i in range(len(dependents)-1, -1, -1):
+            ref, name = dependents[i]
+            ob = ref()
+            if ob is None:
+                dependents.pop(i)  # the object has been deleted (Python)
+            else:
+                ob._invalidate_computed(name)
+    
+    def _add_dependent(self, type, ob, name):
+        # Register that the computed property name of ob depends on the
+        # given type. Returns False if this was already registered.
+        dependents = self.__dependents.setdefault(type, [])
+        for ref, name2 in dependents:
+            if name2 == name and ref() is ob:
+                return False
+        if this_is_js():
+            dependents.append([lambda: ob, name])
+        else:
+            dependents.append([weakref.ref(ob), name])
+        return True
+    
+    def _remove_dependent(self, type, ob, name):
+        dependents = self.__dependents.get(type, [])
+        for i in range(len(dependents)-1, -1, -1):
+            ref, name2 = dependents[i]
+            ob2 = ref()
+            if ob2 is None or (name2 == name and ob2 is ob):
+                dependents.pop(i)
+    
     def get_event_types(self):
         """ Get the known event types for this HasEvent object. Returns
         a list of event type names, for which there is a
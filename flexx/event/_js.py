@@ -13,6 +13,8 @@ from flexx.event._hasevents import HasEvents
 
 
 Object = Date = console = setTimeout = undefined = None  # fool pyflake
+_tracking_stack = None  # noqa
+ArrayBuffer = Float64Array = None  # noqa
 
 reprs = json.dumps
 
@@ -20,6 +22,7 @@ reprs = json.dumps
 def py2js(*args, **kwargs):
     kwargs['inline_stdlib'] = False
     kwargs['docstrings'] = False
+    kwargs['optimize'] = True  # e.g. remove "if not this_is_js()" blocks
     return py2js_(*args, **kwargs)
 
 
@@ -35,15 +38,22 @@ class HasEventsJS:
     """
     
     _HANDLER_COUNT = 0
+    _HASEVENTS_COUNT = 0
     _IS_HASEVENTS = True
     
     def __init__(self, init_handlers=True):
         
         # Init some internal variables
+        HasEvents.prototype._HASEVENTS_COUNT += 1  # an id is used by Handler
+        self._hasevents_id = 'o' + str(HasEvents.prototype._HASEVENTS_COUNT)
         self.__handlers = {}
         self.__props_being_set = {}
-        self.__props_ever_set = {}
         self.__pending_events = {}
+        self.__handlers_changed_scheduled = False
+        self.__computed_values = {}
+        self.__computed_dirty = {}
+        self.__computed_deps = {}
+        self.__dependents = {}
         
         # Create properties
         for name in self.__properties__:
@@ -57,6 +67,13 @@ class HasEventsJS:
             if func.default is not undefined:
                 self._set_prop(name, func.default, True)
         
+        # Create computed properties
+        for name in self.__computed__:
+            self.__handlers.setdefault(name, [])
+            self.__computed_dirty[name] = True
+            self['_' + name + '_func'] = self[name]  # need in _compute()
+            self.__create_Computed(name)
+        
         # Create emitters
         for name in self.__emitters__:
             self.__handlers.setdefault(name, [])
@@ -103,6 +120,8 @@ class HasEventsJS:
     def __create_Property(self, name):
         private_name = '_' + name + '_value'
         def getter():
+            if len(_tracking_stack):
+                _tracking_stack[-1].append([self, name])
             return self[private_name]
         def setter(x):
             self._set_prop(name, x)
@@ -110,9 +129,24 @@ class HasEventsJS:
                 'get': getter, 'set': setter}
         Object.defineProperty(self, name, opts)
     
+    def __create_ListProperty(self, name):
+        self.__create_Property(name)
+    
+    def __create_ArrayProperty(self, name):
+        # Wrap the function so that it is always given a TypedArray
+        func = self['_' + name + '_func']
+        def array_func(v):
+            if not ArrayBuffer.isView(v):
+                v = Float64Array(v or [])
+            return func.apply(self, [v])
+        self['_' + name + '_func'] = array_func
+        self.__create_Property(name)
+    
     def __create_Readonly(self, name):
         private_name = '_' + name + '_value'
         def getter():
+            if len(_tracking_stack):
+                _tracking_stack[-1].append([self, name])
             return self[private_name]
         def setter(x):
             raise AttributeError('Readonly %s is not settable' % name)
@@ -120,6 +154,15 @@ class HasEventsJS:
                 'get': getter, 'set': setter}
         Object.defineProperty(self, name, opts)
     
+    def __create_Computed(self, name):
+        def getter():
+            return self._get_computed(name)
+        def setter(x):
+            raise AttributeError('Computed %s is not settable' % name)
+        opts = {'enumerable': True, 'configurable': True,  # i.e. overloadable
+                'get': getter, 'set': setter}
+        Object.defineProperty(self, name, opts)
+    
     def __create_Emitter(self, emitter_func, name):
         # Keep a ref to the emitter func, which is a class attribute. The object
         # attribute with the same name will be overwritten with the property below.
@@ -175,12 +218,17 @@ class Loop:
         """ Do one event loop iteration; process all pending function calls.
         """
         self._scheduled = False
-        while len(self._pending_calls):
-            func = self._pending_calls.pop(0)
+        # Walk the list rather than shifting it, which would be O(n)
+        pending_calls = self._pending_calls
+        i = 0
+        while i < len(pending_calls):
+            func = pending_calls[i]
+            i += 1
             try:
                 func()
             except Exception as err:
                 console.log(err)
+        self._pending_calls = []
 
 
 def get_HasEvents_js():
@@ -188,6 +236,8 @@ def get_HasEvents_js():
     """
     # Add the loop
     jscode = py2js(Loop, 'Loop') + '\nvar loop = new Loop();\n'
+    # Add the stack used to track the dependencies of computed properties
+    jscode += 'var _tracking_stack = [];\n'
     # Start with our special JS version
     jscode += py2js(HasEventsJS, 'HasEvents')
     # Add the Handler methods
@@ -241,7 +291,7 @@ def create_js_hasevents_class(cls, cls_name, base_class='HasEvents.Ƥ'):
     
     # Functions to ignore
     OK_MAGICS = ('__properties__', '__emitters__', '__handlers__',
-                 '__local_properties__')
+                 '__computed__', '__local_properties__')
     
     for name, val in sorted(cls.__dict__.items()):
         name = name.replace('_JS__', '_%s__' % cls_name.split('.')[-1])  # fix mangling
@@ -4,7 +4,11 @@ event loop such as tornado or Qt.
 """
 
 import sys
+import time
+from collections import deque
 
+from ._profiler import profiler
+from ._sweeper import sweeper
 from . import logger
 
 # todo: maybe this can be the base class for the tornado loop that we use in flexx.app
@@ -20,12 +24,20 @@ class Loop:
     ``flexx.event`` gets imported, the loop is integrated automatically.
     This object can also be used as a context manager; events get
     processed when the context exits.
+    
+    By default, an iteration processes all pending calls. To avoid
+    starving the host event loop when many calls are pending, a budget
+    can be set using ``set_budget()``; when the budget is exhausted, the
+    remaining calls are processed in the next iteration.
     """
     
     def __init__(self):
-        self._pending_calls = []
+        self._pending_calls = deque()
         self._calllaterfunc = lambda x: None
         self._scheduled_update = False
+        self._max_calls = None
+        self._max_time = None
+        self.reset_stats()
     
     def call_later(self, func):
         """ Call the given function in the next iteration of the event loop.
@@ -36,21 +48,88 @@ class Loop:
             self._calllaterfunc(self.iter)
     
     def iter(self):
-        """ Do one event loop iteration; process all pending function calls.
+        """ Do one event loop iteration; process all pending function calls,
+        or as many as the budget allows.
         """
         self._scheduled_update = False
-        while self._pending_calls:
-            func = self._pending_calls.pop(0)
+        self._iter(self._max_calls, self._max_time)
+        # Schedule the remainder
+        if self._pending_calls and not self._scheduled_update:
+            self._scheduled_update = True
+            self._calllaterfunc(self.iter)
+    
+    def _iter(self, max_calls, max_time):
+        pending_calls = self._pending_calls
+        pending = len(pending_calls)
+        stats = self._stats
+        stats['max_pending'] = max(stats['max_pending'], pending)
+        t0 = time.time()
+        count = 0
+        while pending_calls:
+            if max_calls is not None and count >= max_calls:
+                break
+            if max_time is not None and count and time.time() - t0 >= max_time:
+                break
+            func = pending_calls.popleft()
+            count += 1
             try:
                 func()
             except Exception as err:
                 logger.exception(err)
+        # Update stats
+        t1 = time.time()
+        duration = t1 - t0
+        if profiler.enabled:
+            profiler._record_loop_iter(pending, t0, t1)
+        if sweeper.enabled:
+            sweeper._maybe_sweep(t1)
+        stats['iterations'] += 1
+        stats['calls'] += count
+        stats['yields'] += bool(pending_calls)
+        stats['last_duration'] = duration
+        stats['max_duration'] = max(stats['max_duration'], duration)
+        stats['total_duration'] += duration
+    
+    def set_budget(self, max_calls=None, max_time=None):
+        """ Set the budget for a single iteration of this loop.
+        
+        Params:
+            max_calls (int, optional): the maximum number of function
+                calls to process per iteration.
+            max_time (float, optional): the maximum duration (in seconds)
+                of an iteration. At least one call is always processed.
+        """
+        if max_calls is not None and int(max_calls) < 1:
+            raise ValueError('Loop budget max_calls must be at least 1.')
+        if max_time is not None and float(max_time) <= 0:
+            raise ValueError('Loop budget max_time must be larger than 0.')
+        self._max_calls = None if max_calls is None else int(max_calls)
+        self._max_time = None if max_time is None else float(max_time)
+    
+    @property
+    def stats(self):
+        """ A dict with statistics for monitoring this loop: the number of
+        pending calls, the maximum number of pending calls, the number of
+        iterations and processed calls, the number of iterations that
+        stopped because the budget was exhausted ("yields"), and the
+        last, maximum and total iteration duration (in seconds).
+        """
+        stats = self._stats.copy()
+        stats['pending'] = len(self._pending_calls)
+        return stats
+    
+    def reset_stats(self):
+        """ Reset the statistics of this loop.
+        """
+        self._stats = dict(max_pending=0, iterations=0, calls=0, yields=0,
+                           last_duration=0.0, max_duration=0.0,
+                           total_duration=0.0)
     
     def __enter__(self):
         return self
     
     def __exit__(self, type, value, traceback):
-        self.iter()
+        self._iter(None, None)
     
     def integrate(self, call_later_func=None, raise_on_fail=True):
         """ Integrate with an existing event loop system.
@@ -0,0 +1,175 @@
+"""
+Implementation of a profiler to find out where time is spent in the
+event system.
+"""
+
+import json
+import time
+
+
+class Profiler:
+    """ An opt-in profiler for the event system. There is one instance in
+    ``flexx.event.profiler``. When enabled, it records for each handler
+    the number of calls, the number of events per call, and the
+    cumulative and maximum wall time. It also records how often each
+    event type is emitted, and the queue depth and duration of each
+    iteration of the event loop. When disabled (the default), the
+    overhead is a single attribute check.
+    
+    The results can be obtained as a dict, as a text table, or in the
+    trace-event format that can be loaded in Chrome (chrome://tracing).
+    
+    .. code-block:: python
+        
+        event.profiler.enable()
+        ...  # use the app
+        event.profiler.disable()
+        print(event.profiler.get_table())
+        event.profiler.save_trace('trace.json')
+    
+    Note that this only profiles the Python side.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.max_trace_events = 100000
+        self.reset()
+    
+    def enable(self):
+        """ Start recording.
+        """
+        self.enabled = True
+    
+    def disable(self):
+        """ Stop recording. The results are kept until ``reset()``.
+        """
+        self.enabled = False
+    
+    def reset(self):
+        """ Clear all recorded information.
+        """
+        self._t0 = time.time()
+        self._handlers = {}  # handler id -> [name, calls, events, total, max]
+        self._emitters = {}  # class name + type -> count
+        self._loop = [0, 0, 0.0, 0.0]  # iterations, max pending, total, max
+        self._trace = []
+    
+    ## Recording
+    
+    def _trace_event(self, name, cat, t0, t1, args=None):
+        if len(self._trace) < self.max_trace_events:
+            d = dict(name=name, cat=cat, ph='X', pid=1, tid=1,
+                     ts=(t0 - self._t0) * 1e6, dur=(t1 - t0) * 1e6)
+            if args:
+                d['args'] = args
+            self._trace.append(d)
+    
+    def _profile_handler(self, handler, events):
+        """ Call the handler with the given events and record stats.
+        """
+        t0 = time.time()
+        try:
+            return handler(*events)
+        finally:
+            t1 = time.time()
+            stats = self._handlers.get(handler._id, None)
+            if stats is None:
+                ob = handler._ob1()
+                name = handler._name
+                if ob is not None:
+                    name = ob.__class__.__name__ + '.' + name
+                stats = [name, 0, 0, 0.0, 0.0]
+                self._handlers[handler._id] = stats
+            stats[1] += 1
+            stats[2] += len(events)
+            stats[3] += t1 - t0
+            stats[4] = max(stats[4], t1 - t0)
+            self._trace_event(stats[0], 'handler', t0, t1,
+                              {'events': len(events)})
+    
+    def _record_emit(self, ob, type):
+        key = ob.__class__.__name__ + '.' + type
+        self._emitters[key] = self._emitters.get(key, 0) + 1
+    
+    def _record_loop_iter(self, pending, t0, t1):
+        stats = self._loop
+        stats[0] += 1
+        stats[1] = max(stats[1], pending)
+        stats[2] += t1 - t0
+        stats[3] = max(stats[3], t1 - t0)
+        self._trace_event('loop.iter', 'loop', t0, t1, {'pending': pending})
+        if len(self._trace) < self.max_trace_events:
+            self._trace.append(dict(name='pending calls', ph='C', pid=1, tid=1,
+                                    ts=(t0 - self._t0) * 1e6,
+                                    args={'pending': pending}))
+    
+    ## Output
+    
+    def get_stats(self):
+        """ Get a dict with the recorded statistics. The "handlers" and
+        "emitters" fields map names to dicts of statistics. Times are
+        in seconds.
+        """
+        elapsed = max(time.time() - self._t0, 1e-9)
+        handlers = {}
+        for name, calls, events, total, mx in self._handlers.values():
+            if name in handlers:  # multiple handlers with the same name
+                name = name + ' (%i)' % len(handlers)
+            handlers[name] = dict(calls=calls, events=events,
+                                  events_per_call=float(events) / calls,
+                                  total_time=total, max_time=mx)
+        emitters = {}
+        for name, count in self._emitters.items():
+            emitters[name] = dict(count=count, rate=count / elapsed)
+        iterations, max_pending, total, mx = self._loop
+        loop = dict(iterations=iterations, max_pending=max_pending,
+                    total_time=total, max_time=mx)
+        return dict(elapsed=elapsed, handlers=handlers, emitters=emitters,
+                    loop=loop)
+    
+    def get_table(self, n=20):
+        """ Get a text table of the (at most ``n``) hottest handlers and
+        emitters, and a summary of the event loop.
+        """
+        stats = self.get_stats()
+        lines = []
+        fmt = '%-40s %8s %8s %10s %10s %10s'
+        lines.append(fmt % ('handler', 'calls', 'ev/call', 'total ms',
+                            'mean ms', 'max ms'))
+        items = sorted(stats['handlers'].items(),
+                       key=lambda x: x[1]['total_time'], reverse=True)
+        for name, d in items[:n]:
+            lines.append(fmt % (name[-40:], d['calls'],
+                                '%1.1f' % d['events_per_call'],
+                                '%1.2f' % (d['total_time'] * 1000),
+                                '%1.3f' % (d['total_time'] * 1000 / d['calls']),
+                                '%1.2f' % (d['max_time'] * 1000)))
+        lines.append('')
+        fmt = '%-40s %8s %10s'
+        lines.append(fmt % ('event type', 'count', 'per sec'))
+        items = sorted(stats['emitters'].items(),
+                       key=lambda x: x[1]['count'], reverse=True)
+        for name, d in items[:n]:
+            lines.append(fmt % (name[-40:], d['count'], '%1.1f' % d['rate']))
+        lines.append('')
+        loop = stats['loop']
+        lines.append('loop: %i iterations, max %i pending calls, '
+                     'total %1.2f ms, max %1.2f ms' %
+                     (loop['iterations'], loop['max_pending'],
+                      loop['total_time'] * 1000, loop['max_time'] * 1000))
+        return '\n'.join(lines)
+    
+    def get_trace(self):
+        """ Get the recorded handler calls and loop iterations as a dict
+        in the Chrome trace-event format.
+        """
+        return dict(traceEvents=list(self._trace), displayTimeUnit='ms')
+    
+    def save_trace(self, filename):
+        """ Save the result of ``get_trace()`` as JSON to the given filename.
+        """
+        with open(filename, 'wb') as f:
+            f.write(json.dumps(self.get_trace()).encode())
+
+
+profiler = Profiler()
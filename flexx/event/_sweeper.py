@@ -0,0 +1,130 @@
+"""
+Implementation of a sweeper that cleans up handlers of which the
+object no longer exists, and references to disposed objects.
+"""
+
+import time
+import weakref
+from collections import deque
+
+from . import logger
+
+
+class Sweeper:
+    """ Cleans up handlers whose object has been deleted, and the
+    connections of handlers to disposed objects. There is one instance
+    in ``flexx.event.sweeper``.
+    
+    A handler holds a weak reference to the object that it belongs to,
+    but the objects that it is connected to hold a (strong) reference
+    to the handler. When the handler's object is deleted, the handler
+    would only find out (and dispose itself) when it receives an event.
+    Until then, it stays in the handler lists of these objects, and
+    keeps the objects that it is connected to alive.
+    
+    Further, a handler can still be connected to an object that has been
+    disposed, e.g. when the disposed object is still in a list property
+    that the handler connects to. These references keep the disposed
+    object alive.
+    
+    The sweeper keeps a weak reference to each handler, and checks
+    these in a round-robin fashion from the event loop, disposing the
+    handlers whose object no longer exists, and disconnecting the other
+    handlers from disposed objects. This is done at most once
+    per ``interval`` seconds, for at most ``slice_size`` handlers at a
+    time, and only when the event loop is active (an idle application
+    does not produce garbage).
+    
+    .. code-block:: python
+        
+        event.sweeper.interval = 5
+        ...
+        print(event.sweeper.get_stats())
+    
+    Note that this only applies to the Python side.
+    """
+    
+    def __init__(self):
+        self.enabled = True
+        self.interval = 1.0
+        self.slice_size = 1000
+        self._refs = deque()
+        self._last_sweep = time.time()
+        self._stats = dict(sweeps=0, checked=0, collected=0, disposed=0, pruned=0)
+        self._leaked = {}  # handler name -> count
+    
+    def _track(self, handler):
+        """ Start tracking the given handler. Called by the Handler class.
+        """
+        self._refs.append(weakref.ref(handler))
+    
+    def _maybe_sweep(self, t):
+        # Called from the event loop
+        if t - self._last_sweep >= self.interval:
+            self.sweep()
+    
+    def sweep(self, max_handlers=None):
+        """ Check (at most) the given number of handlers, and dispose the
+        ones whose object has been deleted. If not given, ``slice_size``
+        is used. Returns the number of handlers that were disposed.
+        """
+        refs = self._refs
+        stats = self._stats
+        n = min(len(refs), max_handlers or self.slice_size)
+        disposed = pruned = 0
+        for i in range(n):
+            ref = refs.popleft()
+            handler = ref()
+            if handler is None:
+                stats['collected'] += 1
+            elif handler._ob1() is None or (handler._ob2 is not None and
+                                            handler._ob2() is None):
+                handler.dispose()
+                self._leaked[handler._name] = self._leaked.get(handler._name, 0) + 1
+                disposed += 1
+            else:
+                pruned += self._prune(handler)
+                refs.append(ref)
+        stats['sweeps'] += 1
+        stats['checked'] += n
+        stats['disposed'] += disposed
+        stats['pruned'] += pruned
+        self._last_sweep = time.time()
+        if disposed:
+            logger.debug('Sweeper disposed %i handlers' % disposed)
+        return disposed
+    
+    def _prune(self, handler):
+        """ Disconnect the given handler from disposed objects. Returns
+        the number of disposed objects.
+        """
+        obs = {}
+        for connection in handler._connections:
+            for entry in connection.objects:
+                if getattr(entry[0], '_disposed', False):
+                    obs[id(entry[0])] = entry[0]
+        for ob in obs.values():
+            for connection in handler._connections:
+                for entry in connection.objects:
+                    if entry[0] is ob:
+                        ob.disconnect(entry[1], handler)
+            handler._clear_hasevents_refs(ob)
+        return len(obs)
+    
+    def get_stats(self):
+        """ Get a dict with statistics: the number of tracked handlers,
+        the number of sweeps and of checked handlers, the number of
+        handlers that were found to be garbage collected, the number
+        of (leaked) handlers that were disposed, and the number of
+        disposed objects that handlers were disconnected from ("pruned",
+        counted once per handler). The "leaked" field maps
+        handler names to the number of disposed handlers, which helps
+        finding the source of leaks.
+        """
+        stats = self._stats.copy()
+        stats['tracked'] = len(self._refs)
+        stats['leaked'] = self._leaked.copy()
+        return stats
+
+
+sweeper = Sweeper()
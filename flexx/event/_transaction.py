@@ -0,0 +1,114 @@
+"""
+Implementation of transactions to set multiple properties at once.
+"""
+
+import threading
+
+
+def transaction():
+    """ Get the context manager to group changes to properties (and
+    emitted events) into a single transaction.
+    
+    .. code-block:: python
+        
+        with event.transaction():
+            plot.xdata = x
+            plot.ydata = y
+            plot.yrange = min(y), max(y)
+    
+    Within a transaction, the events of properties that are set are
+    deferred until the end of the transaction. At that point, one event
+    is emitted for each property whose value differs from the value that
+    it had before the transaction, with "old_value" and "new_value"
+    referring to these two values. Other events are emitted at the end of
+    the transaction as well, in the order in which they were emitted.
+    Handlers thus never observe intermediate states. The values of the
+    properties themselves are updated immediately.
+    
+    For ``Model`` objects, the commands to synchronise the properties
+    with JavaScript are send to each session in a single message at the
+    end of the transaction. The client applies them all at once, so that
+    the JS handlers do not observe intermediate states either. Multiple
+    updates of the same property result in a single update.
+    
+    Transactions can be nested, in which case the outer transaction
+    determines when the events are emitted. A transaction only applies
+    to the thread in which it is used. Note that transactions only
+    apply to Python.
+    """
+    return _transaction
+
+
+class Transaction(threading.local):
+    """ The object returned by ``transaction()``. Its state is local to
+    the current thread.
+    """
+    
+    def __init__(self):
+        self._depth = 0
+        self._pending = []  # [ob, type, info, old_value, kwargs]
+        self._props = {}  # (id(ob), name) -> index in _pending
+        self._callbacks = []
+    
+    def __enter__(self):
+        self._depth += 1
+        return self
+    
+    def __exit__(self, type, value, traceback):
+        self._depth -= 1
+        if self._depth == 0:
+            self._flush()
+    
+    @property
+    def active(self):
+        """ Whether a transaction is currently active.
+        """
+        return self._depth > 0
+    
+    def _add_prop(self, ob, name, old_value):
+        # Called by HasEvents._set_prop() when a property changes
+        key = id(ob), name
+        if key not in self._props:
+            self._props[key] = len(self._pending)
+            self._pending.append([ob, name, None, old_value, {}])
+    
+    def _add_event(self, ob, type, info, **kwargs):
+        # Called by HasEvents.emit(). Subclasses can pass extra keyword
+        # arguments for their emit(), e.g. to tell where an event came from.
+        self._pending.append([ob, type, info, None, kwargs])
+    
+    def _call_on_exit(self, func):
+        # Call the given function when the transaction ends, after the
+        # events have been emitted. Used by sessions to send their commands.
+        # Since the sessions are still collecting commands while the events
+        # are emitted, events that are send to JS end up in the same
+        # message, after the property updates.
+        self._callbacks.append(func)
+    
+    def _flush(self):
+        pending, self._pending = self._pending, []
+        callbacks, self._callbacks = self._callbacks, []
+        self._props = {}
+        try:
+            for ob, type, info, old, kwargs in pending:
+                if info is None:
+                    new = getattr(ob, type)
+                    if not values_equal(old, new):
+                        ob.emit(type, dict(new_value=new, old_value=old))
+                else:
+                    ob.emit(type, info, **kwargs)
+        finally:
+            for func in callbacks:
+                func()
+
+
+def values_equal(a, b):
+    """ Compare two property values in the same way as ``_set_prop()``.
+    """
+    if hasattr(a, 'dtype') and hasattr(b, 'dtype'):
+        import numpy as np
+        return np.array_equal(a, b)
+    return type(a) == type(b) and a == b
+
+
+_transaction = Transaction()
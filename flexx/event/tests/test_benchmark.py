@@ -0,0 +1,114 @@
+""" Microbenchmarks for the event system. Use ``pytest -s`` to see the
+timings.
+"""
+
+import time
+
+from flexx.util.testing import run_tests_if_main, skipif
+
+from flexx import event
+from flexx.event._dict import Dict, Event
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover - legacy py
+    tracemalloc = None
+
+
+def create_dict_event(info, source):
+    # How events were created before
+    ev = Dict(info)
+    ev.type = 'foo'
+    ev.source = source
+    return ev
+
+
+def create_event(info, source):
+    return Event(info, type='foo', source=source)
+
+
+def measure_time(func, n=10000):
+    info = dict(old_value=1, new_value=2)
+    source = object()
+    best = float('inf')
+    for i in range(3):
+        t0 = time.time()
+        for j in range(n):
+            func(info, source)
+        best = min(best, time.time() - t0)
+    return best / n
+
+
+def measure_memory(func, n=1000):
+    info = dict(old_value=1, new_value=2)
+    source = object()
+    tracemalloc.start()
+    try:
+        events = [func(info, source) for i in range(n)]
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(events) == n
+    return size / n
+
+
+def test_event_creation_time():
+    t1 = measure_time(create_dict_event)
+    t2 = measure_time(create_event)
+    print('Create event: %1.2f us (was %1.2f us with Dict)' % (t2 * 1e6, t1 * 1e6))
+    # Timings are not reliable, but an event is a plain dict without __dict__
+    ev = create_event({}, None)
+    assert type(ev).__bases__ == (dict, )
+    assert not hasattr(ev, '__dict__')
+
+
+@skipif(tracemalloc is None, reason='need tracemalloc')
+def test_event_creation_memory():
+    m1 = measure_memory(create_dict_event)
+    m2 = measure_memory(create_event)
+    print('Event size: %i bytes (was %i bytes with Dict)' % (m2, m1))
+    assert m2 < 0.75 * m1
+
+
+class Foo(event.HasEvents):
+    
+    @event.prop
+    def bar(self, v=0):
+        return v
+    
+    @event.prop
+    def spam(self, v=''):
+        return str(v)
+    
+    @event.connect('bar')
+    def on_bar(self, *events):
+        pass
+
+
+def test_instantiation_time():
+    n = 1000
+    t0 = time.time()
+    obs = [Foo() for i in range(n)]
+    t1 = time.time()
+    event.loop.iter()
+    print('Create HasEvents object: %1.2f us' % ((t1 - t0) / n * 1e6))
+    assert obs[0].spam == ''
+
+
+def test_emit_time():
+    
+    foo = Foo()
+    event.loop.iter()
+    n = 10000
+    t0 = time.time()
+    for i in range(n):
+        foo.bar = i
+    t1 = time.time()
+    event.loop.iter()
+    t2 = time.time()
+    print('Set prop: %1.2f us, handle: %1.2f us per event' %
+          ((t1 - t0) / n * 1e6, (t2 - t1) / n * 1e6))
+    assert foo.bar == n - 1
+
+
+run_tests_if_main()
@@ -427,6 +427,84 @@ def test_prop_recursion(PropRecursion):
     return []
 
 
+class ArrayPropOb(event.HasEvents):
+    
+    @event.arrayprop
+    def data(self, v=()):
+        assert len(v) < 10
+        return v
+
+
+@run_in_both(ArrayPropOb, "[0, 3, true, 3, 'fail']")
+def test_arrayprop(ArrayPropOb):
+    
+    res = []
+    m = ArrayPropOb()
+    res.append(len(m.data))
+    m.data = [1, 2, 3]
+    res.append(len(m.data))
+    res.append(bool(m.data[1] * 2 == 4))
+    try:
+        m.data = list(range(20))
+    except Exception:
+        res.append(len(m.data))
+        res.append('fail')
+    return res
+
+
+class ComputedOb(event.HasEvents):
+    
+    def __init__(self):
+        self.count = 0
+        self.r = []
+        super().__init__()
+    
+    @event.prop
+    def first_name(self, v='john'):
+        return str(v)
+    
+    @event.prop
+    def last_name(self, v='doe'):
+        return str(v)
+    
+    @event.computed
+    def full_name(self):
+        self.count += 1
+        return self.first_name + ' ' + self.last_name
+    
+    @event.computed
+    def initials(self):
+        return self.full_name[0] + self.last_name[0]
+    
+    @event.connect('initials')
+    def _initials_logger(self, *events):
+        for ev in events:
+            self.r.append(ev.new_value)
+
+
+@run_in_both(ComputedOb, "['john doe', 1, 'john doe', 1, 1, 'jane doe', 2, ['jd', 'jr'], 3]")
+def test_computed(ComputedOb):
+    
+    res = []
+    m = ComputedOb()
+    res.append(m.full_name)
+    res.append(m.count)
+    res.append(m.full_name)
+    res.append(m.count)
+    m.first_name = 'jane'
+    res.append(m.count)
+    res.append(m.full_name)
+    res.append(m.count)
+    loop.iter()
+    loop.iter()
+    m.last_name = 'roe'
+    loop.iter()
+    loop.iter()
+    res.append(m.r)
+    res.append(m.count)
+    return res
+
+
 ## Test HasEvents class
 
 @run_in_both(Person, "[3, 'bar', [1, 2, 3]]")
@@ -1389,4 +1467,43 @@ def test_dynamism5(Node):
     return res
 
 
+@run_in_both(Node, "[0, 17, 18, 19, 27]")
+def test_dynamism6(Node):
+    # An object that is in the path more than once stays connected
+    # until all references are removed
+    n = Node()
+    p = Node()
+    c1, c2, c3, c4 = Node(), Node(), Node(), Node()
+    c1.parent = p
+    c2.parent = p
+    n.children = c1, c2, c3
+    
+    res = []
+    def func(*events):
+        for ev in events:
+            res.append(ev.new_value)
+    handler = n.connect(func, 'children*.parent.val')
+    
+    loop.iter()
+    
+    p.val = 17
+    handler.handle_now()
+    n.children = c2, c3  # p is still the parent of c2
+    handler.handle_now()
+    p.val = 18
+    handler.handle_now()
+    c3.parent = p
+    c2.parent = None  # p is the parent of c3
+    handler.handle_now()
+    p.val = 19
+    handler.handle_now()
+    c4.parent = n
+    n.children = c2, c4  # p is not in the path anymore
+    handler.handle_now()
+    p.val = 20
+    n.val = 27
+    handler.handle_now()
+    return res
+
+
 run_tests_if_main()
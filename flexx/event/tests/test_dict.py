@@ -83,4 +83,30 @@ def test_dir_and_repr():
     assert 42 not in names
 
 
+def test_event():
+    
+    ev = event.Event({'x': 1, 'a b': 2}, type='foo', source=None)
+    assert isinstance(ev, dict)
+    assert ev.type == 'foo' and ev['type'] == 'foo'
+    assert ev.x == 1
+    assert ev['a b'] == 2
+    assert ev.source is None
+    assert len(ev) == 4
+    
+    ev.y = 3
+    assert ev['y'] == 3
+    del ev.y
+    assert 'y' not in ev
+    with raises(AttributeError):
+        ev.y
+    with raises(AttributeError):
+        ev.items = 3
+    with raises(AttributeError):
+        del ev.y
+    
+    assert 'x' in dir(ev) and 'keys' in dir(ev)
+    assert repr(ev).startswith('Event(')
+    assert "('a b', 2)" in repr(ev)
+
+
 run_tests_if_main()
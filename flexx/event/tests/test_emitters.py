@@ -202,6 +202,117 @@ def test_readonly():
     assert ob.foo is None
 
 
+def test_computed():
+    
+    class MyObject(event.HasEvents):
+        
+        count = 0
+        
+        @event.prop
+        def foo(self, v=1):
+            return float(v)
+        
+        @event.prop
+        def bar(self, v=2):
+            return float(v)
+        
+        @event.computed
+        def spam(self):
+            self.count += 1
+            return self.foo + self.bar
+        
+        @event.computed
+        def eggs(self):
+            return self.spam * 2
+    
+    m = MyObject()
+    assert m.count == 0  # lazy
+    assert m.eggs == 6
+    assert m.spam == 3
+    assert m.count == 1  # cached
+    
+    m.foo = 2
+    assert m.count == 1  # invalidated, but not recomputed yet
+    assert m.eggs == 8
+    assert m.count == 2
+    m.foo = 2  # no change
+    assert m.eggs == 8
+    assert m.count == 2
+    
+    # Dependencies on other objects
+    m2 = MyObject()
+    class Other(event.HasEvents):
+        @event.computed
+        def total(self):
+            return m.spam + m2.spam
+    o = Other()
+    assert o.total == 7
+    m2.bar = 10
+    assert o.total == 15
+    
+    # Dependents do not keep objects alive
+    assert len(m._HasEvents__dependents['spam']) == 2  # eggs and total
+    event.loop.iter()  # the loop holds a ref until it has iterated
+    del o
+    m.foo = 3
+    assert len(m._HasEvents__dependents['spam']) == 1
+    
+    # Dispose clears dependencies
+    m.dispose()
+    assert not m._HasEvents__dependents
+    assert not m._HasEvents__computed_deps
+    
+    # fails
+    
+    with raises(AttributeError):
+        m.spam = 3
+    
+    with raises(AttributeError):
+        del m.spam
+    
+    with raises(TypeError):
+        event.computed(3)  # computed decorator needs callable
+
+
+def test_computed_events():
+    
+    class MyObject(event.HasEvents):
+        
+        @event.prop
+        def foo(self, v=1):
+            return float(v)
+        
+        @event.computed
+        def spam(self):
+            return self.foo * 2
+    
+    m = MyObject()
+    res = []
+    @m.connect('spam')
+    def handle_spam(*events):
+        res.extend([ev.new_value for ev in events])
+    
+    # Connected computed props are computed without being read
+    event.loop.iter()
+    assert res == [2]
+    
+    m.foo = 2
+    m.foo = 3
+    event.loop.iter()
+    event.loop.iter()
+    assert res == [2, 6]
+    
+    # Reading it emits the event as well
+    m.foo = 4
+    assert m.spam == 8
+    event.loop.iter()
+    assert res == [2, 6, 8]
+    
+    m.foo = 4  # no change
+    event.loop.iter()
+    assert res == [2, 6, 8]
+
+
 def test_emitter():
     
     class MyObject(event.HasEvents):
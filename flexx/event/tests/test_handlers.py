@@ -372,6 +372,104 @@ def test_exceptions():
         handle_foo()
 
 
+class Node(event.HasEvents):
+    
+    registered = 0
+    
+    @event.prop
+    def children(self, v=()):
+        return tuple(v)
+    
+    @event.emitter
+    def foo(self):
+        return {}
+    
+    def _register_handler(self, *args):
+        Node.registered += 1
+        return super()._register_handler(*args)
+
+
+def test_dynamism_reconnects_incrementally():
+    
+    root = Node(children=[Node(children=[Node()]) for i in range(20)])
+    events = []
+    handler = root.connect(lambda *evs: events.extend(evs), 'children**.foo')
+    event.loop.iter()
+    # root.children, and for each child its children, foo, and grandchild
+    assert len(handler.get_connection_info()[0][1]) == 1 + 20 * 4
+    
+    # Replacing one child only connects to that child and its children
+    Node.registered = 0
+    new_child = Node(children=[Node()])
+    children = list(root.children)
+    old_child = children[7]
+    children[7] = new_child
+    root.children = children
+    event.loop.iter()
+    assert Node.registered == 4
+    assert len(handler.get_connection_info()[0][1]) == 1 + 20 * 4
+    
+    # Old child is disconnected, new child is connected, others still are
+    old_child.foo()
+    new_child.foo()
+    new_child.children[0].foo()
+    root.children[8].foo()
+    event.loop.iter()
+    assert [ev.source for ev in events] == [new_child, new_child.children[0],
+                                            root.children[8]]
+    
+    # Changing a grandchild only traverses the subtree of that child
+    seeked = []
+    seek = handler._seek_event_object
+    handler._seek_event_object = lambda *args: seeked.append(args[2]) or seek(*args)
+    Node.registered = 0
+    grandchildren = [Node(), Node()]
+    root.children[3].children = grandchildren
+    event.loop.iter()
+    del handler._seek_event_object
+    assert set(seeked) == set(grandchildren)
+    assert Node.registered == 4
+    assert len(handler.get_connection_info()[0][1]) == 1 + 20 * 4 + 2
+    
+    # Replacing all children
+    Node.registered = 0
+    root.children = [Node() for i in range(3)]
+    event.loop.iter()
+    assert Node.registered == 3 * 2
+    assert len(handler.get_connection_info()[0][1]) == 1 + 3 * 2
+
+
+def test_dynamism_reconnects_after_dispose():
+    
+    a, b, c = Node(), Node(), Node()
+    root = Node(children=[a, b, c])
+    events = []
+    handler = root.connect(lambda *evs: events.extend(evs), 'children*.foo')
+    event.loop.iter()
+    assert len(handler.get_connection_info()[0][1]) == 1 + 3
+    
+    # Dispose a child, then replace another child
+    a.dispose()
+    c2 = Node()
+    root.children = [a, b, c2]
+    event.loop.iter()
+    entries = handler._connections[0].objects
+    assert [e[0] for e in entries] == [root, a, b, c2]  # a is still a child
+    
+    # The replaced child is disconnected
+    c.foo()
+    b.foo()
+    c2.foo()
+    event.loop.iter()
+    assert [ev.source for ev in events] == [b, c2]
+    
+    # The handler does not keep the replaced child alive
+    c_ref = weakref.ref(c)
+    del c
+    gc.collect()
+    assert c_ref() is None
+
+
 def test_dispose1():
     
     h = event.HasEvents()
@@ -97,6 +97,44 @@ def test_get_event_handlers():
         foo.get_event_handlers('x:a')
 
 
+def test_handlers_changed_hook_is_batched():
+    
+    class Foo(event.HasEvents):
+        def __init__(self):
+            self.changes = 0
+            super().__init__()
+        def _handlers_changed_hook(self):
+            self.changes += 1
+        @event.emitter
+        def x(self):
+            return {}
+    
+    foo = Foo()
+    event.loop.iter()
+    foo.changes = 0
+    
+    handlers = []
+    for i in range(20):
+        handlers.append(foo.connect(lambda *events: None, 'x:h%02i' % (19 - i)))
+    assert foo.changes == 0
+    event.loop.iter()
+    assert foo.changes == 1
+    
+    # Handlers are sorted by label
+    assert foo.get_event_handlers('x') == list(reversed(handlers))
+    
+    # Registering an existing handler again does not add it twice
+    foo._register_handler('x:h05', handlers[14])
+    assert len(foo.get_event_handlers('x')) == 20
+    
+    for h in handlers:
+        h.dispose()
+    assert foo.changes == 1
+    event.loop.iter()
+    assert foo.changes == 2
+    assert foo.get_event_handlers('x') == []
+
+
 def test_that_methods_starting_with_on_are_not_autoconverted():
     # There is also a warning, but seems a bit of a fuzz to test
     class Foo(event.HasEvents):
@@ -1,4 +1,6 @@
 
+import time
+
 from flexx.util.testing import run_tests_if_main, skipif, skip, raises
 
 from flexx import event
@@ -81,4 +83,60 @@ def test_integrate():
     event.loop._calllaterfunc = ori
 
 
+def test_budget():
+    
+    res = []
+    scheduled = []
+    ori = event.loop._calllaterfunc
+    event.loop._calllaterfunc = scheduled.append
+    event.loop.iter()
+    event.loop.reset_stats()
+    try:
+        for i in range(10):
+            event.loop.call_later(lambda i=i: res.append(i))
+        assert len(scheduled) == 1
+        assert event.loop.stats['pending'] == 10
+        
+        # Process in chunks, the remainder is scheduled
+        event.loop.set_budget(max_calls=4)
+        event.loop.iter()
+        assert res == [0, 1, 2, 3]
+        assert len(scheduled) == 2
+        event.loop.iter()
+        event.loop.iter()
+        assert res == list(range(10))
+        assert len(scheduled) == 3
+        
+        stats = event.loop.stats
+        assert stats['pending'] == 0
+        assert stats['max_pending'] == 10
+        assert stats['iterations'] == 3
+        assert stats['calls'] == 10
+        assert stats['yields'] == 2
+        assert stats['max_duration'] >= stats['last_duration'] >= 0
+        
+        # Time budget, at least one call is processed
+        res[:] = []
+        event.loop.set_budget(max_time=0.0001)
+        for i in range(3):
+            event.loop.call_later(lambda i=i: (res.append(i), time.sleep(0.001)))
+        event.loop.iter()
+        assert res == [0]
+        
+        # The context manager processes all calls
+        with event.loop:
+            pass
+        assert res == [0, 1, 2]
+        
+        with raises(ValueError):
+            event.loop.set_budget(max_calls=0)
+        with raises(ValueError):
+            event.loop.set_budget(max_time=-1)
+    
+    finally:
+        event.loop.set_budget()
+        event.loop._calllaterfunc = ori
+        event.loop._scheduled_update = False
+
+
 run_tests_if_main()
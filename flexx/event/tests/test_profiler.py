@@ -0,0 +1,75 @@
+""" Test the event profiler.
+"""
+
+import os
+import json
+import tempfile
+
+from flexx.util.testing import run_tests_if_main
+
+from flexx import event
+
+
+class Foo(event.HasEvents):
+    
+    @event.prop
+    def bar(self, v=0):
+        return v
+    
+    @event.connect('bar')
+    def on_bar(self, *events):
+        pass
+
+
+def test_profiler():
+    
+    profiler = event.profiler
+    foo = Foo()
+    event.loop.iter()
+    
+    # Disabled by default, nothing is recorded
+    assert not profiler.enabled
+    profiler.reset()
+    foo.bar = 1
+    event.loop.iter()
+    assert profiler.get_stats()['handlers'] == {}
+    
+    profiler.enable()
+    try:
+        foo.bar = 2
+        foo.bar = 3
+        event.loop.iter()
+        foo.bar = 4
+        event.loop.iter()
+    finally:
+        profiler.disable()
+    
+    stats = profiler.get_stats()
+    d = stats['handlers']['Foo.on_bar']
+    assert d['calls'] == 2
+    assert d['events'] == 3
+    assert d['events_per_call'] == 1.5
+    assert d['max_time'] <= d['total_time']
+    assert stats['emitters']['Foo.bar']['count'] == 3
+    assert stats['loop']['iterations'] == 2
+    assert stats['loop']['max_pending'] >= 1
+    
+    table = profiler.get_table()
+    assert 'Foo.on_bar' in table and 'Foo.bar' in table
+    
+    # Trace
+    trace = profiler.get_trace()
+    names = [ev['name'] for ev in trace['traceEvents']]
+    assert names.count('Foo.on_bar') == 2
+    assert names.count('loop.iter') == 2
+    filename = os.path.join(tempfile.gettempdir(), 'flexx_event_trace.json')
+    profiler.save_trace(filename)
+    with open(filename, 'rb') as f:
+        assert json.loads(f.read().decode()) == trace
+    os.remove(filename)
+    
+    profiler.reset()
+    assert profiler.get_stats()['handlers'] == {}
+
+
+run_tests_if_main()
@@ -0,0 +1,138 @@
+""" Test the sweeper.
+"""
+
+import gc
+
+from flexx.util.testing import run_tests_if_main
+
+from flexx import event
+
+
+class Foo(event.HasEvents):
+    
+    @event.prop
+    def bar(self, v=0):
+        return v
+
+
+class Parent(event.HasEvents):
+    
+    @event.prop
+    def children(self, v=()):
+        return tuple(v)
+
+
+class Listener:
+    
+    def __init__(self):
+        self.r = []
+    
+    def on_bar(self, *events):
+        self.r.extend(ev.new_value for ev in events)
+
+
+def test_sweeper():
+    
+    sweeper = event.sweeper
+    foo = Foo()
+    listeners = [Listener() for i in range(10)]
+    for listener in listeners:
+        foo.connect(listener.on_bar, 'bar')
+    event.loop.iter()
+    assert len(foo.get_event_handlers('bar')) == 10
+    
+    # Delete the listeners; their handlers stay connected
+    del listener
+    del listeners[5:]
+    gc.collect()
+    assert len(foo.get_event_handlers('bar')) == 10
+    
+    # Sweep in slices; all handlers get checked eventually
+    stats1 = sweeper.get_stats()
+    disposed = 0
+    for i in range(stats1['tracked']):
+        disposed += sweeper.sweep(2)
+        if disposed == 5:
+            break
+    assert disposed == 5
+    assert len(foo.get_event_handlers('bar')) == 5
+    
+    stats2 = sweeper.get_stats()
+    assert stats2['disposed'] - stats1['disposed'] == 5
+    assert stats2['leaked']['on_bar'] - stats1['leaked'].get('on_bar', 0) == 5
+    assert stats2['sweeps'] > stats1['sweeps']
+    
+    # The remaining handlers work
+    foo.bar = 3
+    event.loop.iter()
+    assert [listener.r for listener in listeners] == [[0, 3]] * 5
+
+
+def test_sweeper_loop():
+    
+    sweeper = event.sweeper
+    assert sweeper.enabled
+    foo = Foo()
+    listener = Listener()
+    foo.connect(listener.on_bar, 'bar')
+    event.loop.iter()
+    del listener
+    gc.collect()
+    assert len(foo.get_event_handlers('bar')) == 1
+    
+    # The loop sweeps when the interval has passed
+    interval, slice_size = sweeper.interval, sweeper.slice_size
+    sweeper.interval = 0
+    sweeper.slice_size = sweeper.get_stats()['tracked']
+    try:
+        event.loop.iter()
+    finally:
+        sweeper.interval, sweeper.slice_size = interval, slice_size
+    assert len(foo.get_event_handlers('bar')) == 0
+    
+    # Handlers of deleted objects are not tracked anymore
+    tracked = sweeper.get_stats()['tracked']
+    sweeper.sweep(tracked)
+    foos = [Foo() for i in range(10)]
+    for foo in foos:
+        foo.connect(lambda *events: None, 'bar')
+    event.loop.iter()
+    del foo, foos
+    gc.collect()
+    sweeper.sweep(tracked + 10)
+    assert sweeper.get_stats()['tracked'] <= tracked
+
+
+
+def test_sweeper_prunes_disposed_objects():
+    
+    sweeper = event.sweeper
+    foo1, foo2 = Foo(), Foo()
+    parent = Parent(children=[foo1, foo2])
+    events = []
+    handler = parent.connect(lambda *evs: events.extend(evs), 'children*.bar')
+    event.loop.iter()
+    
+    # Dispose a child that stays in the list; a reconnect connects it again
+    foo1.dispose()
+    parent.children = [foo1, foo2, Foo()]
+    event.loop.iter()
+    assert len(foo1.get_event_handlers('bar')) == 1
+    assert foo1 in [entry[0] for entry in handler._connections[0].objects]
+    
+    # The sweeper disconnects the handler from the disposed object
+    pruned = sweeper.get_stats()['pruned']
+    sweeper.sweep(sweeper.get_stats()['tracked'])
+    assert sweeper.get_stats()['pruned'] == pruned + 1
+    assert len(foo1.get_event_handlers('bar')) == 0
+    assert foo1 not in [entry[0] for entry in handler._connections[0].objects]
+    assert len(foo2.get_event_handlers('bar')) == 1
+    
+    # The handler still works
+    events[:] = []
+    foo2.bar = 3
+    event.loop.iter()
+    assert [ev.new_value for ev in events] == [3]
+
+
+run_tests_if_main()
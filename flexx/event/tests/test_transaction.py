@@ -0,0 +1,141 @@
+""" Test transactions.
+"""
+
+import threading
+
+from flexx.util.testing import run_tests_if_main, raises
+
+from flexx import event
+
+
+class Foo(event.HasEvents):
+    
+    def __init__(self):
+        super().__init__()
+        self.r = []
+    
+    @event.prop
+    def foo(self, v=0):
+        return int(v)
+    
+    @event.prop
+    def bar(self, v=0):
+        return int(v)
+    
+    @event.connect('foo', 'bar', '!spam')
+    def on_foo_bar(self, *events):
+        for ev in events:
+            if ev.type == 'spam':
+                self.r.append('spam')
+            else:
+                self.r.append('%s %i %i' % (ev.type, ev.old_value, ev.new_value))
+
+
+def test_transaction():
+    
+    foo = Foo()
+    event.loop.iter()
+    foo.r = []
+    
+    with event.transaction():
+        assert event.transaction().active
+        foo.foo = 1
+        foo.foo = 2
+        foo.emit('spam', {})
+        foo.bar = 3
+        foo.bar = 4
+        foo.bar = 0  # back to the old value
+        assert foo.foo == 2  # value is set immediately
+        assert len(foo.on_foo_bar._pending) == 0
+    
+    assert not event.transaction().active
+    event.loop.iter()
+    assert foo.r == ['foo 0 2', 'spam']
+
+
+def test_transaction_nested():
+    
+    foo = Foo()
+    event.loop.iter()
+    foo.r = []
+    
+    with event.transaction():
+        foo.foo = 1
+        with event.transaction():
+            foo.bar = 1
+        assert len(foo.on_foo_bar._pending) == 0
+        foo.foo = 2
+    
+    event.loop.iter()
+    assert foo.r == ['foo 0 2', 'bar 0 1']
+
+
+def test_transaction_error():
+    
+    foo = Foo()
+    event.loop.iter()
+    foo.r = []
+    
+    # Events are emitted even if there was an error
+    with raises(ValueError):
+        with event.transaction():
+            foo.foo = 3
+            foo.bar = 'x'
+    
+    assert not event.transaction().active
+    event.loop.iter()
+    assert foo.r == ['foo 0 3']
+
+
+def test_transaction_init():
+    
+    # The initial events of new objects are not swallowed
+    with event.transaction():
+        foo = Foo()
+        foo.foo = 7
+    
+    event.loop.iter()
+    assert foo.r == ['bar 0 0', 'foo 0 0', 'foo 0 7']
+
+
+def test_transaction_callbacks():
+    
+    foo = Foo()
+    event.loop.iter()
+    foo.r = []
+    
+    res = []
+    with event.transaction() as t:
+        foo.foo = 1
+        t._call_on_exit(lambda: res.append(len(foo.on_foo_bar._pending)))
+    
+    assert res == [1]  # events are emitted before the callbacks are called
+
+
+def test_transaction_threads():
+    
+    foo1, foo2 = Foo(), Foo()
+    event.loop.iter()
+    foo1.r, foo2.r = [], []
+    
+    # A transaction in one thread does not affect other threads
+    res = []
+    def set_in_thread():
+        res.append(event.transaction().active)
+        foo2.foo = 2
+        res.append(len(foo2.on_foo_bar._pending))
+    
+    with event.transaction():
+        foo1.foo = 1
+        t = threading.Thread(target=set_in_thread)
+        t.start()
+        t.join()
+        assert event.transaction().active
+        assert len(foo1.on_foo_bar._pending) == 0
+    
+    assert res == [False, 1]
+    event.loop.iter()
+    assert foo1.r == ['foo 0 1'] and foo2.r == ['foo 0 2']
+
+
+run_tests_if_main()
@@ -251,11 +251,13 @@ class Parser(Parser3):
             (default True).
         inline_stdlib (bool): whether the used stdlib functions are inlined
             (default True). Set to False if the stdlib is already loaded.
+        optimize (bool): whether to fold constants (like ``this_is_js()``)
+            and remove unreachable code (default False).
     """
     pass
 
 
-from .functions import py2js, evaljs, evalpy, script2js, js_rename, get_full_std_lib
+from .functions import py2js, py2js_many, evaljs, evalpy, script2js, js_rename, get_full_std_lib
 
 # Create stubs
 
@@ -0,0 +1,425 @@
+"""
+Headless benchmarks for PyScript, to track the performance of the
+transpiler and of the generated code over time.
+
+The transpile benchmarks measure how fast Python code is converted to
+JavaScript. The runtime benchmarks measure how fast the generated code
+runs; they use Node.js (via ``evaljs()``) and are skipped if it is not
+available. Times are in seconds (the best of a few runs), so lower is
+better.
+
+Results can be stored as JSON, and compared to a baseline: a benchmark
+that is slower than the baseline by more than its threshold (a fraction,
+e.g. 0.25 means 25% slower) is flagged as a regression.
+
+From the command line:
+
+.. code-block:: none
+    
+    python -m flexx.pyscript.benchmark [names] [--save=file.json]
+        [--baseline=file.json] [--threshold=0.25] [--size=1.0]
+
+The exit code is 1 if there are regressions.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+
+from . import py2js, evaljs, Parser
+from . import commonast
+from . import functions
+
+perf_counter = getattr(time, 'perf_counter', time.time)
+
+BENCHMARKS = []  # list of Benchmark objects, in order of definition
+
+
+class SkipBenchmark(Exception):
+    """ Raised by a benchmark that cannot run in this environment.
+    """
+    pass
+
+
+class Benchmark:
+    """ A named benchmark. The function is called with a size factor
+    and returns either a Python callable (to time in Python) or a tuple
+    (jscode, expression) to time the expression in Node.js.
+    """
+    
+    def __init__(self, func, kind, threshold):
+        self.func = func
+        self.name = func.__name__
+        self.kind = kind
+        self.threshold = threshold
+        self.doc = (func.__doc__ or '').strip()
+    
+    def __repr__(self):
+        return '<Benchmark %s (%s)>' % (self.name, self.kind)
+    
+    def run(self, size=1.0, repeat=3):
+        """ Run the benchmark and return the best time, in seconds.
+        """
+        ob = self.func(size)
+        if isinstance(ob, tuple):
+            return _time_js(ob[0], ob[1], repeat)
+        best = float('inf')
+        for i in range(repeat):
+            t0 = perf_counter()
+            ob()
+            best = min(best, perf_counter() - t0)
+        return best
+
+
+def benchmark(kind, threshold=0.25):
+    """ Decorator to register a benchmark function.
+    """
+    def _benchmark(func):
+        BENCHMARKS.append(Benchmark(func, kind, threshold))
+        return func
+    return _benchmark
+
+
+def _time_js(jscode, expression, repeat):
+    if not node_is_available():
+        raise SkipBenchmark('Node.js is not available')
+    # Time inside node, so that the startup time is not included
+    code = [jscode]
+    code.append('var best = Infinity;')
+    code.append('for (var run=0; run<%i; run++) {' % (repeat + 1))
+    code.append('    var t = process.hrtime();')
+    code.append('    %s;' % expression)
+    code.append('    t = process.hrtime(t);')
+    code.append('    if (run > 0) { best = Math.min(best, t[0] + t[1] * 1e-9); }')
+    code.append('}')
+    code.append('best;')
+    return float(evaljs('\n'.join(code)))
+
+
+NODE_AVAILABLE = None
+def node_is_available():
+    """ Get whether Node.js can be used to run JavaScript.
+    """
+    global NODE_AVAILABLE
+    if NODE_AVAILABLE is None:
+        try:
+            NODE_AVAILABLE = evaljs('1') == '1'
+        except Exception:
+            NODE_AVAILABLE = False
+    return NODE_AVAILABLE
+
+
+## Transpile benchmarks
+
+def py2js_uncached(code):
+    """ py2js() without its cache, so that the code is transpiled again
+    on each run of a benchmark.
+    """
+    functions._cache.clear()
+    return py2js(code)
+
+
+STDLIB_SAMPLE = """
+def process(items, names, options):
+    result = {}
+    for i, item in enumerate(sorted(items)):
+        key = str(item).strip().lower()
+        if key in result or key.startswith('_'):
+            continue
+        result[key] = [x * 2 for x in range(i) if x % 3]
+    words = ' '.join(names).split(' ')
+    counts = dict(zip(words, map(lambda w: len(w), words)))
+    total = sum(counts.values()) + max(counts.values()) - min([len(w) for w in words])
+    for key, value in options.items():
+        if isinstance(value, list):
+            value.extend(reversed(value))
+            value.insert(0, value.pop())
+        elif hasattr(value, 'keys'):
+            value.update(options.copy())
+            value.setdefault('foo', []).append(round(abs(total) / 3.0))
+    label = '%s: %i items, %i' % (options.get('label', 'x'), len(items), total)
+    return label.replace(':', '=').upper().ljust(40), any(items), all(names)
+"""
+
+
+@benchmark('transpile')
+def transpile_stdlib(size):
+    """ py2js on code that uses many builtin functions and methods.
+    """
+    code = STDLIB_SAMPLE * max(1, int(20 * size))
+    return lambda: py2js_uncached(code)
+
+
+@benchmark('transpile')
+def transpile_nested(size):
+    """ py2js on long chains of operators, which produce deeply nested
+    expressions.
+    """
+    chain1 = ' - '.join('a%i' % i for i in range(200))
+    chain2 = ' or '.join('not a%i' % i for i in range(50))
+    code = 'x = %s\ny = %s\n' % (chain1, chain2)
+    code *= max(1, int(20 * size))
+    return lambda: py2js_uncached(code)
+
+
+@benchmark('transpile')
+def transpile_sample(size):
+    """ Convert python_sample.py to the common AST, the first step of
+    transpiling (the sample uses syntax that PyScript does not support).
+    """
+    dirname = os.path.join(os.path.dirname(__file__), 'tests')
+    filename = os.path.join(dirname, 'python_sample.py')
+    if not os.path.isfile(filename):
+        raise SkipBenchmark('python_sample.py is not available')
+    with open(filename, 'rb') as f:
+        code = f.read().decode()
+    n = max(1, int(10 * size))
+    
+    def func():
+        for i in range(n):
+            commonast.parse(code)
+    return func
+
+
+@benchmark('transpile')
+def transpile_ui(size):
+    """ Generate the JS for all flexx.ui classes.
+    """
+    try:
+        from flexx import ui  # noqa
+        from flexx.app.model import ModelMeta
+    except Exception as err:
+        raise SkipBenchmark('Could not import flexx.ui: %s' % err)
+    classes = ModelMeta.CLASSES
+    n = max(1, int(size))
+    
+    def func():
+        for i in range(n):
+            functions._cache.clear()
+            for cls in classes:
+                cls._get_js()
+    return func
+
+
+@benchmark('transpile')
+def transpile_small(size):
+    """ Create many parsers for a small piece of code, like the methods
+    of Model classes.
+    """
+    n = max(1, int(500 * size))
+    
+    def func():
+        for i in range(n):
+            Parser('x = foo(a, b)')
+    return func
+
+
+@benchmark('transpile')
+def transpile_names(size):
+    """ Parse many name nodes, which measures the overhead of
+    dispatching a node to its parse function.
+    """
+    p = Parser('')
+    p.push_stack('module', '')
+    node = commonast.Name('foo')
+    n = max(1, int(50000 * size))
+    
+    def func():
+        for i in range(n):
+            p.parse(node)
+    return func
+
+
+## Runtime benchmarks
+
+def bench_strings(n):
+    count = 0
+    words = []
+    for i in range(n):
+        word = 'item %i' % i
+        words.append(word.upper().replace(' ', '_'))
+    text = ', '.join(words)
+    for part in text.split(', '):
+        part = part.strip().lower()
+        if part.startswith('item_1') or part.endswith('9'):
+            count += len(part)
+        if '77' in part:
+            count += part.index('77')
+    return count
+
+
+def bench_containers(n):
+    d = {}
+    items = []
+    for i in range(n):
+        key = 'k' + str(i % 1000)
+        d[key] = d.get(key, 0) + i
+        items.append(i * 3 % 7)
+    total = 0
+    for key, value in d.items():
+        if key in d:
+            total += value % 10
+    items.sort()
+    items = [x + 1 for x in items if x > 2]
+    while len(items) > n // 2:
+        total += items.pop()
+    return total + len(items) + len(d.keys())
+
+
+@benchmark('runtime')
+def run_pystone(size):
+    """ Run pystone (from the Python test package) in Node.js.
+    """
+    try:
+        from test import pystone
+    except ImportError:
+        raise SkipBenchmark('pystone is not available')
+    with open(pystone.__file__, 'rb') as f:
+        jscode = py2js(f.read().decode())
+    return jscode, 'pystones(%i)' % max(1, int(50000 * size))
+
+
+@benchmark('runtime')
+def run_strings(size):
+    """ String formatting, methods and concatenation in Node.js.
+    """
+    return py2js(bench_strings), 'bench_strings(%i)' % max(1, int(50000 * size))
+
+
+@benchmark('runtime')
+def run_containers(size):
+    """ Dict and list operations in Node.js.
+    """
+    return py2js(bench_containers), 'bench_containers(%i)' % max(1, int(100000 * size))
+
+
+## Running and comparing
+
+def run_benchmarks(names=None, size=1.0, repeat=3, verbose=False):
+    """ Run the benchmarks and return a dict with the results.
+    
+    Parameters:
+        names (list, optional): the names of the benchmarks to run.
+            Default all.
+        size (float): factor to scale the amount of work of each benchmark.
+        repeat (int): the number of runs of which the best time is used.
+        verbose (bool): whether to print the results while running.
+    
+    Returns:
+        results (dict): with fields "info" (about the environment) and
+        "benchmarks", which maps the name of each benchmark to a dict
+        with the "time", "kind" and "threshold". Benchmarks that are
+        skipped are not included.
+    """
+    names = list(names or [b.name for b in BENCHMARKS])
+    all_names = [b.name for b in BENCHMARKS]
+    for name in names:
+        if name not in all_names:
+            raise ValueError('Unknown benchmark %r' % name)
+    
+    results = {}
+    for b in BENCHMARKS:
+        if b.name not in names:
+            continue
+        try:
+            t = b.run(size, repeat)
+        except SkipBenchmark as err:
+            if verbose:
+                print('%s skipped: %s' % (b.name.ljust(20), err))
+            continue
+        results[b.name] = dict(time=t, kind=b.kind, threshold=b.threshold)
+        if verbose:
+            print('%s %8.2f ms' % (b.name.ljust(20), t * 1000))
+    
+    info = dict(python=platform.python_version(), size=size,
+                platform=platform.platform(), date=time.strftime('%Y-%m-%d'))
+    if node_is_available():
+        info['node'] = evaljs('process.version')
+    return dict(info=info, benchmarks=results)
+
+
+def save_results(results, filename):
+    """ Save benchmark results to a JSON file.
+    """
+    with open(filename, 'wb') as f:
+        f.write(json.dumps(results, indent=2, sort_keys=True).encode())
+
+
+def load_results(filename):
+    """ Load benchmark results from a JSON file.
+    """
+    with open(filename, 'rb') as f:
+        return json.loads(f.read().decode())
+
+
+def compare_results(results, baseline, threshold=None):
+    """ Compare benchmark results to a baseline. Returns a list of
+    (name, time, baseline_time, status) tuples, where status is
+    'regression', 'improvement', 'ok' or 'new'. If threshold is not
+    given, the threshold of each benchmark is used.
+    """
+    if results['info'].get('size') != baseline['info'].get('size'):
+        raise ValueError('Cannot compare benchmarks that ran with a different size.')
+    comparison = []
+    for name in sorted(results['benchmarks']):
+        res = results['benchmarks'][name]
+        base = baseline['benchmarks'].get(name, None)
+        if base is None:
+            comparison.append((name, res['time'], None, 'new'))
+            continue
+        th = res['threshold'] if threshold is None else threshold
+        ratio = res['time'] / max(base['time'], 1e-9)
+        if ratio > 1 + th:
+            status = 'regression'
+        elif ratio < 1 / (1 + th):
+            status = 'improvement'
+        else:
+            status = 'ok'
+        comparison.append((name, res['time'], base['time'], status))
+    return comparison
+
+
+def print_comparison(comparison):
+    """ Print the result of compare_results() as a table.
+    """
+    for name, t, base_t, status in comparison:
+        if base_t is None:
+            print('%s %8.2f ms %11s  %s' % (name.ljust(20), t * 1000, '', status))
+        else:
+            change = (t / max(base_t, 1e-9) - 1) * 100
+            print('%s %8.2f ms  %+8.1f%%  %s' %
+                  (name.ljust(20), t * 1000, change, status))
+
+
+def main(args):
+    """ Run the benchmarks from the command line. Returns the exit code.
+    """
+    names, options = [], {}
+    for arg in args:
+        if arg.startswith('--'):
+            key, _, value = arg[2:].partition('=')
+            options[key] = value
+        else:
+            names.append(arg)
+    size = float(options.get('size', 1.0))
+    threshold = options.get('threshold', None)
+    threshold = None if threshold is None else float(threshold)
+    
+    results = run_benchmarks(names, size, verbose=True)
+    if options.get('save'):
+        save_results(results, options['save'])
+        print('Saved results to %s' % options['save'])
+    if options.get('baseline'):
+        comparison = compare_results(results, load_results(options['baseline']),
+                                     threshold)
+        print('\nCompared to %s:' % options['baseline'])
+        print_comparison(comparison)
+        if any(c[3] == 'regression' for c in comparison):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -3,7 +3,14 @@ import sys
 import types
 import inspect
 import hashlib
+import threading
 import subprocess
+from collections import OrderedDict
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:  # pragma: no cover - legacy py
+    ProcessPoolExecutor = None
 
 from . import Parser
 from .stdlib import get_full_std_lib  # noqa
@@ -38,55 +45,153 @@ def py2js(ob=None, new_name=None, **parser_options):
     """
     
     def py2js_(ob):
-        if isinstance(ob, str):
-            thetype = 'str'
-            pycode = ob
-        elif isinstance(ob, (type, types.FunctionType, types.MethodType)):
-            thetype = 'class' if isinstance(ob, type) else 'def'
-            # Get code
-            try:
-                fname = inspect.getsourcefile(ob)
-                lines, linenr = inspect.getsourcelines(ob)
-            except Exception as err:
-                raise ValueError('Could not get source code for object %r: %s' %
-                                 (ob, err))
-            if getattr(ob, '__name__', '') in ('', '<lambda>'):
-                raise ValueError('py2js() got anonymous function from '
-                                 '"%s", line %i, %r.' % (fname, linenr, ob))
-            # Normalize indentation
-            indent = len(lines[0]) - len(lines[0].lstrip())
-            lines = [line[indent:] for line in lines]
-            # Skip any decorators
-            while not lines[0].lstrip().startswith(thetype):
-                lines.pop(0)
-            # join lines and rename
-            pycode = ''.join(lines)
-        else:
-            raise ValueError('py2js() only accepts classes and real functions.')
-        
-        # Get hash, in case we ever want to cache JS accross sessions
-        h = hashlib.sha256('pyscript version 1'.encode())
-        h.update(pycode.encode())
-        hash = h.digest()
-        
-        # Get JS code
-        p = Parser(pycode, **parser_options)
-        jscode = p.dump()
-        if new_name and thetype in ('class', 'def'):
-            jscode = js_rename(jscode, ob.__name__, new_name)
-        
-        # Wrap in JSString
-        jscode = JSString(jscode)
-        jscode.pycode = pycode
-        jscode.pyhash = hash
-        
-        return jscode
+        pycode, thetype = _get_pycode(ob)
+        jscode = _transpile_cached(pycode, thetype, getattr(ob, '__name__', ''),
+                                   new_name, parser_options)
+        return _as_jsstring(jscode, pycode)
     
     if ob is None:
         return py2js_  # uses as a decorator with some options set
     return py2js_(ob)
 
 
+def py2js_many(obs, max_workers=None, **parser_options):
+    """ Convert multiple pieces of Python code to JavaScript, using a pool
+    of processes. Useful to transpile a large amount of code, e.g. in a
+    build step.
+    
+    Parameters:
+        obs (list): The code, functions and/or classes to transpile. An
+            element can also be a tuple ``(ob, new_name)`` to rename a
+            function or class.
+        max_workers (int, optional): The maximum number of processes to
+            use. Default is the number of CPU cores. If 1, or if there is
+            only one object, the code is transpiled in this process.
+        parser_options: Additional options for the parser, which are
+            used for all objects.
+    
+    Returns:
+        jscodes (list): The JavaScript code for each object, in the same
+        order as the given objects. The result is the same as when
+        ``py2js()`` is called for each object.
+    """
+    
+    # Get the source code here, and send only strings to the workers,
+    # together with the names in the NAME_MAP that the code may use
+    jobs = []
+    for ob in obs:
+        ob, new_name = ob if isinstance(ob, tuple) else (ob, None)
+        pycode, thetype = _get_pycode(ob)
+        jobs.append((pycode, thetype, getattr(ob, '__name__', ''),
+                     new_name, parser_options, _get_name_map(pycode)))
+    
+    # Transpile, the order of the results matches the order of the jobs
+    if ProcessPoolExecutor is None or max_workers == 1 or len(jobs) < 2:
+        jscodes = [_transpile(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers) as executor:
+            futures = [executor.submit(_transpile, *job) for job in jobs]
+            jscodes = [future.result() for future in futures]
+    
+    return [_as_jsstring(jscode, job[0]) for jscode, job in zip(jscodes, jobs)]
+
+
+def _get_pycode(ob):
+    """ Get the Python code and type ('str', 'class' or 'def') of the
+    given object.
+    """
+    if isinstance(ob, str):
+        thetype = 'str'
+        pycode = ob
+    elif isinstance(ob, (type, types.FunctionType, types.MethodType)):
+        thetype = 'class' if isinstance(ob, type) else 'def'
+        # Get code
+        try:
+            fname = inspect.getsourcefile(ob)
+            lines, linenr = inspect.getsourcelines(ob)
+        except Exception as err:
+            raise ValueError('Could not get source code for object %r: %s' %
+                             (ob, err))
+        if getattr(ob, '__name__', '') in ('', '<lambda>'):
+            raise ValueError('py2js() got anonymous function from '
+                             '"%s", line %i, %r.' % (fname, linenr, ob))
+        # Normalize indentation
+        indent = len(lines[0]) - len(lines[0].lstrip())
+        lines = [line[indent:] for line in lines]
+        # Skip any decorators
+        while not lines[0].lstrip().startswith(thetype):
+            lines.pop(0)
+        # join lines and rename
+        pycode = ''.join(lines)
+    else:
+        raise ValueError('py2js() only accepts classes and real functions.')
+    return pycode, thetype
+
+
+def _get_name_map(pycode):
+    """ Get the (name, new_name) pairs in the NAME_MAP that may apply to
+    the given code, as a sorted list.
+    """
+    return sorted((k, v) for k, v in Parser.NAME_MAP.items() if k in pycode)
+
+
+def _transpile(pycode, thetype, name, new_name, parser_options, name_map=None):
+    """ Get the JS code for the given Python code. Only takes strings,
+    dicts and lists, so it can run in a worker process. If name_map is
+    given, it is applied to the NAME_MAP first, because names may have
+    been added to it (e.g. for Model classes) after the worker started.
+    """
+    if name_map:
+        Parser.NAME_MAP.update(name_map)
+    p = Parser(pycode, **parser_options)
+    jscode = p.dump()
+    if new_name and thetype in ('class', 'def'):
+        jscode = js_rename(jscode, name, new_name)
+    return jscode
+
+
+_cache = OrderedDict()  # hash -> jscode, in order of use
+_cache_lock = threading.Lock()
+CACHE_SIZE = 4096
+
+
+def _transpile_cached(pycode, thetype, name, new_name, parser_options):
+    """ Like _transpile(), but the results are cached, keyed on a hash of
+    the source code and the options. This makes transpiling code again
+    (e.g. when a module is reloaded) fast for the parts that did not change.
+    """
+    # The parser renames names in the NAME_MAP, which can change
+    name_map = _get_name_map(pycode)
+    key = repr((thetype, name, new_name, sorted(parser_options.items()), name_map))
+    h = hashlib.sha256(pycode.encode())
+    h.update(key.encode())
+    hash = h.digest()
+    # The lock is not held while transpiling, so another thread may
+    # transpile the same code at the same time, with the same result.
+    with _cache_lock:
+        jscode = _cache.pop(hash, None)
+    if jscode is None:
+        jscode = _transpile(pycode, thetype, name, new_name, parser_options)
+    with _cache_lock:
+        while len(_cache) >= CACHE_SIZE:
+            _cache.popitem(False)
+        _cache[hash] = jscode
+    return jscode
+
+
+def _as_jsstring(jscode, pycode):
+    # Get hash, in case we ever want to cache JS accross sessions
+    h = hashlib.sha256('pyscript version 1'.encode())
+    h.update(pycode.encode())
+    hash = h.digest()
+    
+    # Wrap in JSString
+    jscode = JSString(jscode)
+    jscode.pycode = pycode
+    jscode.pyhash = hash
+    return jscode
+
+
 def js_rename(jscode, cur_name, new_name):
     """ Rename a function or class in a JavaScript code string.
     
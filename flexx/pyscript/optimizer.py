@@ -0,0 +1,258 @@
+"""
+Optimization pass over the common AST, applied before the tree is
+turned into JavaScript if the ``optimize`` parser option is set. The
+JS for the classes in ``flexx.event`` and ``flexx.app`` is optimized.
+
+Compile-time constants are folded: ``this_is_js()`` (which is always
+true in the generated code), arithmetic and comparisons on literals,
+``not``, ``and`` and ``or`` on constants, and ``sys.version_info`` and
+``sys.version`` (when ``sys`` is imported). Branches of if-statements,
+if-expressions and while-loops that can never be reached are removed.
+This is mostly of use for code that is shared between Python and JS,
+e.g. ``if not this_is_js(): ...`` blocks disappear entirely.
+"""
+
+import ast as pyast
+import math
+
+from . import commonast as ast
+from . import stdlib
+
+
+# Names in stdlib.IMPORTS that can be folded into a literal
+FOLDABLE_IMPORTS = 'sys.version_info', 'sys.version'
+
+MAX_INT = 2 ** 53  # larger ints cannot be represented exactly in JS
+
+BINARY_FUNCS = {
+    'Add': lambda a, b: a + b,
+    'Sub': lambda a, b: a - b,
+    'Mult': lambda a, b: a * b,
+    'Div': lambda a, b: a / b,
+    'FloorDiv': lambda a, b: a // b,
+    'Pow': lambda a, b: a ** b,
+}
+
+COMP_FUNCS = {
+    'Eq': lambda a, b: a == b,
+    'NotEq': lambda a, b: a != b,
+    'Lt': lambda a, b: a < b,
+    'LtE': lambda a, b: a <= b,
+    'Gt': lambda a, b: a > b,
+    'GtE': lambda a, b: a >= b,
+}
+
+NOTHING = object()  # marks a node that is not a constant
+
+
+def fold_constants(root):
+    """ Fold constant expressions and remove unreachable branches in
+    the given (commonast) tree. The tree is modified in-place.
+    """
+    ConstantFolder().visit_body(root.body_nodes)
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def get_constant(node):
+    """ Get the Python value of a node if it is a constant, or
+    NOTHING otherwise.
+    """
+    if isinstance(node, (ast.Num, ast.Str, ast.NameConstant)):
+        return node.value
+    elif isinstance(node, ast.UnaryOp) and node.op in ('USub', 'UAdd'):
+        value = get_constant(node.right_node)
+        if is_number(value):
+            return -value if node.op == 'USub' else value
+    elif isinstance(node, ast.Tuple):
+        values = tuple(get_constant(n) for n in node.element_nodes)
+        if NOTHING not in values:
+            return values
+    return NOTHING
+
+
+def make_constant(value, node):
+    """ Create a node representing the given value, at the position of
+    the given node. Returns None if the value cannot be represented.
+    """
+    if value is None or isinstance(value, bool):
+        new_node = ast.NameConstant(value)
+    elif isinstance(value, str):
+        new_node = ast.Str(value)
+    elif isinstance(value, int):
+        if abs(value) > MAX_INT:
+            return None
+        new_node = ast.Num(value)
+    elif isinstance(value, float):
+        if math.isinf(value) or math.isnan(value):
+            return None
+        new_node = ast.Num(value)
+    elif isinstance(value, tuple):
+        element_nodes = [make_constant(v, node) for v in value]
+        if any(n is None for n in element_nodes):
+            return None
+        new_node = ast.Tuple(element_nodes)
+    else:
+        return None
+    new_node.lineno = getattr(node, 'lineno', 1)
+    new_node.col_offset = getattr(node, 'col_offset', 0)
+    return new_node
+
+
+class ConstantFolder:
+    """ Walks the tree, replacing nodes that are constant and removing
+    dead branches. The visit_x() methods return the replacement node,
+    or (for statements) a list of nodes to replace it with.
+    """
+    
+    def __init__(self):
+        self._sys_names = set()  # names under which sys is imported
+    
+    def visit(self, node):
+        # Visit children first, so that constants propagate upwards
+        for name in node.__slots__:
+            if name.endswith('_node'):
+                child = getattr(node, name)
+                if child is not None:
+                    setattr(node, name, self.visit(child))
+            elif name.endswith('_nodes'):
+                nodes = getattr(node, name)
+                if name in ('body_nodes', 'else_nodes', 'finally_nodes'):
+                    self.visit_body(nodes, name == 'body_nodes')
+                else:
+                    # Can contain None, e.g. the key for **x in a dict
+                    nodes[:] = [n if n is None else self.visit(n) for n in nodes]
+        visit_func = getattr(self, 'visit_' + node.__class__.__name__, None)
+        return node if visit_func is None else visit_func(node)
+    
+    def visit_body(self, nodes, keep_non_empty=True):
+        """ Visit a list of statements, in-place.
+        """
+        was_empty = not nodes
+        new_nodes = []
+        for node in nodes:
+            res = self.visit(node)
+            if isinstance(res, list):
+                new_nodes.extend(res)
+            else:
+                new_nodes.append(res)
+        if keep_non_empty and not new_nodes and not was_empty:
+            new_nodes.append(ast.Pass())
+        nodes[:] = new_nodes
+    
+    ## Statements
+    
+    def visit_Import(self, node):
+        if node.root is None:
+            for name, alias in node.names:
+                if name == 'sys':
+                    self._sys_names.add(alias or name)
+        return node
+    
+    def visit_If(self, node):
+        value = get_constant(node.test_node)
+        if value is NOTHING:
+            return node
+        return node.body_nodes if value else node.else_nodes
+    
+    def visit_While(self, node):
+        value = get_constant(node.test_node)
+        if value is NOTHING or value:
+            return node
+        return node.else_nodes
+    
+    ## Expressions
+    
+    def visit_Call(self, node):
+        if (isinstance(node.func_node, ast.Name) and
+                node.func_node.name == 'this_is_js' and
+                not node.arg_nodes and not node.kwarg_nodes):
+            return make_constant(True, node)
+        return node
+    
+    def visit_Attribute(self, node):
+        if (isinstance(node.value_node, ast.Name) and
+                node.value_node.name in self._sys_names):
+            full_name = 'sys.' + node.attr
+            if full_name in FOLDABLE_IMPORTS:
+                value = pyast.literal_eval(stdlib.IMPORTS[full_name])
+                if isinstance(value, list):
+                    value = tuple(value)
+                return make_constant(value, node) or node
+        return node
+    
+    def visit_Subscript(self, node):
+        value = get_constant(node.value_node)
+        if isinstance(value, (tuple, str)) and isinstance(node.slice_node, ast.Index):
+            index = get_constant(node.slice_node.value_node)
+            if isinstance(index, int) and -len(value) <= index < len(value):
+                return make_constant(value[index], node) or node
+        return node
+    
+    def visit_UnaryOp(self, node):
+        if node.op == 'Not':
+            value = get_constant(node.right_node)
+            if value is not NOTHING:
+                return make_constant(not value, node)
+        return node
+    
+    def visit_BinOp(self, node):
+        left = get_constant(node.left_node)
+        right = get_constant(node.right_node)
+        if node.op == 'Add' and isinstance(left, str) and isinstance(right, str):
+            return make_constant(left + right, node)
+        if node.op in BINARY_FUNCS and is_number(left) and is_number(right):
+            if node.op == 'Pow' and abs(right) > 64:
+                return node  # avoid creating huge numbers
+            try:
+                value = BINARY_FUNCS[node.op](left, right)
+            except (ArithmeticError, ValueError):
+                return node  # e.g. division by zero, leave it to runtime
+            return make_constant(value, node) or node
+        return node
+    
+    def visit_Compare(self, node):
+        if node.op not in COMP_FUNCS:
+            return node
+        left = get_constant(node.left_node)
+        right = get_constant(node.right_node)
+        comparable = ((is_number(left) and is_number(right)) or
+                      (isinstance(left, str) and isinstance(right, str)) or
+                      (isinstance(left, tuple) and isinstance(right, tuple)))
+        if not comparable:
+            return node
+        try:
+            value = COMP_FUNCS[node.op](left, right)
+        except TypeError:  # e.g. tuples with mixed types
+            return node
+        return make_constant(value, node)
+    
+    def visit_BoolOp(self, node):
+        # In "a and b and c", truthy constants can be skipped, and
+        # everything after a falsy constant is never evaluated. And
+        # the other way around for "or".
+        skip_if_truthy = node.op == 'And'
+        value_nodes = []
+        for i, value_node in enumerate(node.value_nodes):
+            value = get_constant(value_node)
+            is_last = i == len(node.value_nodes) - 1
+            if value is NOTHING:
+                value_nodes.append(value_node)
+            elif bool(value) == skip_if_truthy and not is_last:
+                pass
+            else:
+                value_nodes.append(value_node)
+                if bool(value) != skip_if_truthy:
+                    break
+        if len(value_nodes) == 1:
+            return value_nodes[0]
+        node.value_nodes = value_nodes
+        return node
+    
+    def visit_IfExp(self, node):
+        value = get_constant(node.test_node)
+        if value is NOTHING:
+            return node
+        return node.body_node if value else node.else_node
@@ -21,6 +21,7 @@ import json
 
 from . import commonast as ast
 from . import stdlib
+from .optimizer import fold_constants
 
 
 reprs = json.dumps  # Save string representation without the u in u'xx'.
@@ -32,6 +33,28 @@ class JSError(Exception):
     pass
 
 
+class Unified(str):
+    """ A string that does not need braces around it, e.g. because it
+    has already been processed by ``unify()``. Concatenating it gives a
+    normal string again.
+    """
+    __slots__ = ()
+
+
+class Compound(str):
+    """ A string of code for an expression that always needs braces
+    around it when used inside another expression, e.g. a binary
+    operation. ``unify()`` adds the braces without scanning the string.
+    """
+    __slots__ = ()
+
+
+_re_word = re.compile(r'^[\.\w]*$', re.UNICODE)
+_re_call = re.compile(r'^[\.\w]*\(.*\)$', re.UNICODE)
+_re_index = re.compile(r'^[\.\w]*\[.*\]$', re.UNICODE)
+_re_dict = re.compile(r'^\{.*\}$', re.UNICODE)
+
+
 def unify(x):
     """ Turn string or list of strings parts into string. Braces are
     placed around it if its not alphanumerical
@@ -39,20 +62,27 @@ def unify(x):
     # Note that r'[\.\w]' matches anyting in 'ab_01.äé'
     
     if isinstance(x, (tuple, list)):
-        x = ''.join(x)
-    
+        x = x[0] if len(x) == 1 else ''.join(x)
+    if isinstance(x, Unified):
+        return x  # no need to check again
+    elif isinstance(x, Compound):
+        return Unified('(%s)' % x)  # no need to check at all
+    
+    # Only run a regex if the last char matches, so that this does not
+    # scan the whole string for most compound expressions.
     if x[0] in '\'"' and x[0] == x[-1] and x.count(x[0]) == 2:
-        return x  # string
-    elif re.match(r'^[\.\w]*$', x, re.UNICODE):
-        return x  # words consisting of normal chars, numbers and dots
-    elif re.match(r'^[\.\w]*\(.*\)$', x, re.UNICODE) and x.count(')') == 1:
-        return x  # function calls (e.g. 'super()' or 'foo.bar(...)')
-    elif re.match(r'^[\.\w]*\[.*\]$', x, re.UNICODE) and x.count(']') == 1:
-        return x  # indexing
-    elif re.match(r'^\{.*\}$', x, re.UNICODE) and x.count('}') == 1:
-        return x  # dicts
+        pass  # string
+    elif _re_word.match(x):
+        pass  # words consisting of normal chars, numbers and dots
+    elif x[-1] == ')' and _re_call.match(x) and x.count(')') == 1:
+        pass  # function calls (e.g. 'super()' or 'foo.bar(...)')
+    elif x[-1] == ']' and _re_index.match(x) and x.count(']') == 1:
+        pass  # indexing
+    elif x[-1] == '}' and _re_dict.match(x) and x.count('}') == 1:
+        pass  # dicts
     else:
-        return '(%s)' % x
+        x = '(%s)' % x
+    return Unified(x)
 
 
 # https://github.com/umdjs/umd/blob/master/returnExports.js
@@ -111,8 +141,15 @@ class NameSpace(dict):
     * If the value is True, it should be declared.
     * if the value is a string, it should be declared with the initial value
       specified by the string.
+    
+    The ``types`` attribute maps variable names to their inferred type
+    (see typeinfer.py).
     """
     
+    def __init__(self):
+        dict.__init__(self)
+        self.types = {}
+    
     def set_nonlocal(self, key):
         self[key] = False  # also if already exists
     
@@ -187,7 +224,7 @@ class Parser0:
     }
     
     def __init__(self, code, module=None, indent=0, docstrings=True,
-                 inline_stdlib=True):
+                 inline_stdlib=True, optimize=False):
         self._pycode = code  # helpfull during debugging
         if sys.version_info[0] == 2:
             fut = 'from __future__ import unicode_literals, print_function\n'
@@ -195,6 +232,8 @@ class Parser0:
         self._root = ast.parse(code)
         if sys.version_info[0] == 2:
             self._root.body_nodes.pop(0)  # remove that import node we added
+        if optimize:
+            fold_constants(self._root)
         self._stack = []
         self._indent = indent
         self._dummy_counter = 0
@@ -209,16 +248,15 @@ class Parser0:
         self._seen_func_names = set()
         self._seen_class_names = set()
         
+        # Inferred types of expression nodes (see typeinfer.py)
+        self._type_cache = {}
+        
         # Options
         self._docstrings = bool(docstrings)  # whether to inclue docstrings
         
-        # Collect function and method handlers
-        self._functions, self._methods = {}, {}
-        for name in dir(self.__class__):
-            if name.startswith('function_'):
-                self._functions[name[9:]] = getattr(self, name)
-            elif name.startswith('method_'):
-                self._methods[name[7:]] = getattr(self, name)
+        # Get function and method handlers, and the parse functions
+        self._functions, self._methods, self._parse_funcs = \
+            self._get_dispatch_tables()
         
         # Prepare
         self.push_stack('module', module or '')
@@ -270,6 +308,25 @@ class Parser0:
             if self._parts:
                 self._parts[0] = '    ' * indent + self._parts[0].lstrip()
     
+    @classmethod
+    def _get_dispatch_tables(cls):
+        """ Get the dicts that map names to (unbound) function handlers
+        and method handlers, and node classes to parse functions. These
+        are created once per class; the latter is filled as nodes are
+        encountered.
+        """
+        tables = cls.__dict__.get('_dispatch_tables', None)
+        if tables is None:
+            functions, methods = {}, {}
+            for name in dir(cls):
+                if name.startswith('function_'):
+                    functions[name[9:]] = getattr(cls, name)
+                elif name.startswith('method_'):
+                    methods[name[7:]] = getattr(cls, name)
+            tables = functions, methods, {}
+            cls._dispatch_tables = tables
+        return tables
+    
     def dump(self):
         """ Get the JS code as a string.
         """
@@ -358,37 +415,36 @@ class Parser0:
         self.vars.add(name)
         return name
     
-    def _handle_std_deps(self, code):
-        nargs, function_deps, method_deps = stdlib.get_std_info(code)
-        for dep in function_deps:
-            self.use_std_function(dep, [])
-        for dep in method_deps:
-            self.use_std_method('x', dep, [])
+    def _handle_std_deps(self, info):
+        # The dependencies in the info tuple are already resolved recursively
+        nargs, function_deps, method_deps = info
+        self._std_functions.update(function_deps)
+        self._std_methods.update(method_deps)
     
     def use_std_function(self, name, arg_nodes):
         """ Use a function from the PyScript standard library.
         """
-        self._handle_std_deps(stdlib.FUNCTIONS[name])
+        self._handle_std_deps(stdlib.FUNCTION_INFO[name])
         self._std_functions.add(name)
         mangled_name = stdlib.FUNCTION_PREFIX + name
         args = [(a if isinstance(a, str) else unify(self.parse(a)))
                 for a in arg_nodes]
-        return '%s(%s)' % (mangled_name, ', '.join(args))
+        return Unified('%s(%s)' % (mangled_name, ', '.join(args)))
     
     def use_std_method(self, base, name, arg_nodes):
         """ Use a method from the PyScript standard library.
         """
-        self._handle_std_deps(stdlib.METHODS[name])
+        self._handle_std_deps(stdlib.METHOD_INFO[name])
         self._std_methods.add(name)
         mangled_name = stdlib.METHOD_PREFIX + name
         args = [(a if isinstance(a, str) else unify(self.parse(a)))
                 for a in arg_nodes]
         #return '%s.%s(%s)' % (base, mangled_name, ', '.join(args)) 
         args.insert(0, base)
-        return '%s.call(%s)' % (mangled_name, ', '.join(args)) 
+        return Unified('%s.call(%s)' % (mangled_name, ', '.join(args)))
     
     def use_imported_object(self, name):
-        self._handle_std_deps(stdlib.IMPORTS[name])
+        self._handle_std_deps(stdlib.IMPORT_INFO[name])
         self._imported_objects.add(name)
         return stdlib.IMPORT_PREFIX + name.replace('.', stdlib.IMPORT_DOT)
         
@@ -418,16 +474,18 @@ class Parser0:
         
         Returns a list of strings.
         """
-        nodeType = node.__class__.__name__
-        parse_func = getattr(self, 'parse_' + nodeType, None)
-        if parse_func:
-            res = parse_func(node)
-            # Return as list also if a tuple or string was returned
-            assert res is not None
-            if isinstance(res, tuple):
-                res = list(res)
-            if not isinstance(res, list):
-                res = [res]
-            return res
-        else:
-            raise JSError('Cannot parse %s nodes yet' % nodeType)
+        parse_func = self._parse_funcs.get(node.__class__, None)
+        if parse_func is None:
+            nodeType = node.__class__.__name__
+            parse_func = getattr(self.__class__, 'parse_' + nodeType, None)
+            if parse_func is None:
+                raise JSError('Cannot parse %s nodes yet' % nodeType)
+            self._parse_funcs[node.__class__] = parse_func
+        res = parse_func(self, node)
+        # Return as list also if a tuple or string was returned
+        assert res is not None
+        if isinstance(res, tuple):
+            res = list(res)
+        if not isinstance(res, list):
+            res = [res]
+        return res
@@ -172,7 +172,8 @@ import re
 
 from . import commonast as ast
 from . import stdlib
-from .parser0 import Parser0, JSError, unify, reprs  # noqa
+from .typeinfer import get_type, NUM, STR, PRIMITIVES
+from .parser0 import Parser0, JSError, Unified, Compound, unify, reprs  # noqa
 
 
 # Define buildin stuff for which we know that it returns a bool or int
@@ -219,6 +220,8 @@ class Parser1(Parser0):
     def parse_Dict(self, node):
         code = ['{']
         for key, val in zip(node.key_nodes, node.value_nodes):
+            if key is None:
+                raise JSError('Dict unpacking (**x) is not supported')
             code += self.parse(key)
             code.append(': ')
             code += self.parse(val)
@@ -240,7 +243,7 @@ class Parser1(Parser0):
             name = self.with_prefix(name)
         else:
             name = self.NAME_MAP.get(name, name)
-        return name
+        return Unified(name)  # names never need braces
     
     def parse_Starred(self, node):
         # they're present in Call arguments, but we parse them there.
@@ -257,11 +260,11 @@ class Parser1(Parser0):
     
     def parse_UnaryOp(self, node):
         if node.op == node.OPS.Not:
-            return '!', self._wrap_truthy(node.right_node)
+            return Compound('!' + unify(self._wrap_truthy(node.right_node)))
         else:
             op = self.UNARY_OP[node.op]
             right = unify(self.parse(node.right_node))
-            return op, right
+            return Compound(op + right)
     
     def parse_BinOp(self, node):
         if node.op == node.OPS.Mod and isinstance(node.left_node, ast.Str):
@@ -273,19 +276,22 @@ class Parser1(Parser0):
         
         if node.op == node.OPS.Add:
             C = ast.Num, ast.Str
-            if not (isinstance(node.left_node, C) or isinstance(node.right_node, C)):
+            if not (isinstance(node.left_node, C) or isinstance(node.right_node, C) or
+                    self._get_type(node) in (NUM, STR)):
                 return self.use_std_function('add', [left, right])
         elif node.op == node.OPS.Mult:
             C = ast.Num
-            if not (isinstance(node.left_node, C) and isinstance(node.right_node, C)):
+            if not ((isinstance(node.left_node, C) and
+                     isinstance(node.right_node, C)) or
+                    self._get_type(node) == NUM):
                 return self.use_std_function('mult', [left, right])
         elif node.op == node.OPS.Pow:
-            return ["Math.pow(", left, ", ", right, ")"]
+            return Unified("Math.pow(%s, %s)" % (left, right))
         elif node.op == node.OPS.FloorDiv:
-            return ["Math.floor(", left, "/", right, ")"]
+            return Unified("Math.floor(%s/%s)" % (left, right))
         
         op = ' %s ' % self.BINARY_OP[node.op]
-        return [left, op, right]
+        return Compound(left + op + right)
     
     def _format_string(self, node):
         # Get left end, stripped from the separator
@@ -319,10 +325,34 @@ class Parser1(Parser0):
         code.append(sep + left[start:] + sep)
         return code
     
+    def _lookup_type(self, name):
+        """ Get the inferred type of a variable, looking in the scope of
+        the current function and the functions that enclose it.
+        """
+        for nstype, nsname, ns in reversed(self._stack):
+            if nstype == 'function' and name in ns.types:
+                return ns.types[name]
+        return None
+    
+    def _get_type(self, node):
+        """ Get the type of an expression node (typeinfer.NUM, STR, BOOL
+        or LIST) or None if not known.
+        """
+        return get_type(node, self._lookup_type, self._type_cache)
+    
+    def _is_primitive_list(self, node, type):
+        # Whether node is a list/tuple literal with elements of the given type
+        return (type in (NUM, STR) and isinstance(node, (ast.List, ast.Tuple)) and
+                all(self._get_type(n) == type for n in node.element_nodes))
+    
     def _wrap_truthy(self, node):
         """ Wraps an operation in a truthy call, unless its not necessary. """
+        if self._get_type(node) in PRIMITIVES:
+            # Primitive types have the same truthiness in JS as in Python
+            return unify(self.parse(node))
         eq_name = stdlib.FUNCTION_PREFIX + 'equals'
-        test = ''.join(self.parse(node))
+        test = self.parse(node)
+        test = test[0] if len(test) == 1 else ''.join(test)
         if (False or test.endswith('.length') or test.startswith('!') or
                      test.isnumeric() or test == 'true' or test == 'false' or
                      test.count('==') or test.count(eq_name) or
@@ -339,27 +369,40 @@ class Parser1(Parser0):
             values += [unify(self.parse(node.value_nodes[-1]))]
         else:
             values = [unify(self._wrap_truthy(val)) for val in node.value_nodes]
-        return op.join(values)
+        return Compound(op.join(values))
     
     def parse_Compare(self, node):
         
         left = unify(self.parse(node.left_node))
         right = unify(self.parse(node.right_node))
         
+        # Use plain operators if we know that both are of the same primitive type
+        left_type = self._get_type(node.left_node)
+        right_type = self._get_type(node.right_node)
+        same_type = left_type in PRIMITIVES and left_type == right_type
+        
+        if node.op in (node.COMP.Eq, node.COMP.NotEq) and same_type:
+            return Compound("%s %s %s" % (left, self.COMP_OP[node.op], right))
+        elif node.op in (node.COMP.In, node.COMP.NotIn) and (
+                (same_type and left_type == STR) or
+                self._is_primitive_list(node.right_node, left_type)):
+            op = '>=' if node.op == node.COMP.In else '<'
+            return Compound("%s.indexOf(%s) %s 0" % (right, left, op))
+        
         if node.op in (node.COMP.Eq, node.COMP.NotEq):
             code = self.use_std_function('equals', [left, right])
             if node.op == node.COMP.NotEq:
-                code = '!' + code
+                code = Compound('!' + code)
             return code
         elif node.op in (node.COMP.In, node.COMP.NotIn):
             self.use_std_function('equals', [])  # trigger use of equals
             code = self.use_std_function('contains', [left, right])
             if node.op == node.COMP.NotIn:
-                code = '!' + code
+                code = Compound('!' + code)
             return code
         else:
             op = self.COMP_OP[node.op]
-            return "%s %s %s" % (left, op, right)
+            return Compound("%s %s %s" % (left, op, right))
     
     def parse_Call(self, node):
         
@@ -386,16 +429,16 @@ class Parser1(Parser0):
         # Handle special functions and methods
         res = None
         if method_name in self._methods:
-            res = self._methods[method_name](node, base_name)
+            res = self._methods[method_name](self, node, base_name)
         elif full_name in self._functions:
-            res = self._functions[full_name](node)
+            res = self._functions[full_name](self, node)
         if res is not None:
             return res
         
         # Handle normally
         if base_name.endswith('._base_class') or base_name == 'super()':
             # super() was used, use "call" to pass "this"
-            return [full_name] + self._get_args(node, 'this', True)
+            code = [full_name] + self._get_args(node, 'this', True)
         else:
             code = [full_name] + self._get_args(node, base_name)
             # Insert "new" if this looks like a class
@@ -412,7 +455,8 @@ class Parser1(Parser0):
                     code.insert(0, 'new ')
                 elif full_name[0].lower() != full_name[0]:
                     code.insert(0, 'new ')
-            return code
+        # A call never needs braces, even with "new" in front
+        return Unified(''.join(code))
     
     def _get_args(self, node, base_name, use_call_or_apply=False):
         """ Get arguments for function call. Does checking for keywords and
@@ -482,8 +526,9 @@ class Parser1(Parser0):
         imported = self._imports.get(base_name)
         if imported:
             return self.use_imported_object(imported + '.' + node.attr)
-        # Handle normally
-        return "%s.%s" % (base_name, self.ATTRIBUTE_MAP.get(node.attr, node.attr))
+        # Handle normally (the base is unified, so no braces are needed)
+        attr = self.ATTRIBUTE_MAP.get(node.attr, node.attr)
+        return Unified("%s.%s" % (base_name, attr))
     
     ## Statements
     
@@ -533,6 +578,12 @@ class Parser1(Parser0):
         value = ''.join(self.parse(node.value_node))
         
         nl = self.lf()
+        if node.op in (node.OPS.Add, node.OPS.Mult):
+            t = self._get_type(node.target_node)
+            if t is not None and t == self._get_type(node.value_node):
+                if t == NUM or (t == STR and node.op == node.OPS.Add):
+                    op = ' %s= ' % self.BINARY_OP[node.op]
+                    return [nl, target, op, value, ';']
         if node.op == node.OPS.Add:
             return [nl, target, '=', self.use_std_function('add', [target, value])]
         elif node.op == node.OPS.Mult:
@@ -214,7 +214,9 @@ Globals and nonlocal
 
 from . import commonast as ast
 from . import stdlib
+from .parser0 import Compound
 from .parser1 import Parser1, JSError, unify, reprs  # noqa
+from .typeinfer import infer_var_types, get_bound_names, LIST, STR
 
 
 class Parser2(Parser1):
@@ -362,7 +364,7 @@ class Parser2(Parser1):
         code.append(') : (')
         code += c
         code.append(')')
-        return code
+        return Compound(''.join(code))
     
     def parse_If(self, node):
         if (True and isinstance(node.test_node, ast.Compare) and
@@ -410,20 +412,39 @@ class Parser2(Parser1):
         iter = None  # what to iterate over
         sure_is_dict = False  # flag to indicate that we're sure iter is a dict
         sure_is_range = False  # dito for range
+        sure_is_zip = False  # dito for zip and enumerate (the sequence nodes)
         
         # First see if this for-loop is something that we support directly
         if isinstance(node.iter_node, ast.Call):
             f = node.iter_node.func_node
+            args = node.iter_node.arg_nodes
             if (isinstance(f, ast.Attribute) and
-                    not node.iter_node.arg_nodes and f.attr in METHODS):
+                    not args and f.attr in METHODS):
                 sure_is_dict = f.attr
                 iter = ''.join(self.parse(f.value_node))
             elif isinstance(f, ast.Name) and f.name in ('xrange', 'range'):
-                sure_is_range = [''.join(self.parse(arg)) for arg in 
-                                 node.iter_node.arg_nodes]
+                sure_is_range = [''.join(self.parse(arg)) for arg in args]
+                # The end and step are evaluated once (as in Python),
+                # unless they are simple, in which case this is not needed
+                for i in range(0 if len(args) == 1 else 1, len(args)):
+                    if not self._is_simple_range_arg(args[i], node):
+                        d_arg = self.dummy('step' if i == 2 else 'end')
+                        sure_is_range[i] = d_arg, sure_is_range[i]
+            elif (isinstance(f, ast.Name) and f.name in ('enumerate', 'zip') and
+                    isinstance(node.target_node, ast.Tuple) and
+                    not node.iter_node.kwarg_nodes):
+                # Iterate over the sequence(s) directly, instead of creating
+                # an array of tuples. None represents the enumerate index.
+                seqs = []
+                if f.name == 'enumerate' and len(args) == 1:
+                    seqs = [None] + args
+                elif f.name == 'zip' and len(args) >= 2:
+                    seqs = args
+                if seqs and len(seqs) == len(node.target_node.element_nodes):
+                    sure_is_zip = seqs
         
         # Otherwise we parse the iter
-        if iter is None:
+        if iter is None and not (sure_is_range or sure_is_zip):
             iter = ''.join(self.parse(node.iter_node))
         
         # Get target
@@ -469,8 +490,12 @@ class Parser2(Parser1):
                 self.vars.add(t)
         
         if sure_is_range:  # Explicit iteration
-            # Get range args
+            # Get range args, hoisting the ones that need evaluating once
             nums = sure_is_range  # The range() arguments
+            for i, num in enumerate(nums):
+                if isinstance(num, tuple):
+                    code.append(self.lf('%s = %s;' % num))
+                    nums[i] = num[0]
             assert len(nums) in (1, 2, 3)
             if len(nums) == 1:
                 start, end, step = '0', nums[0], '1'
@@ -500,6 +525,23 @@ class Parser2(Parser1):
             if len(target) > 1:
                 code.append(self.lf('%s = %s[%s];' % (target[1], d_seq, target[0])))
         
+        elif sure_is_zip:  # Iteration over sequences in parallel
+            d_iter = self.dummy('itr')
+            seqs = []
+            for seq in sure_is_zip:
+                if seq is None:
+                    seqs.append(None)
+                else:
+                    seqs.append(self.dummy('seq'))
+                    code.append(self._make_iterable_node(seq, seqs[-1]))
+            tests = ['%s < %s.length' % (d_iter, seq) for seq in seqs if seq]
+            code.append(self.lf('for (%s = 0; %s; %s += 1) {' %
+                                (d_iter, ' && '.join(tests), d_iter)))
+            self._indent += 1
+            for t, seq in zip(target, seqs):
+                value = d_iter if seq is None else '%s[%s]' % (seq, d_iter)
+                code.append(self.lf('%s = %s;' % (t, value)))
+        
         else:  # Enumeration
             
             # We cannot know whether the thing to iterate over is an
@@ -516,7 +558,7 @@ class Parser2(Parser1):
             d_target = target[0] if (len(target) == 1) else self.dummy('tgt')
             
             # Ensure our iterable is indeed iterable
-            code.append(self._make_iterable(iter, d_seq))
+            code.append(self._make_iterable_node(node.iter_node, d_seq, iter))
             
             # The loop
             code.append(self.lf('for (%s = 0; %s < %s.length; %s += 1) {' %
@@ -544,6 +586,25 @@ class Parser2(Parser1):
         
         return code
     
+    def _is_simple_range_arg(self, node, for_node):
+        # Whether there is no need to store this range() arg in a
+        # variable, i.e. it cannot change during the loop
+        if isinstance(node, ast.UnaryOp):
+            node = node.right_node
+        if isinstance(node, ast.Name):
+            bound = get_bound_names([for_node])
+            return node.name not in bound
+        return isinstance(node, ast.Num)
+    
+    def _make_iterable_node(self, node, name, iter=None):
+        # Like _make_iterable, but skip the check if we know that the
+        # node is an array or string.
+        if iter is None:
+            iter = ''.join(self.parse(node))
+        if self._get_type(node) in (LIST, STR):
+            return self.lf('%s = %s;' % (name, iter))
+        return self._make_iterable(iter, name)
+    
     def _make_iterable(self, name1, name2, newlines=True):
         code = []
         lf = self.lf
@@ -721,6 +782,7 @@ class Parser2(Parser1):
         pre_code, code = code, []
         self._indent += 1
         self.push_stack('function', '' if lambda_ else node.name)
+        self.vars.types.update(infer_var_types(node, self._lookup_type))
         
         # Add argnames to known vars
         for name in argnames:
@@ -401,40 +401,32 @@ class Parser3(Parser2):
 
 # Add functions and methods to the class, using the stdib functions ...
 
-def make_function(name, nargs, function_deps, method_deps):
+def make_function(name, nargs):
     def function_X(self, node):
         if node.kwarg_nodes:
             raise JSError('Function %s does not support keyword args.' % name)
         if len(node.arg_nodes) not in nargs:
             raise JSError('Function %s needs #args in %r.' % (name, nargs))
-        for dep in function_deps:
-            self.use_std_function(dep, [])
-        for dep in method_deps:
-            self.use_std_method('x', dep, [])
         return self.use_std_function(name, node.arg_nodes)
     return function_X
 
-def make_method(name, nargs, function_deps, method_deps):
+def make_method(name, nargs):
     def method_X(self, node, base):
         if node.kwarg_nodes:
             raise JSError('Method %s does not support keyword args.' % name)
         if len(node.arg_nodes) not in nargs:
             return None  # call as-is, don't use our variant
-        for dep in function_deps:
-            self.use_std_function(dep, [])
-        for dep in method_deps:
-            self.use_std_method('x', dep, [])
         return self.use_std_method(base, name, node.arg_nodes)
     return method_X
 
-for name, code in stdlib.METHODS.items():
-    nargs, function_deps, method_deps = stdlib.get_std_info(code)
+for name, info in stdlib.METHOD_INFO.items():
+    nargs = info[0]
     if nargs and not hasattr(Parser3, 'method_' + name):
-        m = make_method(name, tuple(nargs), function_deps, method_deps)
+        m = make_method(name, nargs)
         setattr(Parser3, 'method_' + name, m)
 
-for name, code in stdlib.FUNCTIONS.items():
-    nargs, function_deps, method_deps = stdlib.get_std_info(code)
+for name, info in stdlib.FUNCTION_INFO.items():
+    nargs = info[0]
     if nargs and not hasattr(Parser3, 'function_' + name):
-        m = make_function(name, tuple(nargs), function_deps, method_deps)
+        m = make_function(name, nargs)
         setattr(Parser3, 'function_' + name, m)
@@ -850,3 +850,27 @@ IMPORTS['time.sleep'] = """function(secs) {
     var msecs = secs * 1000, start = new Date();
     while (new Date() - start < msecs) {}
 }""" 
+
+
+## Dependencies
+
+# The number of arguments and the (recursively resolved) dependencies of
+# each function, method and imported object are determined once, so
+# that the parser can look them up when it uses them.
+FUNCTION_INFO = {}
+METHOD_INFO = {}
+IMPORT_INFO = {}
+
+def _resolve_std_info():
+    for name, code in FUNCTIONS.items():
+        nargs, function_deps, method_deps = get_std_info(code)
+        FUNCTION_INFO[name] = tuple(nargs), tuple(function_deps), tuple(method_deps)
+    for name, code in METHODS.items():
+        nargs, function_deps, method_deps = get_std_info(code)
+        METHOD_INFO[name] = tuple(nargs), tuple(function_deps), tuple(method_deps)
+    for name, code in IMPORTS.items():
+        if code is not None:
+            nargs, function_deps, method_deps = get_std_info(code)
+            IMPORT_INFO[name] = tuple(nargs), tuple(function_deps), tuple(method_deps)
+
+_resolve_std_info()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+
+from flexx.util.testing import run_tests_if_main, raises
+
+from flexx.pyscript import py2js, evaljs
+from flexx.pyscript import benchmark, functions
+from flexx.pyscript.benchmark import (run_benchmarks, compare_results, save_results,
+                                      load_results, main)
+
+
+def fake_results(size=1.0, **times):
+    benchmarks = {}
+    for name, t in times.items():
+        benchmarks[name] = dict(time=t, kind='runtime', threshold=0.25)
+    return dict(info=dict(size=size), benchmarks=benchmarks)
+
+
+def test_benchmarks_are_registered():
+    names = [b.name for b in benchmark.BENCHMARKS]
+    for name in ('transpile_stdlib', 'transpile_sample', 'transpile_ui',
+                 'transpile_small', 'transpile_names',
+                 'run_pystone', 'run_strings', 'run_containers'):
+        assert name in names
+    assert all(b.kind in ('transpile', 'runtime') for b in benchmark.BENCHMARKS)
+
+
+def test_benchmark_code_behaves_the_same():
+    # The runtime benchmarks measure code that does the same as in Python
+    assert evaljs(py2js(benchmark.bench_strings) + 'bench_strings(500)') == \
+        str(benchmark.bench_strings(500))
+    assert evaljs(py2js(benchmark.bench_containers) + 'bench_containers(2000)') == \
+        str(benchmark.bench_containers(2000))
+    
+    ns = {}
+    exec(benchmark.STDLIB_SAMPLE, ns)
+    res = ns['process']([3, 1, 5], ['ab c', 'd'], {'label': 'q', 'l': [1, 2], 'd': {}})
+    jscode = py2js(benchmark.STDLIB_SAMPLE)
+    jscode += 'process([3, 1, 5], ["ab c", "d"], {label: "q", l: [1, 2], d: {}})'
+    assert evaljs(jscode).replace('true', 'True') == "[ '%s', True, True ]" % res[0]
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(['transpile_stdlib', 'run_strings'], size=0.01, repeat=1)
+    assert set(results['benchmarks']) == set(['transpile_stdlib', 'run_strings'])
+    res = results['benchmarks']['transpile_stdlib']
+    assert res['kind'] == 'transpile' and res['threshold'] > 0 and res['time'] > 0
+    assert results['info']['size'] == 0.01
+    
+    with raises(ValueError):
+        run_benchmarks(['spam'])
+
+
+
+def test_transpile_benchmarks_bypass_cache():
+    # Each run transpiles the code, instead of taking it from the cache
+    transpile = functions._transpile
+    calls = []
+    functions._transpile = lambda *args: calls.append(args) or transpile(*args)
+    try:
+        run_benchmarks(['transpile_stdlib', 'transpile_nested'], size=0.01, repeat=2)
+    finally:
+        functions._transpile = transpile
+    assert len(calls) == 4
+
+def test_compare_results():
+    baseline = fake_results(a=1.0, b=1.0, c=1.0, d=1.0)
+    results = fake_results(a=1.1, b=1.5, c=0.5, e=1.0)
+    comparison = compare_results(results, baseline)
+    assert comparison == [('a', 1.1, 1.0, 'ok'),
+                          ('b', 1.5, 1.0, 'regression'),
+                          ('c', 0.5, 1.0, 'improvement'),
+                          ('e', 1.0, None, 'new')]
+    # Override threshold
+    comparison = compare_results(results, baseline, threshold=0.05)
+    assert comparison[0][3] == 'regression'
+    # Results for a different size cannot be compared
+    with raises(ValueError):
+        compare_results(fake_results(2.0, a=1.0), baseline)
+
+
+def test_save_and_compare_to_baseline():
+    dirname = tempfile.mkdtemp()
+    filename = os.path.join(dirname, 'baseline.json')
+    results = fake_results(0.01, transpile_stdlib=100.0)
+    save_results(results, filename)
+    assert load_results(filename) == results
+    
+    assert main(['transpile_stdlib', '--size=0.01', '--baseline=' + filename]) == 0
+    results['benchmarks']['transpile_stdlib']['time'] = 1e-9
+    save_results(results, filename)
+    assert main(['transpile_stdlib', '--size=0.01', '--baseline=' + filename]) == 1
+
+
+run_tests_if_main()
@@ -3,10 +3,11 @@
 
 import os
 import tempfile
+import threading
 
 from flexx.util.testing import run_tests_if_main, raises
 
-from flexx.pyscript import py2js, evaljs, evalpy, script2js
+from flexx.pyscript import py2js, py2js_many, evaljs, evalpy, script2js, JSError
 
 
 def test_py2js_on_wrong_vals():
@@ -24,6 +25,123 @@ def test_py2js_on_strings():
     assert py2js('list()') == '[];'
 
 
+def foo_for_many(x):
+    return x + 1
+
+
+class Foo_for_many:
+    
+    def bar(self):
+        return [i for i in range(3)]
+
+
+def test_py2js_many():
+    
+    obs = ['3 + 3', foo_for_many, Foo_for_many, (foo_for_many, 'spam.eggs'),
+           'print(x)']
+    expected = [py2js(ob) for ob in obs[:3]]
+    expected.append(py2js(foo_for_many, 'spam.eggs'))
+    expected.append(py2js('print(x)'))
+    
+    for max_workers in (1, 2):
+        jscodes = py2js_many(obs, max_workers=max_workers)
+        assert jscodes == expected
+        assert jscodes[1].pycode.startswith('def foo_for_many')
+        assert jscodes[1].pyhash == expected[1].pyhash
+    
+    # Parser options
+    jscodes = py2js_many(obs, max_workers=2, inline_stdlib=False)
+    assert jscodes[2] == py2js(Foo_for_many, inline_stdlib=False)
+    assert jscodes[2] != expected[2]
+    
+    # Errors are raised in this process
+    raises(ValueError, py2js_many, ['3', str])
+    raises(JSError, py2js_many, ['3', 'foo(**kw)'], max_workers=2)
+    assert py2js_many([]) == []
+
+
+def test_py2js_many_name_map():
+    
+    from flexx.pyscript import functions, Parser
+    
+    # The workers use the names in the NAME_MAP of this process
+    Parser.NAME_MAP['spam_for_many'] = 'eggs.spam_for_many'
+    try:
+        obs = ['spam_for_many()', 'x = 3']
+        for max_workers in (1, 2):
+            jscodes = py2js_many(obs, max_workers=max_workers)
+            assert jscodes == ['eggs.spam_for_many();', 'var x;\nx = 3;']
+    finally:
+        Parser.NAME_MAP.pop('spam_for_many')
+    
+    # The name map is applied before transpiling
+    jscode = functions._transpile('spam_for_many2()', 'str', '', None, {},
+                                  [('spam_for_many2', 'eggs.spam_for_many2')])
+    Parser.NAME_MAP.pop('spam_for_many2')
+    assert jscode == 'eggs.spam_for_many2();'
+
+
+def test_py2js_cache():
+    
+    from flexx.pyscript import functions, Parser
+    functions._cache.clear()
+    
+    code1 = py2js(foo_for_many)
+    code2 = py2js(foo_for_many)
+    assert code1 == code2 and code2.pycode == code1.pycode
+    assert len(functions._cache) == 1
+    
+    # Options, names and the source are part of the key
+    assert py2js('x = sorted(y)', inline_stdlib=False) != py2js('x = sorted(y)')
+    assert 'spam.eggs' in py2js(foo_for_many, 'spam.eggs')
+    assert py2js('x = 3') != py2js('x = 4')
+    assert len(functions._cache) == 6
+    
+    # A change in the NAME_MAP may change the result
+    assert py2js('spam_for_cache()') == 'spam_for_cache();'
+    Parser.NAME_MAP['spam_for_cache'] = 'eggs.spam_for_cache'
+    try:
+        assert py2js('spam_for_cache()') == 'eggs.spam_for_cache();'
+    finally:
+        Parser.NAME_MAP.pop('spam_for_cache')
+    assert py2js('spam_for_cache()') == 'spam_for_cache();'
+    
+    # The size of the cache is limited
+    functions.CACHE_SIZE = 3
+    try:
+        for i in range(5):
+            py2js('x = %i' % i)
+        assert len(functions._cache) == 3
+    finally:
+        functions.CACHE_SIZE = 4096
+
+
+def test_py2js_cache_threads():
+    
+    from flexx.pyscript import functions
+    
+    # Use the cache from multiple threads, while items are removed from it
+    def transpile():
+        try:
+            for i in range(200):
+                assert py2js('x = %i' % (i % 20)) == 'var x;\nx = %i;' % (i % 20)
+        except Exception as err:  # pragma: no cover
+            errors.append(err)
+    
+    errors = []
+    functions.CACHE_SIZE = 5
+    try:
+        threads = [threading.Thread(target=transpile) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        functions.CACHE_SIZE = 4096
+    assert not errors
+    assert len(functions._cache) <= 5
+
+
 def test_evaljs():
     assert evaljs('3+4') == '7'
     assert evaljs('var x = {}; x.doesnotexist') == ''  # strip undefined
@@ -0,0 +1,132 @@
+import sys
+
+from flexx.util.testing import run_tests_if_main, raises
+
+from flexx.pyscript import JSError, py2js, evaljs
+from flexx.pyscript import commonast as ast
+from flexx.pyscript.optimizer import fold_constants
+
+
+def opt(code, **parser_options):
+    return py2js(code, optimize=True, **parser_options)
+
+
+def fold(code):
+    root = ast.parse(code)
+    fold_constants(root)
+    return root
+
+
+def test_fold_this_is_js():
+    assert opt('this_is_js()') == 'true;'
+    assert opt('not this_is_js()') == 'false;'
+    assert opt('x = this_is_js() or foo') == 'var x;\nx = true;'
+    assert opt('x = not this_is_js() and foo') == 'var x;\nx = false;'
+    assert 'foo' in opt('x = this_is_js() and foo')
+    with raises(JSError):
+        opt('this_is_js(3)')  # not folded, so the parser complains
+
+
+def test_fold_arithmetic():
+    assert opt('3 + 4') == '7;'
+    assert opt('3 * 4 - 2') == '10;'
+    assert opt('x = 2 ** 10') == 'var x;\nx = 1024;'
+    assert opt('7 // 2') == '3;'
+    assert opt('3 / 2') == '1.5;'
+    assert opt('-3 * 2') == '-6;'
+    assert opt('"foo" + "bar"') == '"foobar";'
+    
+    # Not folded
+    assert opt('3 + x') == '3 + x;'
+    assert opt('3 / 0') == '3 / 0;'  # leave errors to runtime
+    assert opt('2 ** 100') == 'Math.pow(2, 100);'  # too large for JS
+    assert opt('-7 % 3') == py2js('-7 % 3')  # differs in JS
+    
+    # Same result
+    for code in ('3 + 4 * 2', '(3 - 1) / 4', '10 // 3 + 1', '2 ** 3 ** 2'):
+        assert evaljs(opt(code)) == evaljs(py2js(code))
+
+
+def test_fold_comparisons_and_bool_ops():
+    assert opt('4 > 3') == 'true;'
+    assert opt('"a" == "b"') == 'false;'
+    assert opt('(1, 2) < (1, 3)') == 'true;'
+    assert opt('True and False') == 'false;'
+    assert opt('False or x') == 'x;'
+    assert opt('x and True') == py2js('x and True')
+    assert 'spam' not in opt('x and False and spam')
+    assert 'spam' not in opt('x or True or spam')
+    assert opt('not 0') == 'true;'
+    assert opt('not ""') == 'true;'
+    assert opt('3 if 4 > 2 else 5') == '3;'
+
+
+def test_fold_sys():
+    major = sys.version_info[0]
+    assert opt('import sys\nx = sys.version_info[0]') == 'var x;\nx = %i;' % major
+    assert opt('import sys\nsys.version_info >= (3, 0)') == ('true;' if major == 3 else
+                                                               'false;')
+    assert 'version_info' not in opt('import sys\nsys.version_info[:2]')  # folded tuple
+    assert 'sys__path' in opt('import sys\nsys.path', inline_stdlib=False)  # not folded
+    # Without the import, sys is just a name
+    assert opt('sys.version_info[0]') == 'sys.version_info[0];'
+
+
+def test_dead_branches():
+    code = opt('if this_is_js():\n  spam()\nelse:\n  eggs()')
+    assert 'spam()' in code and 'eggs()' not in code and 'if' not in code
+    
+    code = opt('if not this_is_js():\n  spam()\nelse:\n  eggs()')
+    assert 'spam()' not in code and 'eggs()' in code and 'if' not in code
+    
+    code = opt('if not this_is_js() and x:\n  spam()\nelif y:\n  eggs()')
+    assert 'spam()' not in code and 'eggs()' in code
+    
+    code = opt('if x:\n  spam()\nelif this_is_js():\n  eggs()\nelse:\n  ham()')
+    assert 'ham()' not in code and 'eggs()' in code
+    
+    code = opt('while False:\n  spam()\nelse:\n  eggs()')
+    assert 'spam()' not in code and 'while' not in code and 'eggs()' in code
+    
+    code = opt('while this_is_js():\n  spam()')
+    assert 'while (true)' in code
+    
+    # Function body that becomes empty
+    code = opt('def foo():\n  if not this_is_js():\n    spam()\n')
+    assert 'spam()' not in code and 'foo = function' in code
+    assert evaljs(opt('def foo():\n  if not this_is_js():\n    return 3\nfoo()')) == 'null'
+
+
+def test_not_folded_by_default():
+    assert py2js('3 + 4') == '3 + 4;'
+    assert 'spam()' in py2js('if not this_is_js():\n  spam()')
+
+
+def test_fold_with_missing_nodes():
+    # Dict unpacking gives a None key. The node checks do not allow that,
+    # so turn them off, like they are when not running the tests.
+    docheck = ast.docheck
+    ast.docheck = False
+    try:
+        root = fold("a = {**b, 'x': 1 + 2}")
+        with raises(JSError):
+            opt("a = {**b, 'x': 1}")
+    finally:
+        ast.docheck = docheck
+    assert root.body_nodes[0].value_node.key_nodes[0] is None
+    assert root.body_nodes[0].value_node.value_nodes[1].value == 3
+
+
+def test_fold_tree():
+    root = fold('if not this_is_js():\n  a()\nx = 1 + 2')
+    assert len(root.body_nodes) == 1
+    assert isinstance(root.body_nodes[0].value_node, ast.Num)
+    assert root.body_nodes[0].value_node.value == 3
+    assert root.body_nodes[0].value_node.lineno == 3
+    
+    # Empty body is replaced with a pass
+    root = fold('def foo():\n  if False:\n    a()')
+    assert isinstance(root.body_nodes[0].body_nodes[0], ast.Pass)
+
+
+run_tests_if_main()
@@ -1,6 +1,7 @@
 from flexx.util.testing import run_tests_if_main, raises
 
-from flexx.pyscript.parser0 import JSError, unify
+from flexx.pyscript import parser0
+from flexx.pyscript.parser0 import JSError, Unified, Compound, unify
 from flexx import pyscript
 
 
@@ -44,6 +45,67 @@ def test_unify():
     assert unify('foo((3))') == '(foo((3)))'
     assert unify('bar+foo(3)') == '(bar+foo(3))'
     assert unify('b + {a:3}') == '(b + {a:3})'
+    
+    # Lists of parts
+    assert unify(['foo', '(3)']) == 'foo(3)'
+    assert unify(['3', '+', '3']) == '(3+3)'
+    
+    # Unified strings are not wrapped again
+    x = unify('3+3')
+    assert isinstance(x, Unified)
+    assert unify(x) == '(3+3)'
+    assert unify([x]) == '(3+3)'
+    assert unify(Unified('foo((3))')) == 'foo((3))'
+    assert not isinstance(x + '1', Unified)
+    
+    # Compound expressions get braces without being scanned
+    x = Compound('foo(3) + bar(4)')
+    assert unify(x) == '(foo(3) + bar(4))'
+    assert isinstance(unify(x), Unified)
+    assert unify([x]) == '(foo(3) + bar(4))'
+    assert not isinstance(x + '1', Compound)
+
+
+def test_no_double_braces():
+    
+    # Operands that are already unified are not wrapped again
+    code = pyscript.py2js('x = (a < b) and (c == d)', inline_stdlib=False)
+    assert code.splitlines()[-1] == 'x = (a < b) && _pyfunc_equals(c, d);'
+    code = pyscript.py2js('x = -foo(bar(3)).spam')
+    assert code.splitlines()[-1] == 'x = -foo(bar(3)).spam;'
+    code = pyscript.py2js('x = a - b - c - d')
+    assert code.splitlines()[-1] == 'x = ((a - b) - c) - d;'
+    code = pyscript.py2js('x = not (a < b) or -c')
+    assert code.splitlines()[-1] == 'x = (!(a < b)) || (-c);'
 
 
+class CountingRegex:
+    
+    def __init__(self, regex, scanned):
+        self._regex = regex
+        self._scanned = scanned
+    
+    def match(self, x):
+        self._scanned.append(len(x))
+        return self._regex.match(x)
+
+
+def test_nested_expressions_are_not_rescanned():
+    
+    # Deeply nested code is not scanned again at each level of nesting,
+    # which would make transpiling quadratic in the nesting depth
+    scanned = []
+    names = '_re_word', '_re_call', '_re_index', '_re_dict'
+    originals = [getattr(parser0, name) for name in names]
+    for name, regex in zip(names, originals):
+        setattr(parser0, name, CountingRegex(regex, scanned))
+    try:
+        chain1 = ' - '.join('a%i.b[c](d)' % i for i in range(200))
+        chain2 = ' or '.join('not a%i < b' % i for i in range(50))
+        pyscript.py2js('x = %s\ny = %s' % (chain1, chain2))
+    finally:
+        for name, regex in zip(names, originals):
+            setattr(parser0, name, regex)
+    assert scanned and max(scanned) < 20
+
 run_tests_if_main()
@@ -118,6 +118,43 @@ class TestConrolFlow:
         assert evalpy('for i, j, k in [[1, 2, 3], [3, 4, 5]]: print(i+j+k)') == '6\n12'
     
     
+    def test_for_fast_paths(self):
+        
+        # The range end is evaluated once, unless it's simple
+        code = py2js('for i in range(len(a)): pass', inline_stdlib=False)
+        assert 'end = a.length;' in code and '_pyfunc_range' not in code
+        line = nowhitespace(py2js('for i in range(n): pass', inline_stdlib=False))
+        assert line == 'vari;for(i=0;i<n;i+=1){}'
+        assert evalpy('a = [1, 2]\nfor i in range(len(a)): a.append(i)\n'
+                      'JSON.stringify(a)') == '[1,2,0,1]'
+        assert evalpy('n = 3\nfor i in range(n):\n  n = 10\n  print(i)') == '0\n1\n2'
+        assert evalpy('n = 3\nfor n in range(n): print(n)') == '0\n1\n2'
+        assert evalpy('s = 2\nfor i in range(0, 6, s):\n  s = 1\n  print(i)') == '0\n2\n4'
+        
+        # Enumerate and zip do not create tuples
+        code = py2js('for i, x in enumerate(a): pass')
+        assert '_pyfunc_enumerate' not in code
+        code = py2js('for x, y, z in zip(a, b, c): pass')
+        assert '_pyfunc_zip' not in code
+        assert evalpy('for i, x in enumerate("ab"): print(i, x)') == '0 a\n1 b'
+        assert evalpy('for i, x in enumerate({"a": 1}): print(i, x)') == '0 a'
+        assert evalpy('for x, y in zip([1, 2, 3], "ab"): print(x, y)') == '1 a\n2 b'
+        assert evalpy('for x in zip([1, 2], "ab"): print(JSON.stringify(x))') == \
+            '[1,"a"]\n[2,"b"]'
+        assert evalpy('for i, x in enumerate([]): print(i)\nelse: print(9)') == '9'
+        assert evalpy('for x, y in zip([1, 2], [3, 4]):\n  if x==2:break\n  print(y)\n'
+                      'else: print(9)') == '3'
+        
+        # No check for dicts for things that are known to be arrays or strings
+        code = py2js('for x in [1, 2]: pass')
+        assert 'Object.keys' not in code
+        code = py2js('for x in "foo": pass')
+        assert 'Object.keys' not in code
+        code = py2js('for x in sorted(a): pass', inline_stdlib=False)
+        assert 'Object.keys' not in code
+        code = py2js('for x in a: pass')
+        assert 'Object.keys' in code
+    
     def method_for(self):
         for i in range(5):
             for j in range(5):
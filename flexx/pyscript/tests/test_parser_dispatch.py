@@ -0,0 +1,44 @@
+""" Tests for the dispatch tables of the parser. The timings of creating
+a parser and parsing nodes are in ``flexx.pyscript.benchmark``.
+"""
+
+from flexx.util.testing import run_tests_if_main, raises
+
+from flexx.pyscript import Parser, JSError
+from flexx.pyscript import commonast as ast
+
+
+def test_dispatch_tables():
+    p1, p2 = Parser(''), Parser('')
+    assert p1._functions is p2._functions
+    assert p1._methods is p2._methods
+    assert p1._parse_funcs is p2._parse_funcs
+    assert ast.Module in p1._parse_funcs
+    assert 'len' in p1._functions and 'append' in p1._methods
+
+
+def test_dispatch_tables_per_class():
+    
+    class MyParser(Parser):
+        def function_foo(self, node):
+            return 'bar()'
+    
+    p1, p2 = Parser(''), MyParser('')
+    assert p1._functions is not p2._functions
+    assert 'foo' in p2._functions and 'foo' not in p1._functions
+    assert MyParser('x = foo()').dump().strip() == 'var x;\nx = bar();'
+
+
+def test_parse_node():
+    p = Parser('')
+    p.push_stack('module', '')
+    node = ast.Name('foo')
+    assert p.parse(node) == ['foo']
+    assert p._parse_funcs[ast.Name] is Parser.parse_Name
+    assert p.parse(node) == ['foo']
+    
+    with raises(JSError):
+        p.parse(ast.Node.__new__(ast.Node))
+
+
+run_tests_if_main()
@@ -54,4 +54,25 @@ def test_stdlib_has_all_str_methods():
     for method_name in method_names:
         assert method_name in stdlib.METHODS
 
+def test_stdlib_info_is_resolved():
+    assert set(stdlib.FUNCTION_INFO) == set(stdlib.FUNCTIONS)
+    assert set(stdlib.METHOD_INFO) == set(stdlib.METHODS)
+    assert set(stdlib.IMPORT_INFO) == set(name for name in stdlib.IMPORTS
+                                          if stdlib.IMPORTS[name] is not None)
+    
+    # The dependencies are resolved recursively
+    for table in (stdlib.FUNCTION_INFO, stdlib.METHOD_INFO):
+        for name, (nargs, function_deps, method_deps) in table.items():
+            for dep in function_deps:
+                assert set(stdlib.FUNCTION_INFO[dep][1]).issubset(function_deps + (name, ))
+            for dep in method_deps:
+                assert set(stdlib.METHOD_INFO[dep][2]).issubset(method_deps + (name, ))
+    
+    # Using a function also uses its dependencies
+    p = Parser3('')
+    p.use_std_function('truthy', [])
+    p.use_std_method('x', 'startswith', [])
+    assert p._std_functions == set(['truthy'] + list(stdlib.FUNCTION_INFO['truthy'][1]) +
+                                   list(stdlib.METHOD_INFO['startswith'][1]))
+
 run_tests_if_main()
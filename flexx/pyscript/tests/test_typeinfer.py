@@ -0,0 +1,160 @@
+from flexx.util.testing import run_tests_if_main
+
+from flexx.pyscript import py2js, evalpy
+from flexx.pyscript import commonast as ast
+from flexx.pyscript.typeinfer import get_type, infer_var_types, NUM, STR, BOOL, LIST
+
+
+def expr_type(code, **types):
+    node = ast.parse(code).body_nodes[0].value_node
+    return get_type(node, types.get)
+
+
+def func_types(code):
+    node = ast.parse(code).body_nodes[0]
+    return infer_var_types(node, lambda name: None)
+
+
+def test_get_type():
+    assert expr_type('3') == NUM
+    assert expr_type('3.2') == NUM
+    assert expr_type('"foo"') == STR
+    assert expr_type('True') == BOOL
+    assert expr_type('None') is None
+    assert expr_type('x') is None
+    assert expr_type('x', x=NUM) == NUM
+    
+    assert expr_type('a < b') == BOOL
+    assert expr_type('a in b') == BOOL
+    assert expr_type('not a') == BOOL
+    assert expr_type('-a') is None
+    assert expr_type('-a', a=NUM) == NUM
+    
+    assert expr_type('a + 1') is None
+    assert expr_type('a + 1', a=NUM) == NUM
+    assert expr_type('a + "x"', a=STR) == STR
+    assert expr_type('a + "x"', a=NUM) is None
+    assert expr_type('a * b', a=NUM, b=NUM) == NUM
+    assert expr_type('a - b') == NUM  # JS "-" always gives a number
+    assert expr_type('a / b') == NUM
+    assert expr_type('"%i" % a') == STR
+    
+    assert expr_type('a or b', a=NUM, b=NUM) == NUM
+    assert expr_type('a or b', a=NUM) is None
+    assert expr_type('1 if a else 2') == NUM
+    assert expr_type('1 if a else "2"') is None
+    
+    assert expr_type('len(x)') == NUM
+    assert expr_type('str(x)') == STR
+    assert expr_type('isinstance(x, y)') == BOOL
+    assert expr_type('foo(x)') is None
+    
+    assert expr_type('[1, 2]') == LIST
+    assert expr_type('(1, 2)') == LIST
+    assert expr_type('[x for x in y]') == LIST
+    assert expr_type('sorted(x)') == LIST
+    assert expr_type('a + b', a=LIST, b=LIST) == LIST
+    assert expr_type('a or b', a=LIST, b=LIST) == LIST
+    assert expr_type('a and b', a=LIST, b=LIST) is None  # truthy([]) is false
+
+
+def test_get_type_cache():
+    # The parser gets the type of each BinOp in a chain; with a cache,
+    # each variable is looked up once, instead of once per level
+    lookups = []
+    def lookup(name):
+        lookups.append(name)
+        return NUM
+    
+    node = ast.parse(' + '.join('a%i' % i for i in range(20))).body_nodes[0].value_node
+    cache = {}
+    nodes = []
+    while isinstance(node, ast.BinOp):
+        nodes.append(node)
+        node = node.left_node
+    for node in reversed(nodes):
+        assert get_type(node, lookup, cache) == NUM
+    for node in nodes:
+        assert get_type(node, lookup, cache) == NUM
+    assert len(lookups) == 20
+
+
+def test_infer_var_types():
+    types = func_types('def foo(a):\n  for i in range(3): pass\n  '
+                       'x = 0\n  x += i\n  s = ""\n  s += "x"\n  b = x > 3')
+    assert types == dict(a=None, i=NUM, x=NUM, s=STR, b=BOOL)
+    
+    # Mixed types
+    types = func_types('def foo():\n  x = 0\n  x = "a"\n  y = 1\n  y += z')
+    assert types == dict(x=None, y=None)
+    
+    # Dependencies in any order
+    types = func_types('def foo():\n  x = y + 1\n  y = 3\n  z = z + 1\n  z = 0')
+    assert types == dict(x=NUM, y=NUM, z=NUM)
+    
+    # Only assigned to itself
+    assert func_types('def foo():\n  x = x') == dict(x=None)
+    
+    # Other kinds of bindings
+    types = func_types('def foo():\n  for i in x: pass\n  a, b = 1, 2\n'
+                       '  import sys\n  def bar(): pass')
+    assert types == dict(i=None, a=None, b=None, sys=None, bar=None)
+    types = func_types('def foo():\n  for i, x in enumerate(y): pass')
+    assert types == dict(i=NUM, x=None)
+    
+    # Bindings in nested scopes make a variable untyped
+    types = func_types('def foo():\n  x = 0\n  def bar():\n    nonlocal x\n'
+                       '    x = "a"\n    y = 0\n  class C:\n    z = 0')
+    assert types == dict(x=None, y=None, z=None, bar=None, C=None)
+    types = func_types('def foo():\n  global x\n  x = 0')
+    assert types == dict(x=None)
+
+
+def test_fast_paths():
+    
+    code = py2js('def foo(a):\n  n = 0\n  if n and a:\n    pass', inline_stdlib=False)
+    assert '_truthy(n)' not in code and '_truthy(a)' in code
+    
+    code = py2js('def foo(a):\n  n = len(a)\n  return n == 3', inline_stdlib=False)
+    assert 'return n == 3;' in code
+    code = py2js('def foo(a):\n  return a == 3', inline_stdlib=False)
+    assert 'equals' in code
+    code = py2js('def foo(a):\n  return len(a) != 0', inline_stdlib=False)
+    assert 'a.length != 0' in code
+    
+    code = py2js('def foo(a):\n  s = "abc"\n  return "b" in s', inline_stdlib=False)
+    assert 's.indexOf("b") >= 0' in code
+    code = py2js('def foo(a):\n  n = 2\n  return n not in (1, 2, 3)', inline_stdlib=False)
+    assert '[1, 2, 3].indexOf(n) < 0' in code
+    code = py2js('def foo(a):\n  return a in "abc"', inline_stdlib=False)
+    assert 'contains' in code
+    
+    code = py2js('def foo(a):\n  n = 0\n  for i in range(a):\n    n += i * 2',
+                 inline_stdlib=False)
+    assert 'n += i * 2;' in code
+    assert 'add' not in code and 'mult' not in code
+    code = py2js('def foo(a):\n  n = 0\n  n += a', inline_stdlib=False)
+    assert 'add' in code
+    
+    # Lists are not primitives
+    code = py2js('def foo(a):\n  x = []\n  if x == a: pass\n  if x: pass', inline_stdlib=False)
+    assert 'equals' in code and 'truthy(x)' in code
+    
+    # Module level variables are not inferred
+    code = py2js('n = 0\nif n: pass', inline_stdlib=False)
+    assert 'truthy' in code
+
+
+def test_fast_paths_behave_the_same():
+    code = 'def foo(a):\n'
+    code += '  n = 0\n  s = ""\n'
+    code += '  for i in range(a):\n'
+    code += '    n += i * 2\n'
+    code += '    if i % 2 == 0 and n:\n'
+    code += '      s += str(i)\n'
+    code += '  return [n, s, "2" in s, n in (0, 12), n == len(s)]\n'
+    code += 'foo(5)'
+    assert evalpy(code) == '[ 20, \'24\', true, false, false ]'
+
+
+run_tests_if_main()
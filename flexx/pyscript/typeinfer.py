@@ -0,0 +1,243 @@
+"""
+Simple inference of primitive types, used by the parser to emit plain
+JS operators instead of calls to the (polymorphic) stdlib functions
+for truthiness, equality, containment, addition and multiplication.
+
+Only the obvious cases are detected: literals, comparisons, the results
+of functions like ``len()``, arithmetic, and variables of a
+function for which every assignment is of the same primitive type
+(e.g. the variable of a ``for i in range(n)`` loop). If anything is
+uncertain, the type is None, and the generic code is used.
+"""
+
+from . import commonast as ast
+
+
+NUM, STR, BOOL, LIST = 'num', 'str', 'bool', 'list'
+PRIMITIVES = NUM, STR, BOOL  # LIST (a JS array) is not a primitive
+UNKNOWN = 'unknown'  # not known yet, used while inferring variable types
+
+NUM_FUNCTIONS = 'len', 'int', 'float', 'round', 'abs', 'ord'
+STR_FUNCTIONS = 'str', 'chr', 'repr'
+BOOL_FUNCTIONS = 'bool', 'callable', 'isinstance', 'hasattr'
+LIST_FUNCTIONS = ('list', 'tuple', 'range', 'sorted', 'reversed', 'map', 'filter',
+                  'zip', 'enumerate')
+
+
+def _same(*types):
+    # All types must be equal; UNKNOWN is optimistically ignored
+    if None in types:
+        return None
+    known = set(t for t in types if t != UNKNOWN)
+    if not known:
+        return UNKNOWN
+    return known.pop() if len(known) == 1 else None
+
+
+def _restrict(t, *allowed):
+    return t if (t == UNKNOWN or t in allowed) else None
+
+
+def get_type(node, lookup, cache=None):
+    """ Get the type (NUM, STR, BOOL or LIST) of the given expression
+    node, or None if not known. The lookup function maps variable names
+    to their type. If a cache dict is given, the types of the node and
+    its subnodes are stored in it, so that typing nested expressions
+    does not take quadratic time.
+    """
+    if cache is None:
+        return _get_type(node, lookup, None)
+    entry = cache.get(id(node), None)
+    if entry is None:
+        # Store the node too, so that its id cannot be reused
+        entry = cache[id(node)] = node, _get_type(node, lookup, cache)
+    return entry[1]
+
+
+def _get_type(node, lookup, cache):
+    if isinstance(node, ast.Num):
+        return NUM if not isinstance(node.value, complex) else None
+    elif isinstance(node, ast.Str):
+        return STR
+    elif isinstance(node, ast.NameConstant):
+        return BOOL if isinstance(node.value, bool) else None
+    elif isinstance(node, (ast.List, ast.Tuple, ast.ListComp)):
+        return LIST
+    elif isinstance(node, ast.Name):
+        return lookup(node.name)
+    elif isinstance(node, ast.Compare):
+        return BOOL
+    elif isinstance(node, ast.UnaryOp):
+        if node.op == node.OPS.Not:
+            return BOOL
+        return _restrict(get_type(node.right_node, lookup, cache), NUM)
+    elif isinstance(node, ast.BinOp):
+        if node.op == node.OPS.Mod and isinstance(node.left_node, ast.Str):
+            return STR  # string formatting
+        if node.op not in (node.OPS.Add, node.OPS.Mult):
+            return NUM  # the JS operators for these always produce a number
+        t = _same(get_type(node.left_node, lookup, cache),
+                  get_type(node.right_node, lookup, cache))
+        if node.op == node.OPS.Add:
+            return _restrict(t, NUM, STR, LIST)
+        return _restrict(t, NUM)
+    elif isinstance(node, ast.BoolOp):
+        t = _same(*[get_type(n, lookup, cache) for n in node.value_nodes])
+        if t == LIST and node.op == node.OPS.And:
+            return None  # the truthy() of an empty array is false
+        return t
+    elif isinstance(node, ast.IfExp):
+        return _same(get_type(node.body_node, lookup, cache),
+                     get_type(node.else_node, lookup, cache))
+    elif isinstance(node, ast.Call) and isinstance(node.func_node, ast.Name):
+        name = node.func_node.name
+        if name in NUM_FUNCTIONS:
+            return NUM
+        elif name in STR_FUNCTIONS:
+            return STR
+        elif name in BOOL_FUNCTIONS:
+            return BOOL
+        elif name in LIST_FUNCTIONS:
+            return LIST
+    return None
+
+
+def infer_var_types(func_node, lookup):
+    """ Get a dict that maps the names of the variables that are bound in
+    the given function (or lambda) to their type, or None if the type
+    is not known. Names that are bound in nested functions, classes or
+    comprehensions are included (as untyped), which is conservative.
+    The lookup function is used for variables from outer scopes.
+    """
+    sources = {}  # name -> list of (kind, node)
+    _add_args(func_node, sources)
+    if isinstance(func_node, ast.Lambda):
+        _collect_bindings(func_node.body_node, sources)
+    else:
+        for node in func_node.body_nodes:
+            _collect_bindings(node, sources)
+    
+    types = dict((name, UNKNOWN) for name in sources)
+    
+    def local_lookup(name):
+        if name in types:
+            return types[name]
+        return lookup(name)
+    
+    # Iterate until stable. Types only go from UNKNOWN to a specific
+    # type to None, so this terminates.
+    changed = True
+    while changed:
+        changed = False
+        for name, name_sources in sources.items():
+            if types[name] is None:
+                continue
+            name_types = []
+            for kind, node in name_sources:
+                if kind == 'value':
+                    name_types.append(get_type(node, local_lookup))
+                else:
+                    name_types.append(kind)  # NUM or None
+            t = _same(*name_types)
+            if t != types[name]:
+                types[name] = t
+                changed = True
+    
+    return dict((name, None if t == UNKNOWN else t) for name, t in types.items())
+
+
+def get_bound_names(nodes):
+    """ Get the set of names that are bound in the given statements,
+    including in nested functions and classes.
+    """
+    sources = {}
+    for node in nodes:
+        _collect_bindings(node, sources)
+    return set(sources)
+
+
+def _add_name(name, sources, kind=None, node=None):
+    sources.setdefault(name, []).append((kind, node))
+
+
+def _add_names(target, sources, kind=None, node=None):
+    if isinstance(target, ast.Name):
+        _add_name(target.name, sources, kind, node)
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        for n in target.element_nodes:
+            _add_names(n, sources)
+    elif isinstance(target, ast.Starred):
+        _add_names(target.value_node, sources)
+
+
+def _add_args(node, sources):
+    for arg in node.arg_nodes + node.kwarg_nodes:
+        _add_name(arg.name, sources)
+    for arg in (node.args_node, node.kwargs_node):
+        if arg is not None:
+            _add_name(arg.name, sources)
+
+
+def _collect_bindings(node, sources, nested=False):
+    """ Collect all the places where a variable is bound. Bindings in
+    nested functions and classes make a variable untyped.
+    """
+    value = None if nested else 'value'
+    if isinstance(node, (ast.FunctionDef, ast.Lambda)):
+        _add_args(node, sources)
+        if isinstance(node, ast.FunctionDef):
+            _add_name(node.name, sources)
+        nested = True
+    elif isinstance(node, ast.ClassDef):
+        _add_name(node.name, sources)
+        nested = True
+    elif isinstance(node, ast.Assign):
+        for target in node.target_nodes:
+            _add_names(target, sources, value, node.value_node)
+    elif isinstance(node, ast.AugAssign):
+        # "x += y" has the same type as "x = x + y"
+        value_node = ast.BinOp(node.op, node.target_node, node.value_node)
+        _add_names(node.target_node, sources, value, value_node)
+    elif isinstance(node, ast.For):
+        iter = node.iter_node
+        func_name = ''
+        if isinstance(iter, ast.Call) and isinstance(iter.func_node, ast.Name):
+            func_name = iter.func_node.name
+        target = node.target_node
+        num = None if nested else NUM
+        if isinstance(target, ast.Name) and func_name in ('range', 'xrange'):
+            _add_names(target, sources, num)
+        elif (func_name == 'enumerate' and isinstance(target, ast.Tuple) and
+                len(target.element_nodes) == 2):
+            _add_names(target.element_nodes[0], sources, num)
+            _add_names(target.element_nodes[1], sources)
+        else:
+            _add_names(target, sources)
+    elif isinstance(node, ast.Comprehension):
+        _add_names(node.target_node, sources)
+    elif isinstance(node, ast.WithItem):
+        if node.as_node is not None:
+            _add_names(node.as_node, sources)
+    elif isinstance(node, ast.ExceptHandler):
+        if node.name:
+            _add_name(node.name, sources)
+    elif isinstance(node, ast.Import):
+        for name, alias in node.names:
+            name = alias or name.split('.')[0]
+            _add_name(name, sources)
+    elif isinstance(node, (ast.Global, ast.Nonlocal)):
+        for name in node.names:
+            _add_name(name, sources)
+    elif isinstance(node, ast.Delete):
+        for target in node.target_nodes:
+            _add_names(target, sources)
+    
+    # Recurse
+    for name in node.__slots__:
+        if name.endswith('_node'):
+            child = getattr(node, name)
+            if child is not None:
+                _collect_bindings(child, sources, nested)
+        elif name.endswith('_nodes'):
+            for child in getattr(node, name):
+                _collect_bindings(child, sources, nested)
@@ -254,7 +254,7 @@ class Widget(Model):
                 raise ValueError('%s.container should be a string.' % self.id)
             return str(v)
     
-        @event.prop
+        @event.listprop
         def children(self, new_children=()):
             """ The child widgets of this widget. Setting this property
             will update the "parent" property of the old and new
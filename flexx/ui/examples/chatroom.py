@@ -7,14 +7,6 @@ This app might be running at the demo server: http://flexx1.zoof.io
 from flexx import app, ui, event
 
 
-class Relay(event.HasEvents):
-    """ Global object to relay messages to all participants.
-    """
-    @event.emitter
-    def new_message(self, msg):
-        return dict(msg=msg + '<br />')
-
-
 class MessageBox(ui.Label):
     CSS = """
     .flx-MessageBox {
@@ -26,8 +18,8 @@ class MessageBox(ui.Label):
     """
 
 
-# Create global relay
-relay = Relay()
+# Create global channel to relay messages to all participants
+channel = app.Channel('chatroom')
 
 
 class ChatRoom(ui.Widget):
@@ -48,11 +40,7 @@ class ChatRoom(ui.Widget):
             ui.Widget(flex=1)
         
         self._update_participants()
-    
-    @relay.connect('new_message')  # note that we connect to relay
-    def _push_info(self, *events):
-        for ev in events:
-            self.emit('new_message', ev)
+        channel.subscribe(self)
     
     def _update_participants(self):
         if not self.session.status:
@@ -70,7 +58,8 @@ class ChatRoom(ui.Widget):
         text = self.message.text
         if text:
             name = self.name.text or 'anonymous'
-            relay.new_message('<i>%s</i>: %s' % (name, text))
+            msg = '<i>%s</i>: %s<br />' % (name, text)
+            channel.broadcast('new_message', dict(msg=msg))
             self.message.text = ''
     
     class JS:
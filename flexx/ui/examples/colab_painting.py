@@ -17,16 +17,8 @@ COLORS = ('#eee', '#999', '#555', '#111',
           )
 
 
-class Relay(event.HasEvents):
-    """ Global object to relay paint events to all participants.
-    """
-    @event.emitter
-    def global_paint(self, pos, color):
-        return dict(pos=pos, color=color)
-
-
-# Create global relay
-relay = Relay()
+# Create global channel to relay paint events to all participants
+channel = app.Channel('colab_painting')
 
 
 class ColabPainting(ui.Widget):
@@ -60,6 +52,7 @@ class ColabPainting(ui.Widget):
         
         # Start people-count-updater
         self._update_participants()
+        channel.subscribe(self)
     
     @event.prop
     def color(self, color='#000'):
@@ -68,17 +61,9 @@ class ColabPainting(ui.Widget):
     
     @event.connect('canvas.mouse_down')
     def _this_user_adds_paint(self, *events):
-        """ Detect mouse down, emit global paint event via the relay. """
-        for ev in events:
-            relay.global_paint(ev.pos, self.color)
-    
-    @relay.connect('global_paint')  # note that we connect to relay here
-    def _any_user_adds_paint(self, *events):
-        """ Receive global paint event from the relay, emit local paint event. """
-        # if not self.session.status:
-        #     return  I think this is not required anymore. Worst case we get a warning
+        """ Detect mouse down, emit paint event in all sessions via the channel. """
         for ev in events:
-            self.emit('paint', ev)
+            channel.broadcast('paint', dict(pos=ev.pos, color=self.color))
     
     def _update_participants(self):
         """ Keep track of the number of participants. """
@@ -9,6 +9,7 @@ import time
 import psutil
 
 from flexx import app, ui, event
+from flexx.pyscript import window
 
 nsamples = 16
 
@@ -101,20 +102,20 @@ class Monitor(ui.Widget):
             
             # Prepare plots
             import time
-            times = self.cpu_plot.xdata.copy()
+            times = window.Array.prototype.slice.call(self.cpu_plot.xdata)
             times.append(time.time() - self.start_time)
             times = times[-self.nsamples:]
             self.cpu_plot.xdata = times
             self.mem_plot.xdata = times
             
             # cpu data
-            usage = self.cpu_plot.ydata
+            usage = window.Array.prototype.slice.call(self.cpu_plot.ydata)
             usage.append(ev.cpu)
             usage = usage[-self.nsamples:]
             self.cpu_plot.ydata = usage
             
             # mem data
-            usage = self.mem_plot.ydata
+            usage = window.Array.prototype.slice.call(self.mem_plot.ydata)
             usage.append(ev.mem)
             usage = usage[-self.nsamples:]
             self.mem_plot.ydata = usage
@@ -60,15 +60,17 @@ class PlotWidget(CanvasWidget):
     
     class Both:
             
-        @event.prop
+        @event.arrayprop
         def xdata(self, v=()):
-            """ A list of values for the x-axis. """
-            return [float(f) for f in v]
+            """ An array of values for the x-axis. Numpy arrays are
+            send to the client as binary data. """
+            return v
         
-        @event.prop
+        @event.arrayprop
         def ydata(self, v=()):
-            """ A list of values for the y-axis. """
-            return [float(f) for f in v]
+            """ An array of values for the y-axis. Numpy arrays are
+            send to the client as binary data. """
+            return v
         
         @event.prop
         def yrange(self, v=None):
@@ -131,7 +133,9 @@ class PlotWidget(CanvasWidget):
             window.requestAnimationFrame(self._update)
             
         def _update(self):
-            xx, yy = self.xdata, self.ydata
+            # Get plain arrays; PyScript iterates over TypedArrays as objects
+            xx = window.Array.prototype.slice.call(self.xdata)
+            yy = window.Array.prototype.slice.call(self.ydata)
             yrange = self.yrange
             lc, lw = self.line_color, self.line_width
             mc, ms = self.marker_color, self.marker_size
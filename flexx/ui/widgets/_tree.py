@@ -236,7 +236,7 @@ class TreeWidget(Widget):
     
     class Both:
         
-        @event.prop
+        @event.listprop
         def items(self, items=[]):
             """ The list of (direct) TreeItem instances for this tree.
             """
@@ -364,7 +364,7 @@ class TreeItem(Model):
     
     class Both:
         
-        @event.prop
+        @event.listprop
         def items(self, items=[]):
             """ The list of sub items.
             """